@@ -1,14 +1,24 @@
 import argparse
-import emoji
 from colorama import Fore, Style, init, Back
 from modules.log_reader import LogReader
+from modules.log_parser import PARSEURS  # Formats de logs pris en charge
+from modules.log_checkpoint import LogCheckpoint  # Positions de lecture pour le mode incrémental
+from modules.cache_evenements import CacheEvenements  # Évènements extraits des fichiers qui ne changent plus
+from modules.log_suivi import SuiviLogs  # Mode démon : suivi en continu des logs
+from modules.agent_collecte import AgentCollecte  # Mode agent : compteurs par IP transmis à l'agrégateur
+from modules.agregateur import Agregateur  # Mode agrégateur : détection sur la vue de tous les hôtes
+from modules.persistance import PersistanceSQLite  # Requêtes sur les évènements persistés
+from modules.historique import HistoriqueIP  # Compteurs horaires par IP conservés entre les exécutions
 from modules.log_analyzer import LogAnalyzer
-from modules.log_ai import LogAI  # Importer la classe LogAI pour l'option GPT
-from modules.notification import Notification  # Import de la classe Notification
-from modules.notification_slack import SlackNotification  # Pour l'envoi de notifications Slack
-import schedule
+from modules.adresses_ip import IndexCIDR  # Listes d'autorisation et d'interdiction (réseaux CIDR)
+from modules.notification_dispatcher import DispatcheurNotifications  # Envoi des notifications en arrière-plan
+from modules.etat_alertes import EtatAlertes  # Alertes déjà envoyées, pour ne pas les renvoyer
+from modules.metriques import MetriquesPipeline  # Mesures par étape, profilage et export Prometheus
 import time  # Nécessaire pour le délai entre les exécutions
 from datetime import datetime # pour afficher l'heure entre les exécutions
+# Les modules des options --use-gpt (openai), --notifier (smtplib), --slack (requests), --graphe
+# (matplotlib) et --planifier (schedule) ne sont importés que si l'option est utilisée, afin de
+# garder un démarrage rapide lorsque l'outil est lancé par cron
 
 init(autoreset=True)
 
@@ -23,18 +33,48 @@ banner = f"""{Fore.CYAN}
  By Houssam GOURINE & Lorenzo GIUSTINO with love <3
 {Style.RESET_ALL}                                                               
 """
+
+# Dispatcheur des notifications email et Slack, partagé par toutes les exécutions (créé dans main)
+dispatcheur = None
+# Alertes déjà envoyées, partagées par toutes les exécutions (créé dans main)
+etat_alertes = None
+# Mesures des étapes de chaque exécution (créé dans main)
+metriques = None
+
 def analyser_logs(args):
     """
     Fonction principale d'analyse des logs. Cette fonction sera appelée à chaque exécution programmée.
     Elle prend les arguments fournis en ligne de commande via l'objet args.
+    Chaque étape est mesurée ; avec --profile, le détail est affiché à la fin de l'exécution.
+    """
+    with metriques.execution():
+        executer_analyse(args)
+    if args.profile:
+        metriques.afficher()
+
+def executer_analyse(args):
+    """
+    Enchaîne les étapes d'une exécution de l'analyse des logs (voir analyser_logs).
     """
     print(f"{banner} \n🔎 Démarrage de l'analyse des logs à {datetime.now()}")
 
     # Créer une instance de LogReader avec le chemin du répertoire
-    lecteur = LogReader(args.repertoire)
+    # (en mode incrémental, la lecture reprend au checkpoint de l'exécution précédente)
+    checkpoint = LogCheckpoint(args.incremental) if args.incremental else None
+    cache = None
+    if args.cache_logs:
+        try:
+            cache = CacheEvenements(args.cache_logs)
+            if supprimees := cache.purger():
+                print(f"{supprimees} entrée(s) du cache des logs supprimée(s) (fichiers disparus).")
+        except ImportError as e:
+            print(f"{Fore.YELLOW}⚠️ {e} Les fichiers seront analysés sans cache.{Style.RESET_ALL}")
+    lecteur = LogReader(args.repertoire, checkpoint=checkpoint, format_logs=args.format, cache=cache)
 
     # Trouver tous les fichiers de logs correspondant au pattern dans le répertoire
-    fichiers_logs = lecteur.trouver_fichiers_logs(pattern=args.pattern)
+    with metriques.etape("decouverte") as mesure:
+        fichiers_logs = lecteur.trouver_fichiers_logs(pattern=args.pattern)
+        mesure['lignes_sortie'] = len(fichiers_logs)
 
     # Si des fichiers de logs sont trouvés, les lire un par un et extraire les informations
     if fichiers_logs:
@@ -43,16 +83,38 @@ def analyser_logs(args):
 
         # Option 1 : Utiliser GPT pour analyser les logs avec OpenAI (si --use-gpt est spécifié)
         if args.use_gpt:
+            from modules.log_ai import LogAI  # Importer la classe LogAI pour l'option GPT
+            from modules.log_reduction import ReducteurLogs  # Résumé des logs avant l'envoi à GPT
+            from modules.cache_verdicts import CacheVerdicts  # Cache persistant des verdicts de GPT
             print(f"\n{Fore.GREEN}[+]Analyse des logs avec GPT via l'API OpenAI...{Style.RESET_ALL}")
 
-            # Lire les logs bruts pour l'analyse avec GPT
-            lecteur.lire_logs_bruts(fichier_log)
-            # Créer une instance de LogAI avec la liste de logs
-            analyseur_ai = LogAI(lecteur.lignes_extraites_brut[:10])  # Limiter à 10 lignes pour l'exemple
+            if args.gpt_brut:
+                # Lire les logs bruts de tous les fichiers pour l'analyse avec GPT
+                with metriques.etape("lecture_brute", len(fichiers_logs)) as mesure:
+                    for fichier_log in fichiers_logs:
+                        lecteur.lire_logs_bruts(fichier_log)
+                    logs_gpt = lecteur.lignes_extraites_brut
+                    mesure['lignes_sortie'] = len(logs_gpt)
+            else:
+                # Réduire les logs à un résumé (lignes regroupées par IP/utilisateur/évènement ou par modèle)
+                with metriques.etape("reduction") as mesure:
+                    reducteur = ReducteurLogs(None if args.format == "auto" else lecteur.parseur)
+                    for fichier_log in fichiers_logs:
+                        reducteur.ajouter_fichier(fichier_log)
+                    logs_gpt = reducteur.resumer()
+                    mesure.update(lignes_entree=reducteur.nombre_lignes, lignes_sortie=len(logs_gpt))
+                print(f"[+] {reducteur.nombre_lignes} lignes de logs réduites à {len(logs_gpt)} lignes de résumé.")
+
+            # Créer une instance de LogAI avec la liste de logs (découpée en lots envoyés en parallèle)
+            analyseur_ai = LogAI(logs_gpt, cache=CacheVerdicts(args.cache_gpt) if args.cache_gpt else None)
 
             # Analyser les logs avec OpenAI GPT
             try:
-                analyseur_ai.analyser_logs_avec_gpt()
+                with metriques.etape("gpt", len(logs_gpt)) as mesure:
+                    rapport = analyseur_ai.analyser_logs_avec_gpt()
+                    mesure['lignes_sortie'] = len(rapport['resultats'])
+                    if args.cache_gpt:
+                        mesure.update(cache_succes=rapport['depuis_cache'], cache_echecs=rapport['nombre_logs'] - rapport['depuis_cache'])
                 print(f"\n{Fore.GREEN}[+]Résultat de l'analyse par GPT en JSON :{Style.RESET_ALL}")
                 print(analyseur_ai.dump_reponse())  # Afficher la réponse JSON
             except ValueError as e:
@@ -61,45 +123,65 @@ def analyser_logs(args):
         # Analyse traditionnelle des logs
         else:
             # Lecture et extraction de toutes les données de tous les fichiers
-            for fichier_log in fichiers_logs:
-                lecteur.lire_et_extraire_logs(fichier_log)
+            with metriques.etape("lecture", len(fichiers_logs)) as mesure:
+                lecteur.lire_et_extraire_fichiers(fichiers_logs, nb_workers=args.workers)
+                if checkpoint:
+                    checkpoint.sauvegarder()
+                mesure.update(lignes_sortie=len(lecteur.bloc_extrait), octets=lecteur.compteurs['octets_lus'])
+                if cache:
+                    mesure.update(cache_succes=lecteur.compteurs['fichiers_en_cache'], cache_echecs=lecteur.compteurs['fichiers_analyses'])
             print("\nAnalyse des logs avec les méthodes traditionnelles...")
-            lecteur.creer_dataframe()
+            with metriques.etape("dataframe", len(lecteur.bloc_extrait)) as mesure:  # Conversion des dates comprise
+                lecteur.creer_dataframe()
+                mesure['lignes_sortie'] = len(lecteur.df_logs)
 
             # Créer une instance de LogAnalyzer pour analyser les logs
-            analyseur = LogAnalyzer(lecteur.df_logs)
+            liste_autorisee = IndexCIDR.depuis_fichier(args.liste_autorisee) if args.liste_autorisee else None
+            liste_interdite = IndexCIDR.depuis_fichier(args.liste_interdite) if args.liste_interdite else None
+            analyseur = LogAnalyzer(lecteur.df_logs, liste_autorisee, liste_interdite)
+
+            # Détecter les IP récidivistes sur une longue période grâce à l'historique des exécutions précédentes
+            if args.historique:
+                if not checkpoint:
+                    print(f"{Fore.YELLOW}⚠️ Sans --incremental, les logs déjà lus seront recomptés dans l'historique.{Style.RESET_ALL}")
+                with metriques.etape("historique", len(lecteur.df_logs)) as mesure:
+                    recidivistes = analyseur.analyser_historique(HistoriqueIP(args.historique), heures=args.horizon_historique,
+                                                                 seuil_alerte=args.seuil_historique,
+                                                                 retention_jours=args.retention_historique)
+                    mesure['lignes_sortie'] = 0 if recidivistes is None else len(recidivistes)
 
             # Analyser la fréquence des adresses IP dans l'intervalle de temps spécifié
-            lignes_suspectes = analyseur.analyser_frequence_ips(intervalle_temps=args.intervalle, seuil_alerte=args.seuil)
+            with metriques.etape("frequence", len(lecteur.df_logs)) as mesure:
+                lignes_suspectes = analyseur.analyser_frequence_ips(intervalle_temps=args.intervalle, seuil_alerte=args.seuil, mode=args.fenetre,
+                                                                      prefixe_v4=args.prefixe_v4, prefixe_v6=args.prefixe_v6)
+                mesure['lignes_sortie'] = len(lignes_suspectes or [])
 
             if lignes_suspectes:
-                if args.graphe:
-                    # Afficher un graphe des événements critiques
-                    analyseur.afficher_evenements_par_date()
+                if args.graphe or args.graphe_fichier:
+                    # Afficher un graphe des événements critiques (ou l'enregistrer en PNG sans affichage)
+                    with metriques.etape("graphe"):
+                        analyseur.afficher_evenements_par_date(fichier=args.graphe_fichier)
 
-                if args.notifier:
-                    # Envoyer une notification par email si des événements critiques sont détectés
-                    print(f"\n{Fore.RED}[🚨]Événements critiques détectés, envoi d'une notification par email...{Style.RESET_ALL}")
-
-                    # Créer une instance de Notification avec le fichier de configuration
-                    notification = Notification()
-
-                    # Envoyer la notification avec les événements critiques
-                    notification.envoyer_notification_evenements_critiques(lignes_suspectes[:10])
-
-                if args.slack:
-                    print(f"\n{Fore.RED}[🚨]Évènements critiques détectés, envoi d'une notification via Slack...{Style.RESET_ALL}")
-                    slack_notif = SlackNotification()  # Utilise l'URL par défaut
-                    
-                    message_slack = "Alerte : Évènements critiques détectés dans les logs.\n"
-                    for log in lignes_suspectes:
-                        message_slack += f"- {log}\n"
-                    slack_notif.envoyer_notification(message_slack)
+                if dispatcheur:
+                    # Envoyer les notifications (email et/ou Slack) en arrière-plan, sans bloquer l'analyse,
+                    # uniquement pour les alertes (IP, fenêtre) pas encore envoyées, résumées par IP
+                    with metriques.etape("notification", len(analyseur.alertes)) as mesure:
+                        nouvelles_alertes = etat_alertes.filtrer_nouvelles(analyseur.alertes)
+                        if nouvelles_alertes.empty:
+                            print(f"\n{Fore.YELLOW}[+]Alertes déjà notifiées lors d'une exécution précédente, aucune notification.{Style.RESET_ALL}")
+                        else:
+                            print(f"\n{Fore.RED}[🚨]Évènements critiques détectés, envoi des notifications en arrière-plan...{Style.RESET_ALL}")
+                            # Les alertes ne sont enregistrées comme envoyées qu'une fois l'envoi réussi
+                            dispatcheur.signaler(*analyseur.resumer_alertes(nouvelles_alertes),
+                                                 rappel=lambda envoyees, alertes=nouvelles_alertes: etat_alertes.enregistrer_envoi(alertes, envoyees))
+                        mesure['lignes_sortie'] = len(nouvelles_alertes)
 
                 if args.persister:
                     # Persister les événements critiques dans une base de données SQLite
                     print(f"{Fore.RED}[+]Persistance des événements critiques dans une base de données SQLite...{Style.RESET_ALL}")
-                    analyseur.persister_evenements_critique()
+                    with metriques.etape("persistance", int(lecteur.df_logs['Critique'].sum())) as mesure:
+                        compteurs = analyseur.persister_evenements_critique(chemin_db=args.db, retention_jours=args.retention_jours)
+                        mesure['lignes_sortie'] = compteurs['inseres']
             else:
                 print(f"{Fore.GREEN}Aucun événement critique détecté.{Style.RESET_ALL}")
 
@@ -108,35 +190,166 @@ def analyser_logs(args):
     else:
         print(f"⚠️Aucun fichier de logs correspondant au pattern '{args.pattern}' n'a été trouvé dans le répertoire.")
 
+def suivre_logs(args):
+    """
+    Mode démon : suit les fichiers de logs en continu et alerte dès qu'une IP dépasse le seuil
+    sur une fenêtre glissante de durée --intervalle.
+    """
+    print(f"{banner} \n🔎 Démarrage du suivi des logs à {datetime.now()}")
+
+    def notifier(ip, nombre, date_heure):
+        dispatcheur.signaler(f"{nombre} accès de l'IP {ip} en moins de {args.intervalle} ({date_heure}).")
+
+    checkpoint = LogCheckpoint(args.incremental) if args.incremental else None
+    suivi = SuiviLogs(args.repertoire, pattern=args.pattern, fenetre=args.intervalle, seuil_alerte=args.seuil,
+                      checkpoint=checkpoint, notifier=notifier if dispatcheur else None, format_logs=args.format,
+                      metriques=metriques)
+    suivi.suivre()
+
+def executer_agent(args):
+    """
+    Mode agent : suit les fichiers de logs en continu, comme --suivre, mais transmet les
+    compteurs d'accès par IP à l'agrégateur central au lieu de détecter localement.
+    """
+    print(f"{banner} \n🔎 Démarrage de l'agent de collecte à {datetime.now()}")
+    hote, _, port = args.agent.rpartition(":")
+    agent = AgentCollecte(hote.strip("[]") or "127.0.0.1", int(port), nom=args.nom_agent, duree_seau=args.intervalle)
+    checkpoint = LogCheckpoint(args.incremental) if args.incremental else None
+    suivi = SuiviLogs(args.repertoire, pattern=args.pattern, fenetre=args.intervalle, checkpoint=checkpoint,
+                      format_logs=args.format, metriques=metriques, detecteur=agent)
+    try:
+        suivi.suivre()
+    finally:
+        agent.fermer()
+
+def executer_agregateur(args):
+    """
+    Mode agrégateur : reçoit les compteurs des agents de tous les hôtes et détecte sur la vue
+    globale les IP qui dépassent le seuil, même si aucun hôte ne le dépasse seul.
+    """
+    print(f"{banner} \n🔎 Démarrage de l'agrégateur à {datetime.now()}")
+    adresse, _, port = args.agregateur.rpartition(":")
+    liste_autorisee = IndexCIDR.depuis_fichier(args.liste_autorisee) if args.liste_autorisee else None
+    liste_interdite = IndexCIDR.depuis_fichier(args.liste_interdite) if args.liste_interdite else None
+    agregateur = Agregateur(adresse.strip("[]") or "127.0.0.1", int(port), retention=args.retention_agregation,
+                            liste_autorisee=liste_autorisee, liste_interdite=liste_interdite,
+                            notifier=(lambda lignes, rappel: dispatcheur.signaler(*lignes, rappel=rappel)) if dispatcheur else None,
+                            metriques=metriques)
+    agregateur.demarrer()
+    try:
+        agregateur.executer(intervalle_temps=args.intervalle, seuil_alerte=args.seuil, mode=args.fenetre,
+                            prefixe_v4=args.prefixe_v4, prefixe_v6=args.prefixe_v6, periode_analyse=args.periode_agregation)
+    finally:
+        agregateur.fermer()
+
 def main():
     # Gestion des arguments en ligne de commande
     parser = argparse.ArgumentParser(description="Script d'analyse de logs")
-    parser.add_argument("repertoire", help="Chemin vers le répertoire contenant les fichiers de logs", type=str)
+    parser.add_argument("repertoire", help="Chemin vers le répertoire contenant les fichiers de logs (inutile avec --agregateur)", type=str, nargs="?")
     parser.add_argument("--pattern", help="Pattern pour filtrer les fichiers de logs (par défaut 'secure*')", type=str, default="secure*")
+    parser.add_argument("--format", help="Format des logs, détecté pour chaque fichier par défaut ('auto')", type=str, choices=["auto"] + list(PARSEURS), default="auto")
     parser.add_argument("--seuil", help="Seuil d'alerte pour les adresses IP suspectes", type=int, default=2)
     parser.add_argument("--intervalle", help="Intervalle de temps pour l'analyse des accès (par défaut '1min')", type=str, default="1min",)
+    parser.add_argument("--fenetre", help="Mode de comptage : intervalles 'fixe' ou fenêtre 'glissante' (par défaut 'fixe')", type=str, choices=["fixe", "glissante"], default="fixe")
+    parser.add_argument("--prefixe-v4", help="Longueur de préfixe pour compter les accès IPv4 par réseau (par défaut 32 : par adresse)", type=int, choices=range(0, 33), metavar="[0-32]", default=32)
+    parser.add_argument("--prefixe-v6", help="Longueur de préfixe pour compter les accès IPv6 par réseau (par défaut 128 : par adresse)", type=int, choices=range(0, 129), metavar="[0-128]", default=128)
+    parser.add_argument("--liste-autorisee", help="Fichier de réseaux CIDR jamais signalés par la détection de fréquence (un par ligne)", type=str)
+    parser.add_argument("--liste-interdite", help="Fichier de réseaux CIDR toujours signalés comme critiques (un par ligne)", type=str)
     parser.add_argument("--use-gpt", help="Utiliser GPT pour l'analyse des logs avec OpenAI", action="store_true", default=False)
+    parser.add_argument("--gpt-brut", help="Envoyer à GPT les lignes brutes au lieu de leur résumé", action="store_true", default=False)
+    parser.add_argument("--cache-gpt", help="Réutiliser les verdicts de GPT des lignes déjà analysées (chemin du cache, par défaut 'cache_verdicts.db')", type=str, nargs="?", const="cache_verdicts.db")
     parser.add_argument("--notifier", help="Notifier les évènements critiques par e-mail", action="store_true", default=False)
+    parser.add_argument("--fenetre-notification", help="Délai minimal entre deux envois de notifications, en secondes : la première alerte est envoyée aussitôt, les suivantes regroupées (par défaut 5)", type=float, default=5.0)
+    parser.add_argument("--etat-alertes", help="Conserver les alertes envoyées entre les exécutions pour ne pas les renvoyer (chemin de la base, par défaut 'etat_alertes.db')", type=str, nargs="?", const="etat_alertes.db")
     parser.add_argument("--graphe", help="Afficher un graphe des évènements critiques", action="store_true",default=False)
+    parser.add_argument("--graphe-fichier", help="Enregistrer le graphe des évènements critiques dans ce fichier PNG, sans affichage (serveur sans écran)", type=str, metavar="FICHIER")
     parser.add_argument("--slack", help="Notifier les évènements critiques via Slack", action="store_true", default=False)
     parser.add_argument("--persister", help="Persister les évènements critiques dans SQLite", action="store_true", default=False)
+    parser.add_argument("--incremental", help="Ne lire que les nouvelles lignes depuis la dernière exécution (chemin du checkpoint, par défaut 'checkpoint_logs.json')", type=str, nargs="?", const="checkpoint_logs.json")
+    parser.add_argument("--cache-logs", help="Charger depuis un cache les fichiers de logs déjà analysés qui ne changent plus (répertoire du cache, par défaut 'cache_logs')", type=str, nargs="?", const="cache_logs")
+    parser.add_argument("--workers", help="Nombre de processus pour l'analyse parallèle des fichiers (par défaut 1)", type=int, default=1)
+    parser.add_argument("--db", help="Chemin de la base SQLite utilisée par --persister (par défaut 'logs_analyses.db')", type=str, default="logs_analyses.db")
+    parser.add_argument("--retention-jours", help="Durée de conservation des évènements persistés, en jours", type=int)
+    parser.add_argument("--top-ips", help="Afficher les IP les plus critiques de la base SQLite sur les N dernières heures, puis quitter", type=int, metavar="HEURES")
+    parser.add_argument("--historique", help="Conserver des compteurs horaires par IP entre les exécutions (chemin de la base, par défaut 'historique_ips.db')", type=str, nargs="?", const="historique_ips.db")
+    parser.add_argument("--horizon-historique", help="Période de détection des IP récidivistes, en heures (par défaut 24)", type=int, default=24)
+    parser.add_argument("--seuil-historique", help="Seuil d'accès d'une IP sur la période de l'historique (par défaut 50)", type=int, default=50)
+    parser.add_argument("--retention-historique", help="Durée de conservation des compteurs de l'historique, en jours (par défaut 30, au moins --horizon-historique)", type=float, default=30)
+    parser.add_argument("--profile", help="Afficher la durée, les lignes traitées, les octets lus et les succès de cache de chaque étape", action="store_true", default=False)
+    parser.add_argument("--profile-cpu", help="Profiler chaque exécution avec cProfile et écrire les statistiques dans ce fichier (.prof)", type=str, metavar="FICHIER")
+    parser.add_argument("--profile-memoire", help="Mesurer le pic de mémoire de chaque étape avec tracemalloc (ralentit l'analyse)", action="store_true", default=False)
+    parser.add_argument("--metriques-fichier", help="Écrire les métriques au format Prometheus dans ce fichier après chaque exécution (collecteur textfile)", type=str, metavar="FICHIER")
+    parser.add_argument("--metriques-port", help="Exposer les métriques Prometheus sur http://127.0.0.1:PORT/metrics (modes --planifier et --suivre)", type=int, metavar="PORT")
     parser.add_argument("--planifier", help="Planification du script, indiquer le nombre de minutes entre chaque exécution", type=int)
+    parser.add_argument("--suivre", help="Mode démon : suivre les logs en continu et alerter en temps réel", action="store_true", default=False)
+    parser.add_argument("--agent", help="Mode agent : suivre les logs en continu et transmettre les compteurs d'accès par IP à l'agrégateur HOTE:PORT", type=str, metavar="HOTE:PORT")
+    parser.add_argument("--nom-agent", help="Nom de l'hôte transmis à l'agrégateur (par défaut le nom de la machine)", type=str)
+    parser.add_argument("--agregateur", help="Mode agrégateur : recevoir les compteurs des agents sur [ADRESSE:]PORT (127.0.0.1 par défaut) et détecter sur la vue de tous les hôtes", type=str, metavar="[ADRESSE:]PORT")
+    parser.add_argument("--periode-agregation", help="Délai entre deux analyses de la vue globale, en secondes (par défaut 10)", type=float, default=10.0)
+    parser.add_argument("--retention-agregation", help="Durée de conservation des compteurs reçus par l'agrégateur (par défaut '1h')", type=str, default="1h")
     args = parser.parse_args()
+    if args.repertoire is None and not args.agregateur and not args.top_ips:
+        parser.error("le répertoire des logs est obligatoire, sauf avec --agregateur ou --top-ips")
 
-    # Si l'option --planifier est utilisée, planifier l'exécution du script
-    if args.planifier:
-        print(f"\n{Fore.GREEN}[+] 📅 Planification du script toutes les {args.planifier} minutes.")
+    # Mesures des étapes, exportées pour Prometheus si demandé
+    global dispatcheur, etat_alertes, metriques
+    metriques = MetriquesPipeline(args.metriques_fichier, args.profile_cpu, args.profile_memoire)
+    if args.metriques_port is not None:
+        metriques.servir(args.metriques_port)
 
-        # Planifier l'analyse des logs en fonction de l'intervalle spécifié
-        schedule.every(args.planifier).minutes.do(analyser_logs, args=args)
+    # Les notifications sont envoyées par un thread d'arrière-plan, qui regroupe les alertes
+    if args.notifier or args.slack:
+        notification = slack = None
+        if args.notifier:
+            from modules.notification import Notification  # Import de la classe Notification
+            notification = Notification()
+        if args.slack:
+            from modules.notification_slack import SlackNotification  # Pour l'envoi de notifications Slack
+            slack = SlackNotification()
+        dispatcheur = DispatcheurNotifications(notification, slack,
+                                               fenetre=args.fenetre_notification, metriques=metriques)
+        etat_alertes = EtatAlertes(args.etat_alertes)
 
-        # Boucle infinie pour exécuter les tâches planifiées
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
-    else:
-        # Si la planification n'est pas spécifiée, exécuter une seule fois
-        analyser_logs(args)
+    try:
+        # Si l'option --top-ips est utilisée, interroger la base SQLite sans analyser les logs
+        if args.top_ips:
+            print(f"\n{Fore.GREEN}[+] IP les plus critiques sur les {args.top_ips} dernières heures :{Style.RESET_ALL}")
+            for ip, nombre in PersistanceSQLite(args.db).top_ips(heures=args.top_ips):
+                print(f"- IP: {ip}, Nombre d'évènements critiques: {nombre}")
+
+        # Si l'option --suivre est utilisée, suivre les logs en continu
+        elif args.suivre:
+            suivre_logs(args)
+
+        # Modes multi-hôtes : agent de collecte ou agrégateur central
+        elif args.agent:
+            executer_agent(args)
+        elif args.agregateur:
+            executer_agregateur(args)
+
+        # Si l'option --planifier est utilisée, planifier l'exécution du script
+        elif args.planifier:
+            import schedule
+            print(f"\n{Fore.GREEN}[+] 📅 Planification du script toutes les {args.planifier} minutes.")
+
+            # Planifier l'analyse des logs en fonction de l'intervalle spécifié
+            schedule.every(args.planifier).minutes.do(analyser_logs, args=args)
+
+            # Boucle infinie pour exécuter les tâches planifiées
+            while True:
+                schedule.run_pending()
+                time.sleep(1)
+        else:
+            # Si la planification n'est pas spécifiée, exécuter une seule fois
+            analyser_logs(args)
+    finally:
+        # Envoyer les alertes encore en file avant de quitter
+        if dispatcheur:
+            if not dispatcheur.fermer():
+                print(f"{Fore.YELLOW}⚠️ Envoi des notifications inachevé à l'arrêt : les alertes concernées seront de nouveau proposées.{Style.RESET_ALL}")
+            etat_alertes.fermer()  # Après l'arrêt du thread d'envoi, qui enregistre les alertes envoyées
+        metriques.exporter()
+        metriques.fermer()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,105 @@
+"""
+Banc d'essai de l'agrégation multi-hôtes sur localhost : un agrégateur et --agents agents de
+collecte (un par hôte simulé), reliés en TCP. Chaque agent reçoit un bruit de fond aléatoire
+et une attaque répartie : la même IP fait seuil - 1 tentatives par intervalle sur chaque
+hôte, sous le seuil local, mais --agents x (seuil - 1) au total.
+
+Le script vérifie que l'attaque est détectée par l'agrégateur (et qu'aucun hôte ne la
+détecterait seul), puis affiche le débit, le volume transmis par rapport aux lignes de logs
+équivalentes et les compteurs de contrôle de flux.
+
+Usage :
+    python benchmarks/bench_agregation.py --agents 50 --evenements 200000
+    python benchmarks/bench_agregation.py --agents 8 --file-max 1 --fenetre-envoi 1
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.agent_collecte import AgentCollecte
+from modules.agregateur import Agregateur
+from modules.adresses_ip import ip_en_entier
+
+OCTETS_PAR_LIGNE = 110  # Taille moyenne d'une ligne 'secure' d'échec d'authentification
+DEBUT = 1_790_000_000  # Début des évènements simulés (secondes epoch, multiple de 60)
+
+
+def alimenter(agent, evenements, nb_ips, minutes, seuil, attaquant, graine):
+    """
+    Envoie à un agent son bruit de fond et sa part de l'attaque répartie, en ordre chronologique.
+    """
+    aleatoire = random.Random(graine)
+    acces = [(DEBUT + aleatoire.randrange(minutes * 60), ip_en_entier(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"))
+             for i in (aleatoire.randrange(nb_ips) for _ in range(evenements))]
+    acces += [(DEBUT + minute * 60 + essai, attaquant) for minute in range(minutes) for essai in range(seuil - 1)]
+    acces.sort()
+    for seconde, ip in acces:
+        agent.ajouter(ip, seconde * 1_000_000_000)
+    return len(acces)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", help="Nombre d'hôtes simulés", type=int, default=10)
+    parser.add_argument("--evenements", help="Évènements de bruit de fond par hôte", type=int, default=50000)
+    parser.add_argument("--nb-ips", help="Adresses IP distinctes du bruit de fond", type=int, default=100000)
+    parser.add_argument("--minutes", help="Durée simulée, en minutes", type=int, default=10)
+    parser.add_argument("--seuil", type=int, default=10)
+    parser.add_argument("--fenetre-envoi", help="Lots envoyés sans acquittement par agent", type=int, default=4)
+    parser.add_argument("--file-max", help="Lots en attente d'intégration dans l'agrégateur", type=int, default=64)
+    parser.add_argument("--graine", type=int, default=42)
+    args = parser.parse_args()
+
+    agregateur = Agregateur(port=0, retention=f"{args.minutes + 1}min", file_max=args.file_max)
+    agregateur.demarrer()
+    attaquant = ip_en_entier("203.0.113.77")
+
+    debut = time.perf_counter()
+    agents = [AgentCollecte("127.0.0.1", agregateur.port, nom=f"hote{i:03d}", periode_envoi=0.2,
+                            fenetre_envoi=args.fenetre_envoi) for i in range(args.agents)]
+    totaux = [0] * args.agents
+
+    def alimenter_agent(i):
+        totaux[i] = alimenter(agents[i], args.evenements, args.nb_ips, args.minutes, args.seuil, attaquant, args.graine + i)
+
+    threads = [threading.Thread(target=alimenter_agent, args=(i,)) for i in range(args.agents)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for agent in agents:
+        agent.fermer(delai=60)
+    agregateur.attendre_integration()
+    duree_collecte = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    analyseur, nouvelles = agregateur.analyser("1min", args.seuil)
+    duree_analyse = time.perf_counter() - debut
+    agregateur.fermer()
+
+    evenements = sum(totaux)
+    octets = sum(agent.compteurs['octets_envoyes'] for agent in agents)
+    detectees = set(nouvelles['AdresseIP'].astype(str))
+    recus = int(analyseur.df_logs['NombreAcces'].sum())
+    print(f"Agents : {args.agents}, évènements : {evenements}, reçus par l'agrégateur : {recus} "
+          f"({len(analyseur.df_logs)} compteurs analysés)")
+    print(f"Collecte : {duree_collecte:.2f} s ({evenements / duree_collecte:,.0f} évènements/s), analyse globale : {duree_analyse:.2f} s")
+    print(f"Transmis : {octets / 1024:,.0f} Ko en {sum(a.compteurs['lots_envoyes'] for a in agents)} lots, "
+          f"{sum(a.compteurs['entrees_envoyees'] for a in agents)} entrées "
+          f"(~{evenements * OCTETS_PAR_LIGNE / max(octets, 1):.0f}x moins que les lignes de logs)")
+    print(f"Contrôle de flux : {agregateur.compteurs['lots_dupliques']} lot(s) renvoyé(s), "
+          f"{sum(a.compteurs['reconnexions'] for a in agents)} reconnexion(s)")
+    print(f"IP signalées sur la vue globale : {', '.join(sorted(detectees)) or 'aucune'}")
+    if recus != evenements or "203.0.113.77" not in detectees:
+        print("ÉCHEC : attaque répartie non détectée ou compteurs perdus")
+        sys.exit(1)
+    print(f"OK : attaque répartie détectée ({args.seuil - 1} accès par minute et par hôte, seuil {args.seuil})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Mesure le temps de démarrage de analyse.py (important quand l'outil est lancé par cron
+chaque minute) : durée de 'python analyse.py --help' dans un nouveau processus, temps
+d'import des modules (python -X importtime) et dépendances lourdes chargées au démarrage.
+
+Usage :
+    python benchmarks/bench_demarrage.py --repetitions 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RACINE = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Dépendances qui ne doivent être chargées que par les options qui les utilisent
+DEPENDANCES_LOURDES = ["matplotlib", "openai", "requests", "emoji", "schedule", "smtplib"]
+
+
+def duree_aide(repetitions):
+    """
+    Durées (en secondes) de 'python analyse.py --help', chacune dans un nouveau processus.
+    """
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        subprocess.run([sys.executable, "analyse.py", "--help"], cwd=RACINE, stdout=subprocess.DEVNULL, check=True)
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+
+def temps_imports():
+    """
+    Renvoie les modules importés directement par analyse.py avec leur temps d'import cumulé
+    (en millisecondes), triés du plus lent au plus rapide, d'après 'python -X importtime'.
+    """
+    resultat = subprocess.run([sys.executable, "-X", "importtime", "-c", "import analyse"], cwd=RACINE,
+                              capture_output=True, text=True, check=True)
+    modules = []
+    for ligne in resultat.stderr.splitlines():
+        if not ligne.startswith("import time:") or "cumulative" in ligne:
+            continue
+        _, cumul, nom = ligne[len("import time:"):].split("|")
+        if nom.startswith("   ") and not nom.startswith("    "):  # Imports de premier niveau de analyse.py
+            modules.append((nom.strip(), int(cumul) / 1000))
+    return sorted(modules, key=lambda module: module[1], reverse=True)
+
+
+def dependances_chargees():
+    """
+    Renvoie les dépendances lourdes présentes dans sys.modules après 'import analyse'.
+    """
+    code = f"import sys, analyse; print(','.join(m for m in {DEPENDANCES_LOURDES!r} if m in sys.modules))"
+    sortie = subprocess.run([sys.executable, "-c", code], cwd=RACINE, capture_output=True, text=True, check=True).stdout.strip()
+    return [module for module in sortie.split(",") if module]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--json", help="Afficher les résultats en JSON", action="store_true")
+    args = parser.parse_args()
+
+    durees = duree_aide(args.repetitions)
+    modules = temps_imports()
+    chargees = dependances_chargees()
+
+    if args.json:
+        print(json.dumps({'aide_min_secondes': round(min(durees), 4), 'aide_mediane_secondes': round(statistics.median(durees), 4),
+                          'imports_ms': dict(modules), 'dependances_chargees': chargees}, indent=2))
+        return
+    print(f"python analyse.py --help : min {min(durees):.3f} s, médiane {statistics.median(durees):.3f} s ({args.repetitions} exécutions)")
+    print("\nImports de analyse.py (temps cumulé) :")
+    for nom, duree in modules[:10]:
+        print(f"  {nom:<40}{duree:>9.1f} ms")
+    print(f"\nDépendances lourdes chargées au démarrage : {', '.join(chargees) or 'aucune'}")
+
+
+if __name__ == "__main__":
+    main()
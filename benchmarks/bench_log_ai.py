@@ -0,0 +1,64 @@
+"""
+Mesure le temps d'analyse GPT d'un fichier de logs complet par LogAI, hors ligne, contre le
+serveur local (serveur_openai_local.py) : envoi séquentiel des lots (concurrence 1) contre
+envoi parallèle, avec une latence par requête et un taux d'erreurs 429 paramétrables.
+
+Usage :
+    python benchmarks/bench_log_ai.py --lignes 20000 --latence 0.5 --taux-erreur 0.1 --concurrence 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generateur_logs import generer_lignes
+from serveur_openai_local import GestionnaireOpenAI, demarrer_serveur
+from modules.log_ai import LogAI
+
+
+def mesurer(logs, concurrence, budget_tokens):
+    """
+    Analyse les logs et renvoie (durée, rapport, compteurs du serveur).
+    """
+    for cle in GestionnaireOpenAI.compteurs:
+        GestionnaireOpenAI.compteurs[cle] = 0
+    analyseur = LogAI(logs, budget_tokens=budget_tokens, concurrence=concurrence)
+    debut = time.perf_counter()
+    rapport = analyseur.analyser_logs_avec_gpt()
+    return time.perf_counter() - debut, rapport, dict(GestionnaireOpenAI.compteurs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lignes", type=int, default=20000)
+    parser.add_argument("--latence", type=float, default=0.5)
+    parser.add_argument("--taux-erreur", type=float, default=0.1)
+    parser.add_argument("--concurrence", type=int, default=8)
+    parser.add_argument("--budget-tokens", type=int, default=3000)
+    args = parser.parse_args()
+
+    serveur = demarrer_serveur(0, args.latence, args.taux_erreur)
+    logs = list(generer_lignes(args.lignes))
+
+    # LogAI lit config.ini dans le répertoire courant
+    with tempfile.TemporaryDirectory() as repertoire:
+        with open(os.path.join(repertoire, "config.ini"), "w") as f:
+            f.write(f"[openai]\napi_key = local\nbase_url = http://127.0.0.1:{serveur.server_address[1]}/v1\n")
+        os.chdir(repertoire)
+
+        print(f"{args.lignes} lignes, latence {args.latence}s, {args.taux_erreur:.0%} de réponses 429")
+        for concurrence in (1, args.concurrence):
+            duree, rapport, compteurs = mesurer(logs, concurrence, args.budget_tokens)
+            print(f"concurrence {concurrence:3d} : {duree:7.2f} s, {rapport['nombre_lots']} lots, "
+                  f"{len(rapport['resultats'])} verdicts, {rapport['intrusions_detectees']} intrusions, "
+                  f"{len(rapport['erreurs'])} lots en échec, {compteurs['erreurs']} réponses 429 réessayées, "
+                  f"{compteurs['max_simultanees']} requêtes simultanées au plus")
+    serveur.shutdown()
+
+
+if __name__ == "__main__":
+    main()
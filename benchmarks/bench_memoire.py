@@ -0,0 +1,89 @@
+"""
+Compare le pic de mémoire (RSS) de la construction de df_logs : ancienne accumulation
+d'un dictionnaire par ligne contre les tampons typés en colonnes de LogReader.
+Chaque variante est exécutée dans un processus séparé pour mesurer son propre pic.
+
+Usage :
+    python benchmarks/bench_memoire.py --taille-mo 1024 --ratio-echecs 0.5
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+RACINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RACINE)
+
+
+def construire_ancien(chemin):
+    """
+    Chemin historique : une liste de dictionnaires puis pd.DataFrame(liste).
+    """
+    import pandas as pd
+    from modules.log_parser import ParseurSshd
+
+    parseur = ParseurSshd()
+    lignes_extraites_dict = []
+    with open(chemin, 'rb') as f:
+        for ligne in f:
+            resultat = parseur.analyser_ligne(ligne)
+            if resultat:
+                date_heure, evenement, utilisateur, adresse_ip = resultat
+                lignes_extraites_dict.append({
+                    'DateHeure': date_heure,
+                    'Evenement': evenement,
+                    'Utilisateur': utilisateur,
+                    'AdresseIP': adresse_ip
+                })
+    return pd.DataFrame(lignes_extraites_dict)
+
+
+def construire_nouveau(chemin):
+    """
+    Chemin actuel : LogReader et BlocEvenements.
+    """
+    from modules.log_reader import LogReader
+
+    lecteur = LogReader(os.path.dirname(chemin))
+    lecteur.lire_et_extraire_logs(chemin)
+    lecteur.creer_dataframe()
+    return lecteur.df_logs
+
+
+def mesurer(variante, chemin):
+    """
+    Exécuté dans le processus enfant : construit le DataFrame et affiche les mesures.
+    """
+    debut = time.perf_counter()
+    df = (construire_ancien if variante == "ancien" else construire_nouveau)(chemin)
+    duree = time.perf_counter() - debut
+    pic_mo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss en Ko sous Linux
+    taille_df_mo = df.memory_usage(deep=True).sum() / 1024 / 1024
+    print(f"{variante:<8} {len(df):>10} lignes  {duree:7.2f} s  pic RSS {pic_mo:9.1f} Mo  df_logs {taille_df_mo:8.1f} Mo")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark mémoire de la construction de df_logs")
+    parser.add_argument("--fichier", help="Fichier de logs existant à utiliser", type=str)
+    parser.add_argument("--taille-mo", help="Taille du fichier synthétique en Mo", type=int, default=256)
+    parser.add_argument("--ratio-echecs", help="Proportion de lignes d'échec dans le fichier synthétique", type=float, default=0.5)
+    parser.add_argument("--variante", help=argparse.SUPPRESS, choices=["ancien", "nouveau"])
+    args = parser.parse_args()
+
+    if args.variante:
+        mesurer(args.variante, args.fichier)
+        sys.exit(0)
+
+    chemin = args.fichier
+    if not chemin:
+        from generateur_logs import generer_fichier
+        chemin = os.path.join(tempfile.gettempdir(), f"secure_bench_{args.taille_mo}mo_{args.ratio_echecs}")
+        if not os.path.exists(chemin):
+            print(f"[+] Génération de {chemin} ({args.taille_mo} Mo)...")
+            generer_fichier(chemin, args.taille_mo, ratio_echecs=args.ratio_echecs)
+
+    for variante in ("ancien", "nouveau"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--variante", variante, "--fichier", chemin], check=True)
@@ -0,0 +1,141 @@
+"""
+Mesure le temps pendant lequel la détection est bloquée par l'envoi de ses alertes, contre
+des serveurs locaux imitant un relais SMTP et un webhook Slack (latence paramétrable) :
+ancien envoi en ligne (une connexion SMTP et une requête HTTP par alerte) contre
+DispatcheurNotifications (mise en file, regroupement, connexions réutilisées).
+
+Usage :
+    python benchmarks/bench_notifications.py --alertes 50 --latence 0.2
+"""
+import argparse
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.notification import Notification
+from modules.notification_slack import SlackNotification
+from modules.notification_dispatcher import DispatcheurNotifications
+
+COMPTEURS = {'connexions_smtp': 0, 'emails': 0, 'webhooks': 0}
+LATENCE = {'secondes': 0.0}
+
+
+class GestionnaireSMTP(socketserver.StreamRequestHandler):
+    """
+    Relais SMTP minimal, sans TLS : accepte toute authentification PLAIN et tout message.
+    """
+    def repondre(self, ligne):
+        self.wfile.write(ligne.encode() + b"\r\n")
+
+    def handle(self):
+        COMPTEURS['connexions_smtp'] += 1
+        time.sleep(LATENCE['secondes'])  # Établissement de la connexion
+        self.repondre("220 localhost ESMTP")
+        for ligne in self.rfile:
+            commande = ligne.decode(errors='replace').strip().upper()
+            if commande.startswith(("EHLO", "HELO")):
+                self.repondre("250-localhost")
+                self.repondre("250 AUTH PLAIN")
+            elif commande.startswith("AUTH"):
+                time.sleep(LATENCE['secondes'])
+                self.repondre("235 Authentication successful")
+            elif commande == "DATA":
+                self.repondre("354 End data with <CR><LF>.<CR><LF>")
+                for donnees in self.rfile:
+                    if donnees in (b".\r\n", b".\n"):
+                        break
+                time.sleep(LATENCE['secondes'])
+                COMPTEURS['emails'] += 1
+                self.repondre("250 OK")
+            elif commande == "QUIT":
+                self.repondre("221 Bye")
+                return
+            else:  # MAIL, RCPT, NOOP, RSET
+                self.repondre("250 OK")
+
+
+class GestionnaireWebhook(BaseHTTPRequestHandler):
+    """
+    Webhook Slack minimal : répond 200 après la latence configurée.
+    """
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(LATENCE['secondes'])
+        COMPTEURS['webhooks'] += 1
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def demarrer_serveurs():
+    """
+    Démarre les serveurs SMTP et HTTP dans des threads et renvoie leurs ports.
+    """
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    smtp = socketserver.ThreadingTCPServer(("127.0.0.1", 0), GestionnaireSMTP)
+    smtp.daemon_threads = True
+    http = ThreadingHTTPServer(("127.0.0.1", 0), GestionnaireWebhook)
+    for serveur in (smtp, http):
+        threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return smtp.server_address[1], http.server_address[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alertes", type=int, default=50)
+    parser.add_argument("--latence", help="Latence de chaque étape des serveurs, en secondes", type=float, default=0.2)
+    parser.add_argument("--fenetre", help="Fenêtre de regroupement du dispatcheur, en secondes", type=float, default=1.0)
+    args = parser.parse_args()
+
+    LATENCE['secondes'] = args.latence
+    port_smtp, port_http = demarrer_serveurs()
+    config = os.path.join(tempfile.mkdtemp(), "config.ini")
+    with open(config, "w") as f:
+        f.write(f"[smtp]\nserver = 127.0.0.1\nport = {port_smtp}\nuser = bench\npassword = bench\nstarttls = false\n"
+                f"[email]\nrecipient = soc@localhost\n"
+                f"[slack]\nwebhook_url = http://127.0.0.1:{port_http}/webhook\n")
+    alertes = [f"{i} accès de l'IP 10.0.{i // 256}.{i % 256} en moins de 1min" for i in range(args.alertes)]
+    sortie = sys.stdout
+
+    # Ancien comportement : chaque alerte est envoyée en ligne, sur une nouvelle connexion
+    sys.stdout = open(os.devnull, "w")
+    debut = time.perf_counter()
+    for alerte in alertes:
+        notification = Notification(config)
+        notification.envoyer_email("Alerte", alerte)
+        notification.fermer()
+        SlackNotification(config_path=config).envoyer_notification(alerte)
+    bloque_ancien = time.perf_counter() - debut
+    compteurs_ancien = dict(COMPTEURS)
+    for cle in COMPTEURS:
+        COMPTEURS[cle] = 0
+
+    # Dispatcheur : mise en file immédiate, envoi regroupé en arrière-plan
+    dispatcheur = DispatcheurNotifications(Notification(config), SlackNotification(config_path=config), fenetre=args.fenetre)
+    debut = time.perf_counter()
+    for alerte in alertes:
+        dispatcheur.signaler(alerte)
+    bloque_dispatcheur = time.perf_counter() - debut
+    dispatcheur.fermer()
+    total_dispatcheur = time.perf_counter() - debut
+    sys.stdout = sortie
+
+    print(f"{args.alertes} alertes, latence serveur {args.latence}s")
+    print(f"envoi en ligne : détection bloquée {bloque_ancien:7.2f} s, {compteurs_ancien['connexions_smtp']} connexions SMTP, "
+          f"{compteurs_ancien['emails']} emails, {compteurs_ancien['webhooks']} webhooks")
+    print(f"dispatcheur    : détection bloquée {bloque_dispatcheur * 1000:7.2f} ms, livraison en {total_dispatcheur:.2f} s, "
+          f"{COMPTEURS['connexions_smtp']} connexions SMTP, {COMPTEURS['emails']} emails, {COMPTEURS['webhooks']} webhooks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compare le débit (lignes/s) du parsing sshd : ancienne boucle re.search sur la regex
+non compilée contre le ParseurSshd (regex compilée + pré-filtre par mots-clés).
+
+Usage :
+    python benchmarks/bench_parsing.py --taille-mo 2048
+    python benchmarks/bench_parsing.py --fichier /var/log/secure
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.log_parser import ParseurSshd
+from generateur_logs import generer_fichier
+
+ANCIENNE_REGEX = r"^([A-Za-z]{3}\s+\d{1,2}\s+(?:\d{4}\s+)?\d{2}:\d{2}:\d{2}).*?\s+(Invalid user|Failed password|authentication failure).*?\s+(\w+)\s+from\s+(\d{1,3}(?:\.\d{1,3}){3})(?:\s+port\s+\d+.*)?$"
+
+
+def parser_ancien(chemin):
+    """
+    Chemin historique de LogReader.lire_et_extraire_logs.
+    """
+    nb_lignes = nb_extraits = 0
+    with open(chemin, 'r') as f:
+        for ligne in f:
+            nb_lignes += 1
+            if re.search(ANCIENNE_REGEX, ligne):
+                nb_extraits += 1
+    return nb_lignes, nb_extraits
+
+
+def parser_nouveau(chemin):
+    """
+    Chemin actuel : lecture binaire et ParseurSshd.
+    """
+    parseur = ParseurSshd()
+    nb_lignes = nb_extraits = 0
+    with open(chemin, 'rb') as f:
+        for ligne in f:
+            nb_lignes += 1
+            if parseur.analyser_ligne(ligne):
+                nb_extraits += 1
+    return nb_lignes, nb_extraits
+
+
+def mesurer(nom, fonction, chemin):
+    debut = time.perf_counter()
+    nb_lignes, nb_extraits = fonction(chemin)
+    duree = time.perf_counter() - debut
+    print(f"{nom:<8} {nb_lignes:>12} lignes  {nb_extraits:>10} extraites  {duree:8.2f} s  {nb_lignes / duree:>12,.0f} lignes/s")
+    return nb_lignes / duree, nb_extraits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du parsing sshd")
+    parser.add_argument("--fichier", help="Fichier de logs existant à utiliser", type=str)
+    parser.add_argument("--taille-mo", help="Taille du fichier synthétique en Mo", type=int, default=512)
+    args = parser.parse_args()
+
+    chemin = args.fichier
+    if not chemin:
+        chemin = os.path.join(tempfile.gettempdir(), f"secure_bench_{args.taille_mo}mo")
+        if not os.path.exists(chemin):
+            print(f"[+] Génération de {chemin} ({args.taille_mo} Mo)...")
+            generer_fichier(chemin, args.taille_mo)
+
+    debit_ancien, extraits_ancien = mesurer("ancien", parser_ancien, chemin)
+    debit_nouveau, extraits_nouveau = mesurer("nouveau", parser_nouveau, chemin)
+    if extraits_ancien != extraits_nouveau:
+        print("⚠️ Les deux chemins n'extraient pas le même nombre de lignes !")
+    print(f"Accélération : x{debit_nouveau / debit_ancien:.1f}")
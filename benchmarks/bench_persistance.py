@@ -0,0 +1,99 @@
+"""
+Compare le débit (lignes/s) de la persistance SQLite : ancienne boucle iterrows avec
+SELECT COUNT(*) puis INSERT par ligne, contre l'écriture en masse de PersistanceSQLite.
+Chaque chemin est mesuré sur une base neuve, puis une seconde fois (toutes les lignes
+sont alors des doublons). Les requêtes du stockage partitionné sont ensuite chronométrées.
+
+Usage :
+    python benchmarks/bench_persistance.py --lignes 1000000 --lignes-ancien 20000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.persistance import PersistanceSQLite
+
+
+def generer_dataframe(nb_lignes, graine=42):
+    """
+    DataFrame synthétique au format de LogReader.creer_dataframe().
+    """
+    aleatoire = np.random.default_rng(graine)
+    secondes = np.sort(aleatoire.integers(0, 30 * 86400, nb_lignes))
+    ips = aleatoire.integers(0, 2 ** 32, 5000, dtype=np.uint64)
+    return pd.DataFrame({
+        'DateHeure': pd.Timestamp.now().floor('s') - pd.to_timedelta(secondes, unit='s'),
+        'Evenement': pd.Categorical.from_codes(aleatoire.integers(0, 3, nb_lignes),
+                                               ["Failed password", "Invalid user", "authentication failure"]),
+        'Utilisateur': pd.Categorical.from_codes(aleatoire.integers(0, 4, nb_lignes), ["root", "admin", "test", "oracle"]),
+        'AdresseIP': pd.Categorical([f"{ip >> 24}.{(ip >> 16) & 255}.{(ip >> 8) & 255}.{ip & 255}"
+                                     for ip in ips[aleatoire.integers(0, 5000, nb_lignes)].tolist()]),
+    })
+
+
+def persister_ancien(df_logs, chemin_db):
+    """
+    Chemin historique de LogAnalyzer.persister_evenements_critique (sans les print par ligne).
+    """
+    cn = sqlite3.connect(chemin_db)
+    cur = cn.cursor()
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS evenement_suspect (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date_heure DATETIME, evenement TEXT, utilisateur TEXT, adresse_ip TEXT,
+            UNIQUE(date_heure, evenement, utilisateur, adresse_ip)
+        )
+    ''')
+    cn.commit()
+    for _, ligne in df_logs.iterrows():
+        date_formatted = ligne['DateHeure'].strftime('%Y-%m-%d %H:%M:%S')
+        cur.execute('''
+            SELECT COUNT(*) FROM evenement_suspect
+            WHERE date_heure = ? AND evenement = ? AND utilisateur = ? AND adresse_ip = ?
+        ''', (date_formatted, ligne['Evenement'], ligne['Utilisateur'], ligne['AdresseIP']))
+        if cur.fetchone()[0] == 0:
+            cur.execute('''
+                INSERT INTO evenement_suspect (date_heure, evenement, utilisateur, adresse_ip)
+                VALUES (?, ?, ?, ?)
+            ''', (date_formatted, ligne['Evenement'], ligne['Utilisateur'], ligne['AdresseIP']))
+    cn.commit()
+    cn.close()
+
+
+def mesurer(nom, fonction, df_logs, chemin_db):
+    for passage in ("base neuve", "doublons"):
+        debut = time.perf_counter()
+        fonction(df_logs, chemin_db)
+        duree = time.perf_counter() - debut
+        print(f"{nom:<8} {passage:<11} {len(df_logs):>10} lignes  {duree:8.2f} s  {len(df_logs) / duree:>12,.0f} lignes/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la persistance SQLite")
+    parser.add_argument("--lignes", help="Nombre de lignes pour l'écriture en masse", type=int, default=1_000_000)
+    parser.add_argument("--lignes-ancien", help="Nombre de lignes pour l'ancien chemin (très lent)", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repertoire:
+        mesurer("ancien", persister_ancien, generer_dataframe(args.lignes_ancien), os.path.join(repertoire, "ancien.db"))
+        chemin_db = os.path.join(repertoire, "nouveau.db")
+        mesurer("nouveau", lambda df, db: PersistanceSQLite(db).inserer_evenements(df),
+                generer_dataframe(args.lignes), chemin_db)
+
+        # Requêtes sur le stockage partitionné
+        stockage = PersistanceSQLite(chemin_db)
+        for heures in (1, 24, 24 * 7):
+            debut = time.perf_counter()
+            top = stockage.top_ips(heures=heures)
+            print(f"top_ips({heures:>3} h)     {(time.perf_counter() - debut) * 1000:8.1f} ms")
+        debut = time.perf_counter()
+        stockage.evenements_ip(top[0][0], heures=24 * 30)
+        print(f"evenements_ip(30 j) {(time.perf_counter() - debut) * 1000:8.1f} ms")
@@ -0,0 +1,207 @@
+"""
+Benchmark de bout en bout de la chaîne d'analyse de analyse.py, étape par étape, sur des
+fichiers 'secure' synthétiques (voir generateur_logs.py) :
+découverte des fichiers, analyse des lignes, conversion des dates, construction du DataFrame,
+analyse de fréquence, persistance SQLite et mise en forme des notifications.
+
+Pour chaque étape sont mesurés la durée (meilleure de --repetitions exécutions), le pic de
+mémoire Python alloué pendant l'étape (tracemalloc, lors d'une exécution séparée afin de ne
+pas fausser les durées) et le nombre de lignes produites. Les résultats sont écrits en JSON
+pour être comparés d'un commit à l'autre avec --comparer.
+
+Usage :
+    python benchmarks/bench_pipeline.py --taille-mo 200 --sortie pipeline_avant.json
+    python benchmarks/bench_pipeline.py --taille-mo 200 --comparer pipeline_avant.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+RACINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RACINE)
+
+from generateur_logs import generer_fichier, lire_melange
+from modules.log_reader import LogReader
+from modules.log_analyzer import LogAnalyzer
+from modules.notification_dispatcher import DispatcheurNotifications
+
+ETAPES = ["decouverte", "analyse", "dates", "dataframe", "frequence", "persistance", "notification"]
+
+
+class Mesures:
+    """
+    Durée, pic de mémoire et nombre de lignes de chaque étape d'une exécution.
+    """
+    def __init__(self, memoire=False):
+        self.memoire = memoire
+        self.etapes = {}
+
+    @contextlib.contextmanager
+    def etape(self, nom):
+        resultat = {}
+        if self.memoire:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        debut = time.perf_counter()
+        yield resultat
+        duree = time.perf_counter() - debut
+        self.etapes[nom] = {'secondes': duree, 'lignes': resultat.get('lignes')}
+        if self.memoire:
+            self.etapes[nom]['pic_memoire_mo'] = (tracemalloc.get_traced_memory()[1] - base) / 1024 / 1024
+
+
+def executer_pipeline(repertoire, args, mesures):
+    """
+    Exécute la chaîne d'analyse complète sur le répertoire, comme analyser_logs.
+    """
+    with mesures.etape("decouverte") as resultat:
+        lecteur = LogReader(repertoire)
+        fichiers = lecteur.trouver_fichiers_logs("secure*")
+        resultat['lignes'] = len(fichiers)
+
+    with mesures.etape("analyse") as resultat:
+        lecteur.lire_et_extraire_fichiers(fichiers, args.workers)
+        resultat['lignes'] = len(lecteur.bloc_extrait)
+
+    with mesures.etape("dates") as resultat:
+        resultat['lignes'] = len(lecteur.bloc_extrait.horodatages_ns())
+
+    with mesures.etape("dataframe") as resultat:  # Inclut à nouveau la conversion des dates
+        lecteur.creer_dataframe()
+        resultat['lignes'] = len(lecteur.df_logs)
+
+    with mesures.etape("frequence") as resultat:
+        analyseur = LogAnalyzer(lecteur.df_logs)
+        critiques = analyseur.analyser_frequence_ips(args.intervalle, args.seuil, args.fenetre)
+        resultat['lignes'] = len(critiques or [])
+
+    with tempfile.TemporaryDirectory() as dossier:
+        with mesures.etape("persistance") as resultat:
+            resultat['lignes'] = analyseur.persister_evenements_critique(os.path.join(dossier, "bench.db"))['inseres']
+
+    dispatcheur = DispatcheurNotifications(None, None)  # Sans canal : mise en forme seule
+    with mesures.etape("notification") as resultat:
+        lignes = analyseur.resumer_alertes()
+        dispatcheur.envoyer_lot(lignes)
+        resultat['lignes'] = len(lignes)
+    dispatcheur.fermer()
+
+
+def preparer_donnees(args):
+    """
+    Génère (une seule fois par jeu de paramètres) les fichiers synthétiques et renvoie leur répertoire.
+    """
+    nom = f"bench_pipeline_{args.taille_mo}mo_{args.fichiers}f_{args.ratio_echecs}_{args.nb_ips}ips_{args.attaques or 'dispersee'}_{args.graine}"
+    repertoire = os.path.join(tempfile.gettempdir(), nom.replace(",", "_").replace("=", "-"))
+    if not os.path.isdir(repertoire):
+        print(f"[+] Génération de {repertoire}...", file=sys.stderr)
+        os.makedirs(repertoire + ".tmp", exist_ok=True)
+        for i in range(args.fichiers):
+            nom_fichier = "secure" if i == 0 else f"secure-{i}"
+            generer_fichier(os.path.join(repertoire + ".tmp", nom_fichier), args.taille_mo / args.fichiers, args.ratio_echecs,
+                            args.nb_ips, args.graine + i, lire_melange(args.attaques) if args.attaques else None)
+        os.replace(repertoire + ".tmp", repertoire)
+    return repertoire
+
+
+def version_code():
+    """
+    Renvoie le commit courant du dépôt (suffixé par '+' si l'arbre est modifié), ou None.
+    """
+    try:
+        commit = subprocess.run(["git", "-C", RACINE, "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        modifie = subprocess.run(["git", "-C", RACINE, "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+        return commit + ("+" if modifie else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparer(resultats, reference):
+    """
+    Affiche, pour chaque étape, la durée et le pic de mémoire par rapport à une exécution de référence.
+    """
+    print(f"\nComparaison avec {reference.get('commit')} ({reference.get('date')}) :")
+    print(f"{'étape':<14}{'avant (s)':>11}{'après (s)':>11}{'ratio':>8}{'mém. avant':>12}{'mém. après':>12}")
+    for nom in ETAPES + ['total']:
+        avant = reference['etapes'].get(nom) if nom != 'total' else {'secondes': reference['total_secondes']}
+        apres = resultats['etapes'].get(nom) if nom != 'total' else {'secondes': resultats['total_secondes']}
+        if not avant or not apres:
+            continue
+        ratio = apres['secondes'] / avant['secondes'] if avant['secondes'] else float('nan')
+        memoire = "".join(f"{m['pic_memoire_mo']:>10.1f}Mo" if 'pic_memoire_mo' in m else " " * 12 for m in (avant, apres))
+        print(f"{nom:<14}{avant['secondes']:>11.3f}{apres['secondes']:>11.3f}{ratio:>7.2f}x{memoire}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repertoire", help="Répertoire de logs existant à utiliser au lieu des fichiers synthétiques", type=str)
+    parser.add_argument("--taille-mo", help="Taille totale des fichiers synthétiques en Mo", type=int, default=100)
+    parser.add_argument("--fichiers", help="Nombre de fichiers synthétiques (rotations)", type=int, default=3)
+    parser.add_argument("--ratio-echecs", help="Proportion de lignes d'échec d'authentification", type=float, default=0.05)
+    parser.add_argument("--nb-ips", help="Nombre d'adresses IP distinctes du bruit de fond", type=int, default=5000)
+    parser.add_argument("--attaques", help="Mélange des échecs, ex. 'force_brute=0.3,distribuee=0.2,dispersee=0.5'", type=str)
+    parser.add_argument("--graine", help="Graine du générateur aléatoire", type=int, default=42)
+    parser.add_argument("--seuil", help="Seuil d'alerte (par défaut 2, comme analyse.py)", type=int, default=2)
+    parser.add_argument("--intervalle", type=str, default="1min")
+    parser.add_argument("--fenetre", choices=["fixe", "glissante"], default="fixe")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repetitions", help="Nombre d'exécutions chronométrées (la meilleure est retenue)", type=int, default=3)
+    parser.add_argument("--sans-memoire", help="Ne pas mesurer le pic de mémoire (exécution tracemalloc)", action="store_true")
+    parser.add_argument("--sortie", help="Fichier JSON des résultats (sortie standard par défaut)", type=str)
+    parser.add_argument("--comparer", help="Fichier JSON d'une exécution précédente à comparer", type=str)
+    args = parser.parse_args()
+
+    repertoire = args.repertoire or preparer_donnees(args)
+    fichiers = [os.path.join(repertoire, f) for f in os.listdir(repertoire) if f.startswith("secure")]
+
+    executions = []
+    for _ in range(args.repetitions):
+        mesures = Mesures()
+        with contextlib.redirect_stdout(io.StringIO()):
+            executer_pipeline(repertoire, args, mesures)
+        executions.append(mesures.etapes)
+    etapes = {nom: min((execution[nom] for execution in executions), key=lambda m: m['secondes']) for nom in ETAPES}
+
+    if not args.sans_memoire:
+        mesures = Mesures(memoire=True)
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            executer_pipeline(repertoire, args, mesures)
+        tracemalloc.stop()
+        for nom in ETAPES:
+            etapes[nom]['pic_memoire_mo'] = round(mesures.etapes[nom]['pic_memoire_mo'], 2)
+
+    resultats = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'commit': version_code(),
+        'python': platform.python_version(),
+        'parametres': {cle: valeur for cle, valeur in vars(args).items() if cle not in ('sortie', 'comparer')},
+        'donnees': {'fichiers': len(fichiers), 'octets': sum(os.path.getsize(f) for f in fichiers)},
+        'etapes': {nom: {cle: round(valeur, 4) if isinstance(valeur, float) else valeur for cle, valeur in mesure.items()}
+                   for nom, mesure in etapes.items()},
+        'total_secondes': round(sum(mesure['secondes'] for mesure in etapes.values()), 4),
+    }
+
+    texte = json.dumps(resultats, indent=2, ensure_ascii=False)
+    if args.sortie:
+        with open(args.sortie, "w") as f:
+            f.write(texte + "\n")
+        print(f"[+] Résultats écrits dans {args.sortie}", file=sys.stderr)
+    else:
+        print(texte)
+    if args.comparer:
+        with open(args.comparer) as f:
+            comparer(resultats, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Générateur déterministe de fichiers 'secure' synthétiques pour les benchmarks.
+
+Les échecs d'authentification suivent un mélange d'attaques paramétrable (--attaques) :
+- dispersee     : bruit de fond, une IP et un utilisateur au hasard parmi nb_ips adresses ;
+- force_brute   : quelques IP qui visent root et admin, chacune à son tour par rafales de 10 minutes ;
+- distribuee    : une attaque répartie sur les adresses d'un même /24, peu d'essais par adresse ;
+- pulverisation : une IP qui essaie un grand nombre de noms d'utilisateurs (password spraying) ;
+- ipv6          : des échecs provenant des adresses d'un même /64 IPv6.
+
+Usage :
+    python benchmarks/generateur_logs.py /tmp/secure_bench --taille-mo 2048
+    python benchmarks/generateur_logs.py /tmp/secure_bench --taille-mo 100 --attaques force_brute=0.3,distribuee=0.2,dispersee=0.5
+"""
+import argparse
+import random
+
+MOIS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Lignes "normales" d'un fichier secure, qui ne doivent pas être extraites
+LIGNES_NORMALES = [
+    "sshd[{pid}]: Accepted publickey for deploy from {ip} port {port} ssh2: RSA SHA256:abcdef",
+    "sshd[{pid}]: pam_unix(sshd:session): session opened for user deploy by (uid=0)",
+    "sshd[{pid}]: pam_unix(sshd:session): session closed for user deploy",
+    "sshd[{pid}]: Received disconnect from {ip} port {port}:11: disconnected by user",
+    "sshd[{pid}]: Disconnected from user deploy {ip} port {port}",
+    "sudo[{pid}]:   deploy : TTY=pts/0 ; PWD=/home/deploy ; USER=root ; COMMAND=/bin/systemctl status sshd",
+    "sudo[{pid}]: pam_unix(sudo:session): session opened for user root by deploy(uid=1000)",
+    "systemd[1]: Started Session {pid} of user deploy.",
+    "CRON[{pid}]: pam_unix(cron:session): session opened for user root by (uid=0)",
+]
+
+# Lignes d'échec d'authentification, extraites par le ParseurSshd
+LIGNES_ECHECS = [
+    "sshd[{pid}]: Failed password for {user} from {ip} port {port} ssh2",
+    "sshd[{pid}]: Failed password for invalid user {user} from {ip} port {port} ssh2",
+    "sshd[{pid}]: Invalid user {user} from {ip} port {port}",
+]
+
+UTILISATEURS = ["root", "admin", "test", "oracle", "ubuntu", "git", "postgres", "user", "guest", "deploy"]
+ATTAQUES = ["dispersee", "force_brute", "distribuee", "pulverisation", "ipv6"]
+
+
+def lire_melange(texte):
+    """
+    Convertit un mélange d'attaques "type=poids,type=poids" en dictionnaire de proportions.
+    """
+    melange = {}
+    for element in texte.split(","):
+        attaque, _, poids = element.partition("=")
+        if attaque.strip() not in ATTAQUES:
+            raise ValueError(f"Type d'attaque inconnu : {attaque} (types : {', '.join(ATTAQUES)})")
+        melange[attaque.strip()] = float(poids or 1)
+    total = sum(melange.values())
+    return {attaque: poids / total for attaque, poids in melange.items()}
+
+
+def generer_lignes(nb_lignes, ratio_echecs=0.05, nb_ips=5000, graine=42, melange=None):
+    """
+    Génère nb_lignes lignes de log chronologiques, dont une proportion ratio_echecs
+    d'échecs d'authentification provenant de nb_ips adresses distinctes, répartis entre les
+    types d'attaque selon les proportions du dictionnaire melange (par défaut : uniquement
+    des échecs dispersés). Le résultat ne dépend que des paramètres et de la graine.
+    """
+    aleatoire = random.Random(graine)
+    ips = [f"{aleatoire.randint(1, 223)}.{aleatoire.randint(0, 255)}.{aleatoire.randint(0, 255)}.{aleatoire.randint(1, 254)}"
+           for _ in range(nb_ips)]
+    if melange:
+        # Sources des attaques ciblées, tirées après les IP de fond pour ne pas modifier ces dernières
+        attaquants = ips[:max(1, nb_ips // 1000)]
+        sous_reseau = f"{aleatoire.randint(1, 223)}.{aleatoire.randint(0, 255)}.{aleatoire.randint(0, 255)}"
+        pulverisateur = aleatoire.choice(ips)
+        prefixe_v6 = f"2001:db8:{aleatoire.randint(0, 0xffff):x}:{aleatoire.randint(0, 0xffff):x}"
+        types_attaque, poids_attaque = list(melange), list(melange.values())
+    seconde = 0
+    for _ in range(nb_lignes):
+        seconde += aleatoire.random() < 0.3
+        jour, reste = divmod(seconde, 86400)
+        horodatage = f"{MOIS[(jour // 28) % 12]} {jour % 28 + 1:2d} {reste // 3600:02d}:{reste % 3600 // 60:02d}:{reste % 60:02d}"
+        if aleatoire.random() >= ratio_echecs:
+            modele = aleatoire.choice(LIGNES_NORMALES)
+            attaque = "dispersee"
+        else:
+            modele = aleatoire.choice(LIGNES_ECHECS)
+            attaque = aleatoire.choices(types_attaque, poids_attaque)[0] if melange else "dispersee"
+        # Tirages dans l'ordre pid, ip, port, utilisateur (fichiers identiques sans mélange)
+        pid = aleatoire.randint(1000, 65000)
+        if attaque == "force_brute":
+            ip = attaquants[seconde // 600 % len(attaquants)]  # Un attaquant actif par période de 10 minutes
+        elif attaque == "distribuee":
+            ip = f"{sous_reseau}.{aleatoire.randint(1, 254)}"
+        elif attaque == "pulverisation":
+            ip = pulverisateur
+        elif attaque == "ipv6":
+            ip = f"{prefixe_v6}::{aleatoire.randint(1, 0xffff):x}"
+        else:
+            ip = aleatoire.choice(ips)
+        port = aleatoire.randint(1024, 65535)
+        if attaque == "force_brute":
+            utilisateur = aleatoire.choice(UTILISATEURS[:2])
+        elif attaque == "pulverisation":
+            utilisateur = f"user{aleatoire.randint(0, 9999):04d}"
+        else:
+            utilisateur = aleatoire.choice(UTILISATEURS)
+        message = modele.format(pid=pid, ip=ip, port=port, user=utilisateur)
+        yield f"{horodatage} bastion {message}\n"
+
+
+def generer_fichier(chemin, taille_mo, ratio_echecs=0.05, nb_ips=5000, graine=42, melange=None):
+    """
+    Écrit un fichier synthétique d'environ taille_mo mégaoctets et renvoie le nombre de lignes écrites.
+    """
+    taille_cible = taille_mo * 1024 * 1024
+    taille = 0
+    nb_lignes = 0
+    with open(chemin, 'w') as f:
+        tampon = []
+        for ligne in generer_lignes(10 ** 12, ratio_echecs, nb_ips, graine, melange):
+            tampon.append(ligne)
+            taille += len(ligne)
+            nb_lignes += 1
+            if len(tampon) >= 10000:
+                f.write("".join(tampon))
+                tampon.clear()
+            if taille >= taille_cible:
+                break
+        f.write("".join(tampon))
+    return nb_lignes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère un fichier 'secure' synthétique")
+    parser.add_argument("chemin", help="Fichier de sortie", type=str)
+    parser.add_argument("--taille-mo", help="Taille approximative en Mo", type=int, default=100)
+    parser.add_argument("--ratio-echecs", help="Proportion de lignes d'échec d'authentification", type=float, default=0.05)
+    parser.add_argument("--nb-ips", help="Nombre d'adresses IP distinctes", type=int, default=5000)
+    parser.add_argument("--graine", help="Graine du générateur aléatoire", type=int, default=42)
+    parser.add_argument("--attaques", help=f"Mélange des échecs, ex. 'force_brute=0.3,dispersee=0.7' (types : {', '.join(ATTAQUES)})", type=lire_melange)
+    args = parser.parse_args()
+
+    nb = generer_fichier(args.chemin, args.taille_mo, args.ratio_echecs, args.nb_ips, args.graine, args.attaques)
+    print(f"[+] {nb} lignes écrites dans {args.chemin}")
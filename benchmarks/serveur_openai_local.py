@@ -0,0 +1,117 @@
+"""
+Serveur local imitant l'API OpenAI (POST /v1/chat/completions), pour tester LogAI hors ligne.
+
+Chaque ligne de log numérotée du prompt reçoit un verdict : intrusion détectée si la ligne
+contient "Failed password" ou "Invalid user". Comme l'API, une réponse plus longue que
+max_tokens (4 caractères par token) est tronquée (finish_reason 'length'). La latence de chaque réponse et un taux d'erreurs 429
+(limite de débit) sont paramétrables afin d'exercer la concurrence et les nouvelles tentatives.
+
+Usage :
+    python benchmarks/serveur_openai_local.py --port 8765 --latence 0.5 --taux-erreur 0.1
+
+puis dans config.ini :
+    [openai]
+    api_key = local
+    base_url = http://127.0.0.1:8765/v1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOTS_CLES_INTRUSION = ("Failed password", "Invalid user")
+
+
+class GestionnaireOpenAI(BaseHTTPRequestHandler):
+    """
+    Répond aux requêtes chat.completions avec un JSON de verdicts au format attendu par LogAI.
+    """
+    latence = 0.0
+    taux_erreur = 0.0
+    compteurs = {'requetes': 0, 'erreurs': 0, 'simultanees': 0, 'max_simultanees': 0}
+    verrou = threading.Lock()
+
+    def do_POST(self):
+        corps = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        with self.verrou:
+            self.compteurs['requetes'] += 1
+            if random.random() < self.taux_erreur:
+                self.compteurs['erreurs'] += 1
+                self.repondre(429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}},
+                              {'Retry-After': '0.1'})
+                return
+            self.compteurs['simultanees'] += 1
+            self.compteurs['max_simultanees'] = max(self.compteurs['max_simultanees'], self.compteurs['simultanees'])
+
+        try:
+            time.sleep(self.latence)
+            prompt = corps['messages'][-1]['content']
+            logs = [ligne.strip().partition("| ") for ligne in prompt.split("Logs :", 1)[-1].strip().splitlines() if ligne.strip()]
+            verdicts = [{
+                'ligne': int(numero),
+                'intrusion_detectee': any(mot in ligne for mot in MOTS_CLES_INTRUSION),
+                'raison': "Echec d'authentification" if any(mot in ligne for mot in MOTS_CLES_INTRUSION) else "Aucune",
+                'remediation': "Bloquer l'adresse IP en cas de repetition",
+            } for numero, _, ligne in logs]
+            contenu, fin = json.dumps(verdicts), 'stop'
+            if 'max_tokens' in corps and len(contenu) > corps['max_tokens'] * 4:
+                contenu, fin = contenu[:corps['max_tokens'] * 4], 'length'
+            self.repondre(200, {
+                'id': f"chatcmpl-local-{self.compteurs['requetes']}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': corps.get('model', 'local'),
+                'choices': [{'index': 0, 'finish_reason': fin,
+                             'message': {'role': 'assistant', 'content': contenu}}],
+                'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(contenu) // 4,
+                          'total_tokens': (len(prompt) + len(contenu)) // 4},
+            })
+        finally:
+            with self.verrou:
+                self.compteurs['simultanees'] -= 1
+
+    def repondre(self, code, contenu, entetes=None):
+        donnees = json.dumps(contenu).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(donnees)))
+        for nom, valeur in (entetes or {}).items():
+            self.send_header(nom, valeur)
+        self.end_headers()
+        self.wfile.write(donnees)
+
+    def log_message(self, format, *args):
+        pass  # Pas de journal par requête
+
+
+def demarrer_serveur(port=0, latence=0.0, taux_erreur=0.0):
+    """
+    Démarre le serveur dans un thread et le renvoie (port effectif : serveur.server_address[1]).
+    """
+    GestionnaireOpenAI.latence = latence
+    GestionnaireOpenAI.taux_erreur = taux_erreur
+    serveur = ThreadingHTTPServer(("127.0.0.1", port), GestionnaireOpenAI)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latence", help="Latence de chaque réponse, en secondes", type=float, default=0.0)
+    parser.add_argument("--taux-erreur", help="Proportion de réponses 429", type=float, default=0.0)
+    args = parser.parse_args()
+
+    serveur = demarrer_serveur(args.port, args.latence, args.taux_erreur)
+    print(f"Serveur OpenAI local sur http://127.0.0.1:{serveur.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        serveur.shutdown()
+
+
+if __name__ == "__main__":
+    main()
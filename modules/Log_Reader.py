@@ -1,19 +1,99 @@
+import io
 import os
 import fnmatch
-import re
 import pandas as pd 
 from colorama import Fore, Style, init, Back
+from concurrent.futures import ProcessPoolExecutor
+from modules.log_parser import ParseurSshd, PARSEURS, detecter_parseur
+from modules.log_compression import ERREURS_LECTURE, detecter_compression, ouvrir_log
+from modules.log_colonnes import BlocEvenements
+
+COLONNES = ['DateHeure', 'Evenement', 'Utilisateur', 'AdresseIP']
+TAILLE_SEGMENT = 64 * 1024 * 1024  # 64 Mo par segment pour l'analyse parallèle
+
+
+def decouper_fichier(fichier_log, debut, fin, taille_segment):
+    """
+    Découpe l'intervalle d'octets [debut, fin) d'un fichier en segments d'environ taille_segment
+    octets, dont les bornes sont alignées sur le début d'une ligne.
+    """
+    bornes = []
+    with open(fichier_log, 'rb') as f:
+        while fin - debut > taille_segment:
+            f.seek(debut + taille_segment)
+            f.readline()  # Avance jusqu'à la fin de la ligne en cours
+            borne = min(f.tell(), fin)
+            bornes.append((debut, borne))
+            debut = borne
+    bornes.append((debut, fin))
+    return bornes
+
+
+def extraire_segment(fichier_log, debut=0, fin=None, reste=b"", garder_reste=False, parseur=None):
+    """
+    Lit les octets [debut, fin) d'un fichier (jusqu'à la fin du fichier si fin vaut None) et
+    renvoie le BlocEvenements extrait, la position atteinte et la ligne incomplète éventuelle.
+    Les fichiers compressés (.gz, .bz2, .xz, .zst) sont décompressés à la volée et lus jusqu'à
+    la fin, debut étant alors une position dans le contenu décompressé.
+
+    La ligne incomplète reçue en paramètre est préfixée à la première ligne lue. Si garder_reste
+    est vrai, une dernière ligne sans fin de ligne n'est pas analysée mais renvoyée telle quelle.
+    Fonction de module afin de pouvoir être exécutée dans un pool de processus.
+    """
+    parseur = parseur or ParseurSshd()
+    bloc = BlocEvenements()
+
+    compression = detecter_compression(fichier_log)
+    with ouvrir_log(fichier_log, compression) as f:
+        if compression is None:
+            f.seek(debut)
+        else:
+            # Un flux compressé ne peut être positionné qu'en le lisant depuis le début
+            a_sauter = debut
+            while a_sauter > 0 and (morceau := f.read(min(a_sauter, TAILLE_SEGMENT))):
+                a_sauter -= len(morceau)
+        position = debut
+        for ligne_brute in f:
+            if fin is not None and position >= fin:
+                break
+            position += len(ligne_brute)
+            if reste:
+                ligne_brute = reste + ligne_brute
+                reste = b""
+            # Ligne en cours d'écriture : on la garde pour la prochaine exécution
+            if garder_reste and not ligne_brute.endswith(b"\n"):
+                reste = ligne_brute
+                break
+
+            resultat = parseur.analyser_ligne(ligne_brute)
+            if resultat:
+                bloc.ajouter(*resultat)
+
+    return bloc, position, reste
 
  
 class LogReader:
-    def __init__(self, repertoire):
+    def __init__(self, repertoire, checkpoint=None, taille_segment=TAILLE_SEGMENT, format_logs="auto", cache=None):
         """
         initialise l'objet avec le chemin du répertoire contenant les fichiers de logs.
+        Si un LogCheckpoint est fourni, la lecture reprend là où l'exécution précédente s'est arrêtée.
+        Le format des logs (sshd, journald, rfc5424, acces, fail2ban) est détecté pour chaque
+        fichier d'après ses premières lignes si format_logs vaut "auto", sinon imposé.
+        Si un CacheEvenements est fourni, les fichiers qui ne sont plus modifiés sont chargés
+        depuis le cache au lieu d'être réanalysés.
         """
         self.repertoire = repertoire  # Chemin du répertoire
-        self.lignes_extraites_dict = []  # Liste pour accumuler les lignes extraites sous forme de dictionnaires
+        self.checkpoint = checkpoint  # Positions de lecture persistées (mode incrémental)
+        self.cache = cache  # Évènements extraits des fichiers qui ne changent plus
+        self.format_logs = format_logs
+        # Regex compilée une seule fois, avec pré-filtre par mots-clés
+        self.parseur = ParseurSshd() if format_logs == "auto" else PARSEURS[format_logs]()
+        self.parseurs_fichiers = {}  # Fichier -> parseur de son format détecté
+        self.taille_segment = taille_segment  # Taille des segments analysés en parallèle
+        self.bloc_extrait = BlocEvenements()  # Tampons typés et orientés colonnes des lignes extraites
         self.lignes_extraites_brut = []  # Liste pour accumuler les lignes extraites en brut
-        self.df_logs = pd.DataFrame(columns=['DateHeure', 'Evenement', 'Utilisateur', 'AdresseIP'])  # DataFrame pour stocker les infos
+        self.df_logs = pd.DataFrame(columns=COLONNES)  # DataFrame pour stocker les infos
+        self.compteurs = {'octets_lus': 0, 'fichiers_analyses': 0, 'fichiers_en_cache': 0}
  
     def trouver_fichiers_logs(self, pattern="secure*"):
         """
@@ -29,12 +109,26 @@ class LogReader:
             print(f"\n{Fore.RED} ⚠️Erreur:{Style.RESET_ALL} Le répertoire {self.repertoire} n'a pas été trouvé.")
             return []
  
+    def parseur_fichier(self, fichier_log):
+        """
+        Renvoie le parseur du fichier : celui du format imposé, ou celui détecté d'après ses
+        premières lignes (détection faite une seule fois par fichier).
+        """
+        if self.format_logs != "auto":
+            return self.parseur
+        parseur = self.parseurs_fichiers.get(fichier_log)
+        if parseur is None:
+            parseur = self.parseurs_fichiers[fichier_log] = detecter_parseur(fichier_log)
+            if parseur.NOM != ParseurSshd.NOM:
+                print(f"[+] Format '{parseur.NOM}' détecté pour {fichier_log}")
+        return parseur
+
     def lire_logs_bruts(self, fichier_log):
         """
         Lit un fichier de logs ligne par ligne et stocke le résultat dans une liste brute.
         """
         try:
-            with open(fichier_log, 'r') as f:
+            with io.TextIOWrapper(ouvrir_log(fichier_log, detecter_compression(fichier_log)), errors='replace') as f:
                 for ligne in f:
                     self.lignes_extraites_brut.append(ligne)
             print(f"Le fichier {fichier_log} a été lu avec succès.")
@@ -43,40 +137,171 @@ class LogReader:
  
     def lire_et_extraire_logs(self, fichier_log):
         """
-        Lit un fichier de logs ligne par ligne, extrait les informations clés avec une regex,
-        et stocke ces informations dans une liste de dictionnaires.
+        Lit un fichier de logs ligne par ligne, extrait les informations clés avec le parseur de son format,
+        et ajoute ces informations aux tampons en colonnes du lecteur.
+        En mode incrémental, seules les lignes ajoutées depuis le dernier checkpoint sont lues ;
+        une ligne incomplète en fin de fichier est conservée pour l'exécution suivante.
         """
-        regex = r"^([A-Za-z]{3}\s+\d{1,2}\s+(?:\d{4}\s+)?\d{2}:\d{2}:\d{2}).*?\s+(Invalid user|Failed password|authentication failure).*?\s+(\w+)\s+from\s+(\d{1,3}(?:\.\d{1,3}){3})(?:\s+port\s+\d+.*)?$"
- 
- 
         try:
-            with open(fichier_log, 'r') as f:
-                for ligne in f:
-                    match = re.search(regex, ligne)
-                    if match:
-                        date_heure = match.group(1)       
-                        evenement = match.group(2)        
-                        utilisateur = match.group(3)      
-                        adresse_ip = match.group(4)       
- 
-                        nouvelle_ligne = {
-                            'DateHeure': date_heure,
-                            'Evenement': evenement,
-                            'Utilisateur': utilisateur,
-                            'AdresseIP': adresse_ip
-                        }
-                        self.lignes_extraites_dict.append(nouvelle_ligne)
-            print(f"Le fichier {fichier_log} a été lu et les informations ont été extraites avec succès.")
+            stat = os.stat(fichier_log)
+            compression = detecter_compression(fichier_log)
+            offset, reste = self.__position_depart(fichier_log, stat, compression)
+            if offset is None:
+                print(f"Le fichier compressé {fichier_log} a déjà été lu, ignoré.")
+                return
+            parseur = self.parseur_fichier(fichier_log)
+            en_cache = self.__charger_cache(fichier_log, stat, compression, offset, parseur)
+            if en_cache is not None:
+                self.bloc_extrait.fusionner(en_cache)
+                position, reste = stat.st_size, b""
+                self.compteurs['fichiers_en_cache'] += 1
+            else:
+                # Le fichier est extrait dans un bloc propre, ajouté aux tampons du lecteur une fois
+                # la lecture terminée : une archive corrompue n'y laisse pas d'évènements partiels
+                bloc, position, reste = extraire_segment(
+                    fichier_log, offset, None, reste,
+                    garder_reste=self.checkpoint is not None and compression is None,
+                    parseur=parseur
+                )
+                if self.__a_cacher(stat, compression, offset):
+                    self.__enregistrer_cache(fichier_log, stat, parseur, bloc, reste)
+                else:
+                    self.bloc_extrait.fusionner(bloc)
+                self.compteurs['octets_lus'] += position - offset
+                self.compteurs['fichiers_analyses'] += 1
+            if self.checkpoint:
+                self.checkpoint.mettre_a_jour(fichier_log, stat, position, reste)
+            if en_cache is not None:
+                print(f"Le fichier {fichier_log} a été chargé depuis le cache.")
+            else:
+                print(f"Le fichier {fichier_log} a été lu et les informations ont été extraites avec succès.")
         except FileNotFoundError:
             print(f"⚠️ Erreur : Le fichier {fichier_log} n'a pas été trouvé.")
- 
+        except ERREURS_LECTURE as e:
+            print(f"⚠️ Erreur lors de la lecture du fichier {fichier_log} : {e}")
+
+    def lire_et_extraire_fichiers(self, fichiers_logs, nb_workers=1):
+        """
+        Lit et extrait plusieurs fichiers de logs. Avec nb_workers > 1, les fichiers sont découpés
+        en segments alignés sur les fins de ligne et analysés dans un pool de processus ; les
+        résultats sont fusionnés dans l'ordre des fichiers et des segments, ce qui donne
+        exactement le même résultat que la lecture séquentielle.
+        """
+        if nb_workers <= 1:
+            for fichier_log in fichiers_logs:
+                self.lire_et_extraire_logs(fichier_log)
+            return
+
+        # Planification des segments de chaque fichier
+        plans = []
+        for fichier_log in fichiers_logs:
+            try:
+                stat = os.stat(fichier_log)
+                compression = detecter_compression(fichier_log)
+            except FileNotFoundError:
+                print(f"⚠️ Erreur : Le fichier {fichier_log} n'a pas été trouvé.")
+                continue
+            offset, reste = self.__position_depart(fichier_log, stat, compression)
+            if offset is None:
+                print(f"Le fichier compressé {fichier_log} a déjà été lu, ignoré.")
+                continue
+            en_cache = self.__charger_cache(fichier_log, stat, compression, offset, self.parseur_fichier(fichier_log))
+            if en_cache is not None:
+                bornes = []  # Aucun segment à analyser
+            elif compression:
+                # Un flux compressé ne peut pas être découpé : un seul segment lu jusqu'à la fin
+                bornes = [(offset, None)]
+            else:
+                bornes = decouper_fichier(fichier_log, offset, stat.st_size, self.taille_segment)
+            plans.append((fichier_log, stat, compression, reste, bornes, en_cache, self.__a_cacher(stat, compression, offset)))
+
+        with ProcessPoolExecutor(max_workers=nb_workers) as executeur:
+            futurs = []
+            for fichier_log, stat, compression, reste, bornes, _, _ in plans:
+                parseur = self.parseur_fichier(fichier_log)
+                futurs_fichier = []
+                for i, (debut, fin) in enumerate(bornes):
+                    dernier = i == len(bornes) - 1
+                    futurs_fichier.append(executeur.submit(
+                        extraire_segment, fichier_log, debut, fin,
+                        reste if i == 0 else b"",
+                        dernier and self.checkpoint is not None and compression is None,
+                        parseur
+                    ))
+                futurs.append(futurs_fichier)
+
+            for (fichier_log, stat, compression, reste, bornes, en_cache, a_cacher), futurs_fichier in zip(plans, futurs):
+                if en_cache is not None:
+                    self.bloc_extrait.fusionner(en_cache)
+                    self.compteurs['fichiers_en_cache'] += 1
+                    if self.checkpoint:
+                        self.checkpoint.mettre_a_jour(fichier_log, stat, stat.st_size, b"")
+                    print(f"Le fichier {fichier_log} a été chargé depuis le cache.")
+                    continue
+                # Les segments d'un fichier sont d'abord réunis dans un bloc propre au fichier,
+                # ajouté aux tampons du lecteur seulement si tous ont été lus sans erreur
+                bloc_fichier = BlocEvenements()
+                try:
+                    for futur in futurs_fichier:
+                        bloc, position, reste = futur.result()
+                        bloc_fichier.fusionner(bloc)
+                except ERREURS_LECTURE as e:
+                    print(f"⚠️ Erreur lors de la lecture du fichier {fichier_log} : {e}")
+                    continue
+                if a_cacher:
+                    self.__enregistrer_cache(fichier_log, stat, self.parseur_fichier(fichier_log), bloc_fichier, reste)
+                else:
+                    self.bloc_extrait.fusionner(bloc_fichier)
+                self.compteurs['octets_lus'] += position - bornes[0][0]
+                self.compteurs['fichiers_analyses'] += 1
+                if self.checkpoint:
+                    self.checkpoint.mettre_a_jour(fichier_log, stat, position, reste)
+                print(f"Le fichier {fichier_log} a été lu et les informations ont été extraites avec succès.")
+
+    def __a_cacher(self, stat, compression, offset):
+        """
+        Indique si les évènements d'un fichier passent par le cache : fichier lu depuis le début
+        et qui n'est plus modifié.
+        """
+        return self.cache is not None and offset == 0 and self.cache.eligible(stat, compression)
+
+    def __charger_cache(self, fichier_log, stat, compression, offset, parseur):
+        """
+        Renvoie le bloc en cache d'un fichier à mettre en cache, ou None s'il doit être analysé.
+        """
+        if not self.__a_cacher(stat, compression, offset):
+            return None
+        return self.cache.charger(fichier_log, stat, parseur.NOM)
+
+    def __enregistrer_cache(self, fichier_log, stat, parseur, bloc, reste):
+        """
+        Met en cache les évènements d'un fichier analysé en entier, puis les ajoute aux tampons du lecteur.
+        """
+        if not reste:  # Une dernière ligne incomplète signale un fichier encore en cours d'écriture
+            try:
+                self.cache.enregistrer(fichier_log, stat, parseur.NOM, bloc)
+            except OSError as e:
+                print(f"⚠️ Erreur lors de la mise en cache du fichier {fichier_log} : {e}")
+        self.bloc_extrait.fusionner(bloc)
+
+    def __position_depart(self, fichier_log, stat, compression=None):
+        """
+        Renvoie l'offset et la ligne incomplète à partir desquels lire le fichier.
+        Un fichier compressé est lu depuis le début, ou depuis la position atteinte dans le
+        fichier dont il est issu, sauf s'il a déjà été lu (offset None).
+        """
+        if not self.checkpoint:
+            return 0, b""
+        return self.checkpoint.position_depart(fichier_log, stat, compression)
+
     def creer_dataframe(self):
         """
         Crée un DataFrame Pandas à partir des lignes extraites et l'affecte à l'attribut df_logs.
+        Les colonnes sont compactes : DateHeure en datetime64, les autres en catégories.
         """
-        if self.lignes_extraites_dict:
-            self.df_logs = pd.DataFrame(self.lignes_extraites_dict)
-            self.lignes_extraites_dict.clear()  # Efface la liste une fois le DataFrame créé
+        if len(self.bloc_extrait):
+            self.df_logs = self.bloc_extrait.vers_dataframe()
+            self.bloc_extrait = BlocEvenements()  # Libère les tampons une fois le DataFrame créé
             print(f"\n{Fore.GREEN}[+]Le DataFrame a été créé avec succès.{Style.RESET_ALL}")
         else:
             print("Aucune ligne n'a été extraite. Le DataFrame est vide.")
@@ -0,0 +1,164 @@
+import ipaddress
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+
+# Les adresses IPv4 sont représentées dans l'espace IPv6 (::ffff:a.b.c.d, RFC 4291), afin que
+# toutes les adresses soient des entiers de 128 bits comparables et agrégeables de la même façon
+PREFIXE_IPV4_MAPPEE = 0xFFFF << 32
+MASQUE_IPV4_MAPPEE = ((1 << 96) - 1) << 32
+MOTIF_IP = r"\d{1,3}(?:\.\d{1,3}){3}|[0-9A-Fa-f]{0,4}:[0-9A-Fa-f:.]*[0-9A-Fa-f](?:%\w+)?"  # IPv4 ou IPv6, pour les regex des parseurs
+
+
+def ip_en_entier(adresse_ip):
+    """
+    Convertit une adresse IPv4 ou IPv6 texte en entier de 128 bits, ou None si elle est invalide.
+    """
+    if ':' not in adresse_ip:
+        octets = adresse_ip.split('.')
+        if len(octets) != 4 or not all(octet.isdigit() and int(octet) <= 255 for octet in octets):
+            return None
+        return PREFIXE_IPV4_MAPPEE | (int(octets[0]) << 24) | (int(octets[1]) << 16) | (int(octets[2]) << 8) | int(octets[3])
+    try:
+        return int(ipaddress.IPv6Address(adresse_ip.split('%', 1)[0]))  # Sans l'éventuel identifiant de zone
+    except ValueError:
+        return None
+
+
+def est_ipv4(entier):
+    """
+    Indique si l'entier représente une adresse IPv4.
+    """
+    return entier & MASQUE_IPV4_MAPPEE == PREFIXE_IPV4_MAPPEE
+
+
+def entier_en_ip(entier):
+    """
+    Convertit un entier de 128 bits en adresse texte (notation pointée pour une IPv4).
+    """
+    if est_ipv4(entier):
+        return f"{(entier >> 24) & 255}.{(entier >> 16) & 255}.{(entier >> 8) & 255}.{entier & 255}"
+    return str(ipaddress.IPv6Address(entier))
+
+
+def reseau(entier, prefixe_v4=32, prefixe_v6=128):
+    """
+    Renvoie le réseau d'une adresse (entier) pour les longueurs de préfixe données, au format
+    texte "adresse/longueur", ou l'adresse seule si le préfixe est complet.
+    """
+    if est_ipv4(entier):
+        if prefixe_v4 >= 32:
+            return entier_en_ip(entier)
+        return f"{entier_en_ip(entier & ~((1 << (32 - prefixe_v4)) - 1))}/{prefixe_v4}"
+    if prefixe_v6 >= 128:
+        return entier_en_ip(entier)
+    return f"{entier_en_ip(entier & ~((1 << (128 - prefixe_v6)) - 1))}/{prefixe_v6}"
+
+
+def agreger_par_reseau(adresses_ip, prefixe_v4=32, prefixe_v6=128):
+    """
+    Remplace une colonne d'adresses IP texte par la colonne catégorielle de leurs réseaux.
+    Seules les adresses distinctes sont converties, puis propagées par les codes.
+    """
+    if prefixe_v4 >= 32 and prefixe_v6 >= 128:
+        return adresses_ip
+    categories = adresses_ip.astype('category')
+    reseaux = []
+    for ip in categories.cat.categories.astype(str):
+        entier = ip_en_entier(ip)
+        reseaux.append(ip if entier is None else reseau(entier, prefixe_v4, prefixe_v6))
+    reseaux = np.array(reseaux + [None], dtype=object)  # Le code -1 (valeur manquante) reste manquant
+    return pd.Series(pd.Categorical(reseaux[categories.cat.codes.to_numpy()]), index=adresses_ip.index, name=adresses_ip.name)
+
+
+def ip_en_valeur_sqlite(adresse_ip):
+    """
+    Valeur d'une adresse dans les bases SQLite : entier 32 bits pour une IPv4 (compatible avec
+    les lignes existantes), 16 octets (BLOB) pour une IPv6.
+    """
+    entier = ip_en_entier(str(adresse_ip))
+    if entier is None:
+        raise ValueError(f"Adresse IP invalide : {adresse_ip}")
+    return entier & 0xFFFFFFFF if est_ipv4(entier) else entier.to_bytes(16, 'big')
+
+
+def valeur_sqlite_en_ip(valeur):
+    """
+    Convertit une valeur lue dans une base SQLite (voir ip_en_valeur_sqlite) en adresse texte.
+    """
+    if isinstance(valeur, bytes):
+        return entier_en_ip(int.from_bytes(valeur, 'big'))
+    return entier_en_ip(PREFIXE_IPV4_MAPPEE | valeur)
+
+
+def ips_en_valeurs_sqlite(adresses_ip):
+    """
+    Convertit une colonne d'adresses IP en liste de valeurs SQLite ; seules les adresses
+    distinctes sont converties.
+    """
+    codes, uniques = pd.factorize(pd.Series(adresses_ip, dtype=object).astype(str))
+    valeurs = [ip_en_valeur_sqlite(ip) for ip in uniques]
+    return [valeurs[code] for code in codes]
+
+
+class IndexCIDR:
+    """
+    Index d'une liste de réseaux CIDR (IPv4 et IPv6), pour les listes d'autorisation et
+    d'interdiction.
+
+    Les réseaux sont convertis en intervalles d'entiers [debut, fin], triés et fusionnés :
+    l'appartenance d'une adresse se vérifie par une recherche dichotomique, en O(log n) quel que
+    soit le nombre de réseaux, au lieu de comparer l'adresse à chaque réseau.
+    """
+    def __init__(self, reseaux=()):
+        intervalles = []
+        for texte in reseaux:
+            texte = texte.split('#', 1)[0].strip()
+            if not texte:
+                continue
+            reseau_ip = ipaddress.ip_network(texte, strict=False)
+            debut = int(reseau_ip.network_address)
+            fin = int(reseau_ip.broadcast_address)
+            if reseau_ip.version == 4:
+                debut, fin = PREFIXE_IPV4_MAPPEE | debut, PREFIXE_IPV4_MAPPEE | fin
+            intervalles.append((debut, fin))
+
+        # Fusion des intervalles qui se chevauchent ou se touchent
+        self.debuts, self.fins = [], []
+        for debut, fin in sorted(intervalles):
+            if self.fins and debut <= self.fins[-1] + 1:
+                self.fins[-1] = max(self.fins[-1], fin)
+            else:
+                self.debuts.append(debut)
+                self.fins.append(fin)
+
+    @classmethod
+    def depuis_fichier(cls, chemin):
+        """
+        Construit l'index à partir d'un fichier contenant un réseau CIDR ou une adresse par
+        ligne (les commentaires commencent par #).
+        """
+        with open(chemin) as f:
+            return cls(f)
+
+    def __len__(self):
+        return len(self.debuts)
+
+    def contient(self, adresse_ip):
+        """
+        Indique si une adresse (texte ou entier) appartient à l'un des réseaux de l'index.
+        """
+        entier = ip_en_entier(adresse_ip) if isinstance(adresse_ip, str) else adresse_ip
+        if entier is None:
+            return False
+        i = bisect_right(self.debuts, entier) - 1
+        return i >= 0 and entier <= self.fins[i]
+
+    def masque(self, adresses_ip):
+        """
+        Renvoie le masque booléen (Series) des adresses d'une colonne appartenant à l'index ;
+        chaque adresse distincte n'est recherchée qu'une fois.
+        """
+        categories = adresses_ip.astype('category')
+        dans_index = np.array([self.contient(str(ip)) for ip in categories.cat.categories] + [False], dtype=bool)
+        return pd.Series(dans_index[categories.cat.codes.to_numpy()], index=adresses_ip.index)
@@ -0,0 +1,196 @@
+import os
+import select
+import socket
+import threading
+from collections import Counter, OrderedDict
+from itertools import islice
+import pandas as pd
+from colorama import Fore, Style, init, Back
+from modules.protocole_agregation import (ENTREES_MAX, TYPE_ACQUITTEMENT, ErreurProtocole, decoder_acquittement,
+                                          encoder_bonjour, encoder_comptes, extraire_trames)
+
+
+class AgentCollecte:
+    """
+    Agent de collecte d'un hôte : compte les accès de chaque IP par seau de temps (duree_seau,
+    en général --intervalle) et transmet périodiquement ces compteurs à l'agrégateur central,
+    qui détecte sur la vue globale les attaques réparties sur plusieurs serveurs.
+
+    L'agent remplace le DetecteurEnLigne de SuiviLogs (mêmes méthodes ajouter et
+    evincer_expires) : aucune alerte n'est levée localement. Les compteurs sont envoyés par
+    un thread d'arrière-plan, par lots numérotés, au format binaire de protocole_agregation
+    (24 octets par IP et par seau, quel que soit le nombre de lignes).
+
+    Contrôle de flux : au plus fenetre_envoi lots sont en attente d'acquittement par
+    l'agrégateur ; les acquittements reçus sont lus à chaque envoi. Tant qu'il ne suit pas, ou
+    qu'il est injoignable, les nouveaux accès continuent d'être fusionnés dans les compteurs en
+    attente (une entrée par IP et par seau), sans file qui grossit avec le nombre de lignes.
+    Ces compteurs grossissent toutefois avec le nombre de couples (IP, seau) distincts : ils
+    sont plafonnés à entrees_max entrées, au-delà desquelles les plus anciennes sont
+    abandonnées (compteur acces_perdus). En cas de coupure, l'agent se reconnecte et renvoie
+    les lots non acquittés ; l'agrégateur ignore ceux qu'il a déjà intégrés.
+    """
+    def __init__(self, hote, port, nom=None, duree_seau='1min', periode_envoi=1.0, fenetre_envoi=4,
+                 delai_reconnexion=5.0, entrees_max=1_000_000):
+        self.hote = hote
+        self.port = port
+        self.nom = nom or socket.gethostname()
+        self.duree_seau = max(1, int(pd.Timedelta(duree_seau).total_seconds()))
+        self.periode_envoi = periode_envoi
+        self.fenetre_envoi = fenetre_envoi
+        self.delai_reconnexion = delai_reconnexion
+        self.entrees_max = entrees_max
+        self.session = int.from_bytes(os.urandom(8), 'big')  # Distingue les redémarrages de l'agent
+        self.verrou = threading.Lock()
+        self.en_attente = Counter()  # (IP, début du seau) -> nombre d'accès pas encore envoyés
+        self.non_acquittes = OrderedDict()  # Numéro de séquence -> trame envoyée, en attente d'acquittement
+        self.sequence = 0
+        self.dernier_envoye = 0  # Dernier lot envoyé sur la connexion courante
+        self.connexion = None
+        self.tampon = bytearray()  # Octets reçus de l'agrégateur, pas encore traités
+        self.compteurs = {'lots_envoyes': 0, 'entrees_envoyees': 0, 'octets_envoyes': 0, 'reconnexions': 0,
+                          'acces_perdus': 0}
+        self.arret = threading.Event()
+        self.thread = threading.Thread(target=self.__boucle, name="agent-collecte", daemon=True)
+        self.thread.start()
+
+    def ajouter(self, ip, horodatage):
+        """
+        Compte un accès (IP sur 128 bits, horodatage en nanosecondes) dans son seau de temps.
+        Renvoie toujours None : la détection est faite par l'agrégateur.
+        """
+        seau = horodatage // 1_000_000_000 // self.duree_seau * self.duree_seau
+        with self.verrou:
+            self.en_attente[(ip, seau)] += 1
+            if len(self.en_attente) > self.entrees_max:
+                self.__abandonner_plus_anciennes()
+        return None
+
+    def __abandonner_plus_anciennes(self):
+        """
+        Abandonne le dixième le plus ancien des compteurs en attente (ordre d'ajout), quand
+        l'agrégateur est injoignable depuis trop longtemps. Appelée sous le verrou.
+        """
+        nombre = max(1, len(self.en_attente) // 10)
+        perdus = sum(nombre_acces for _, nombre_acces in islice(self.en_attente.items(), nombre))
+        self.en_attente = Counter(dict(islice(self.en_attente.items(), nombre, None)))
+        self.compteurs['acces_perdus'] += perdus
+        print(f"{Fore.YELLOW}⚠️ Plus de {self.entrees_max} compteurs en attente d'envoi : {perdus} accès les plus anciens abandonnés.{Style.RESET_ALL}")
+
+    def evincer_expires(self, maintenant):
+        """
+        Rien à évincer : les compteurs sont vidés à chaque envoi.
+        """
+
+    def fermer(self, delai=10.0):
+        """
+        Envoie les compteurs en attente et attend leur acquittement (au plus delai secondes),
+        puis ferme la connexion.
+        """
+        self.arret.set()
+        self.thread.join(delai)
+        self.__deconnecter()
+
+    def __boucle(self):
+        """
+        Boucle du thread d'envoi : toutes les periode_envoi secondes, envoie les compteurs en
+        attente ; à l'arrêt, un dernier envoi est fait et ses acquittements attendus.
+        """
+        termine = False
+        while not termine:
+            termine = self.arret.wait(self.periode_envoi)
+            try:
+                self.__envoyer_en_attente()
+                if termine:
+                    while self.non_acquittes:
+                        self.__lire_acquittements(attendre=True)
+            except (OSError, ErreurProtocole) as e:
+                print(f"{Fore.YELLOW}⚠️ Agrégateur {self.hote}:{self.port} injoignable ({e}), nouvel essai dans {self.delai_reconnexion} s.{Style.RESET_ALL}")
+                self.__deconnecter()
+                if termine:
+                    break
+                self.arret.wait(self.delai_reconnexion)  # Un arrêt pendant l'attente déclenche le dernier envoi
+
+    def __envoyer_en_attente(self):
+        """
+        Envoie les compteurs en attente par lots, sans dépasser fenetre_envoi lots non acquittés :
+        dès que la fenêtre est pleine, attend un acquittement avant de découper le lot suivant.
+        Pendant une coupure, aucun nouveau lot n'est découpé et les compteurs restent fusionnés.
+        """
+        if self.connexion is not None:
+            self.__lire_acquittements()  # Libère les places des lots acquittés depuis le dernier envoi
+        while True:
+            self.__decouper_lots()
+            if not self.non_acquittes:
+                return
+            if self.connexion is None:
+                self.__connecter()  # Renvoie aussi les lots non acquittés d'une connexion précédente
+            for sequence, trame in list(self.non_acquittes.items()):
+                if sequence <= self.dernier_envoye:
+                    continue
+                self.connexion.sendall(trame)
+                self.dernier_envoye = sequence
+                self.compteurs['lots_envoyes'] += 1
+                self.compteurs['octets_envoyes'] += len(trame)
+            with self.verrou:
+                if not self.en_attente:
+                    return
+            self.__lire_acquittements(attendre=True)  # Libère une place dans la fenêtre
+
+    def __decouper_lots(self):
+        """
+        Découpe en lots numérotés les compteurs en attente, dans la limite des places libres
+        de la fenêtre d'envoi ; le reste continue d'être fusionné.
+        """
+        places = self.fenetre_envoi - len(self.non_acquittes)
+        if places <= 0:
+            return
+        with self.verrou:
+            if len(self.en_attente) <= places * ENTREES_MAX:
+                entrees, self.en_attente = self.en_attente, Counter()
+            else:
+                entrees = {cle: self.en_attente.pop(cle) for cle in list(islice(self.en_attente, places * ENTREES_MAX))}
+        entrees = [(ip, seau, nombre) for (ip, seau), nombre in entrees.items()]
+        for debut in range(0, len(entrees), ENTREES_MAX):
+            lot = entrees[debut:debut + ENTREES_MAX]
+            self.sequence += 1
+            self.non_acquittes[self.sequence] = encoder_comptes(self.sequence, lot)
+            self.compteurs['entrees_envoyees'] += len(lot)
+
+    def __lire_acquittements(self, attendre=False):
+        """
+        Traite les acquittements (cumulatifs) reçus et renvoie le nombre de lots qu'ils libèrent.
+        Si attendre est vrai, bloque jusqu'à ce qu'au moins un lot soit libéré ; sinon, ne lit
+        que les octets déjà arrivés.
+        """
+        liberes = 0
+        while (attendre and not liberes) or select.select([self.connexion], [], [], 0)[0]:
+            donnees = self.connexion.recv(65536)
+            if not donnees:
+                raise ConnectionError("connexion fermée par l'agrégateur")
+            self.tampon += donnees
+            for type_trame, charge in extraire_trames(self.tampon):
+                if type_trame != TYPE_ACQUITTEMENT:
+                    raise ErreurProtocole(f"Trame inattendue de type {type_trame}")
+                sequence = decoder_acquittement(charge)
+                while self.non_acquittes and next(iter(self.non_acquittes)) <= sequence:
+                    self.non_acquittes.popitem(last=False)
+                    liberes += 1
+        return liberes
+
+    def __connecter(self):
+        """
+        Ouvre la connexion, présente l'agent et marque les lots non acquittés comme à renvoyer.
+        """
+        self.connexion = socket.create_connection((self.hote, self.port), timeout=30)
+        self.connexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.tampon.clear()
+        self.connexion.sendall(encoder_bonjour(self.session, self.nom))
+        self.dernier_envoye = 0
+        if self.compteurs['lots_envoyes']:
+            self.compteurs['reconnexions'] += 1
+
+    def __deconnecter(self):
+        if self.connexion is not None:
+            self.connexion.close()
+            self.connexion = None
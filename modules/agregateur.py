@@ -0,0 +1,232 @@
+import contextlib
+import io
+import queue
+import socketserver
+import threading
+import time
+from collections import Counter
+import numpy as np
+import pandas as pd
+from colorama import Fore, Style, init, Back
+from modules.protocole_agregation import (TYPE_BONJOUR, TYPE_COMPTES, ErreurProtocole, decoder_bonjour,
+                                          decoder_comptes, encoder_acquittement, lire_trame)
+from modules.log_analyzer import LogAnalyzer
+from modules.adresses_ip import entier_en_ip
+from modules.etat_alertes import EtatAlertes
+
+
+class Agregateur:
+    """
+    Agrégateur central : reçoit en TCP les compteurs par IP et par seau de temps des agents de
+    collecte (AgentCollecte) de chaque hôte, les fusionne, et exécute périodiquement la
+    détection de LogAnalyzer sur la vue globale. Une attaque répartie sur plusieurs serveurs,
+    sous le seuil sur chacun, est ainsi détectée.
+
+    La détection travaille directement sur les compteurs (une ligne par IP, seau et hôte,
+    pondérée par son nombre d'accès) : chaque accès est daté du début de son seau, et son
+    évènement indique l'hôte qui l'a vu. Les résultats
+    sont exacts en mode 'fixe' quand la durée des seaux des agents est celle de l'intervalle
+    d'analyse (ou la divise) ; en mode 'glissante', la fenêtre est approchée à un seau près.
+
+    Contrôle de flux : les lots reçus passent par une file bornée (file_max lots) avant d'être
+    intégrés, et ne sont acquittés qu'une fois mis en file. Si l'intégration prend du retard,
+    la lecture de la connexion s'arrête, les acquittements aussi, et les agents cessent
+    d'envoyer (fenêtre d'envoi pleine) en fusionnant leurs compteurs localement.
+    Les compteurs plus anciens que retention (par rapport au seau le plus récent reçu) sont
+    oubliés ; une même alerte n'est notifiée qu'une fois, sauf si son envoi a échoué.
+    """
+    def __init__(self, adresse='127.0.0.1', port=5140, retention='1h', file_max=64, liste_autorisee=None,
+                 liste_interdite=None, notifier=None, metriques=None):
+        self.adresse = adresse
+        self.port = port
+        self.retention = int(pd.Timedelta(retention).total_seconds())
+        self.liste_autorisee = liste_autorisee
+        self.liste_interdite = liste_interdite
+        self.notifier = notifier  # Fonction (lignes de résumé, rappel(envoyees)) appelée pour les nouvelles alertes
+        self.metriques = metriques
+        self.file = queue.Queue(maxsize=file_max)  # Lots acquittés, pas encore intégrés
+        self.verrou = threading.Lock()
+        self.comptes = Counter()  # (IP, début du seau, hôte) -> nombre d'accès
+        self.sequences = {}  # (hôte, session) -> (dernier lot accepté, instant de la dernière trame)
+        self.connexions = Counter()  # (hôte, session) -> connexions ouvertes
+        self.etat_alertes = EtatAlertes(None)
+        self.compteurs = {'lots_recus': 0, 'lots_dupliques': 0, 'entrees_recues': 0, 'octets_recus': 0, 'alertes': 0}
+        self.serveur = None
+
+    def demarrer(self):
+        """
+        Démarre l'écoute des agents et l'intégration des lots, dans des threads d'arrière-plan.
+        """
+        agregateur = self
+
+        class GestionnaireAgent(socketserver.StreamRequestHandler):
+            def handle(self):
+                agregateur.recevoir(self.rfile, self.wfile, self.client_address)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.serveur = socketserver.ThreadingTCPServer((self.adresse, self.port), GestionnaireAgent)
+        self.serveur.daemon_threads = True
+        self.port = self.serveur.server_address[1]  # Port choisi par le système si port vaut 0
+        threading.Thread(target=self.serveur.serve_forever, name="agregateur-ecoute", daemon=True).start()
+        threading.Thread(target=self.__integrer, name="agregateur-integration", daemon=True).start()
+        print(f"{Fore.GREEN}[+] Agrégateur à l'écoute des agents sur {self.adresse}:{self.port}{Style.RESET_ALL}")
+
+    def recevoir(self, flux, sortie, client):
+        """
+        Traite la connexion d'un agent : présentation, puis lots de compteurs, chacun acquitté
+        une fois mis en file d'intégration.
+        """
+        cle = None
+        try:
+            trame = lire_trame(flux)
+            if trame is None or trame[0] != TYPE_BONJOUR:
+                return
+            session, hote = decoder_bonjour(trame[1])
+            cle = (hote, session)
+            print(f"{Fore.GREEN}[+] Agent '{hote}' connecté depuis {client[0]}{Style.RESET_ALL}")
+            with self.verrou:
+                self.connexions[cle] += 1
+            while (trame := lire_trame(flux)) is not None:
+                type_trame, charge = trame
+                if type_trame != TYPE_COMPTES:
+                    raise ErreurProtocole(f"Trame inattendue de type {type_trame}")
+                sequence, entrees = decoder_comptes(charge)
+                with self.verrou:
+                    self.compteurs['octets_recus'] += len(charge)
+                    nouveau = sequence > self.sequences.get(cle, (0, 0))[0]
+                    if nouveau:
+                        self.sequences[cle] = (sequence, time.monotonic())
+                    else:
+                        self.compteurs['lots_dupliques'] += 1  # Lot renvoyé après une reconnexion
+                if nouveau:
+                    self.file.put((hote, entrees))  # Bloque si l'intégration est en retard
+                sortie.write(encoder_acquittement(sequence))
+                sortie.flush()
+        except (OSError, ErreurProtocole) as e:
+            print(f"{Fore.YELLOW}⚠️ Connexion de l'agent {client[0]} interrompue : {e}{Style.RESET_ALL}")
+        finally:
+            if cle is not None:
+                with self.verrou:
+                    self.connexions[cle] -= 1
+                    if not self.connexions[cle]:
+                        del self.connexions[cle]
+            print(f"{Fore.YELLOW}[+] Agent {client[0]} déconnecté{Style.RESET_ALL}")
+
+    def __integrer(self):
+        """
+        Boucle du thread d'intégration : fusionne les lots reçus dans les compteurs globaux.
+        """
+        while True:
+            hote, entrees = self.file.get()
+            with self.verrou:
+                for ip, seau, nombre in entrees:
+                    self.comptes[(ip, seau, hote)] += nombre
+                self.compteurs['lots_recus'] += 1
+                self.compteurs['entrees_recues'] += len(entrees)
+            self.file.task_done()
+
+    def attendre_integration(self):
+        """
+        Attend que tous les lots acquittés aient été intégrés.
+        """
+        self.file.join()
+
+    def purger(self):
+        """
+        Oublie les compteurs plus anciens que la rétention (par rapport au seau le plus récent),
+        ainsi que les numéros de séquence des sessions déconnectées et inactives depuis la
+        rétention (un agent redémarré ouvre une nouvelle session).
+        """
+        with self.verrou:
+            limite = time.monotonic() - self.retention
+            for cle in [cle for cle, (_, instant) in self.sequences.items() if instant < limite and cle not in self.connexions]:
+                del self.sequences[cle]
+            if not self.comptes:
+                return
+            limite = max(seau for _, seau, _ in self.comptes) - self.retention
+            for cle in [cle for cle in self.comptes if cle[1] < limite]:
+                del self.comptes[cle]
+
+    def creer_dataframe(self):
+        """
+        Reconstitue le DataFrame des logs de la vue globale (DateHeure, Evenement, Utilisateur,
+        AdresseIP, NombreAcces) : une ligne par IP, seau et hôte, datée du début du seau, avec
+        son nombre d'accès, que LogAnalyzer somme au lieu de compter les lignes.
+        """
+        with self.verrou:
+            comptes = list(self.comptes.items())
+        if not comptes:
+            return pd.DataFrame({'DateHeure': pd.Series(dtype='datetime64[ns]'), 'Evenement': pd.Series(dtype='category'),
+                                 'Utilisateur': pd.Series(dtype='category'), 'AdresseIP': pd.Series(dtype='category'),
+                                 'NombreAcces': pd.Series(dtype='int64')})
+        ips = sorted({ip for (ip, _, _), _ in comptes})
+        hotes = sorted({hote for (_, _, hote), _ in comptes})
+        codes_ip = {ip: code for code, ip in enumerate(ips)}
+        codes_hote = {hote: code for code, hote in enumerate(hotes)}
+        seaux = np.fromiter((seau for (_, seau, _), _ in comptes), dtype=np.int64, count=len(comptes))
+        return pd.DataFrame({
+            'DateHeure': pd.Series((seaux * 1_000_000_000).view('datetime64[ns]')),
+            'Evenement': pd.Categorical.from_codes(
+                np.fromiter((codes_hote[hote] for (_, _, hote), _ in comptes), dtype=np.int32, count=len(comptes)),
+                [f"hôte {hote}" for hote in hotes]),
+            'Utilisateur': pd.Categorical.from_codes(np.zeros(len(comptes), dtype=np.int8), ["-"]),
+            'AdresseIP': pd.Categorical.from_codes(
+                np.fromiter((codes_ip[ip] for (ip, _, _), _ in comptes), dtype=np.int32, count=len(comptes)),
+                [entier_en_ip(ip) for ip in ips]),
+            'NombreAcces': np.fromiter((nombre for _, nombre in comptes), dtype=np.int64, count=len(comptes)),
+        })
+
+    def analyser(self, intervalle_temps='1min', seuil_alerte=10, mode='fixe', prefixe_v4=32, prefixe_v6=128):
+        """
+        Exécute la détection de fréquence sur la vue globale et renvoie (LogAnalyzer, alertes
+        pas encore notifiées).
+        """
+        self.purger()
+        analyseur = LogAnalyzer(self.creer_dataframe(), self.liste_autorisee, self.liste_interdite)
+        if not analyseur.df_logs.empty:
+            with contextlib.redirect_stdout(io.StringIO()):  # Le détail est résumé par les alertes
+                analyseur.analyser_frequence_ips(intervalle_temps, seuil_alerte, mode, prefixe_v4, prefixe_v6)
+        return analyseur, self.etat_alertes.filtrer_nouvelles(analyseur.alertes)
+
+    def executer(self, intervalle_temps='1min', seuil_alerte=10, mode='fixe', prefixe_v4=32, prefixe_v6=128,
+                 periode_analyse=10.0):
+        """
+        Boucle infinie : toutes les periode_analyse secondes, analyse la vue globale et
+        signale les nouvelles alertes.
+        """
+        print(f"\n{Fore.GREEN}[+] Analyse de la vue globale toutes les {periode_analyse} s "
+              f"(plus de {seuil_alerte} accès par IP dans {intervalle_temps}, tous hôtes confondus){Style.RESET_ALL}")
+        while True:
+            time.sleep(periode_analyse)
+            if self.metriques is None:
+                analyseur, nouvelles = self.analyser(intervalle_temps, seuil_alerte, mode, prefixe_v4, prefixe_v6)
+            else:
+                with self.metriques.etape("agregation") as mesure:
+                    analyseur, nouvelles = self.analyser(intervalle_temps, seuil_alerte, mode, prefixe_v4, prefixe_v6)
+                    mesure.update(lignes_entree=len(analyseur.df_logs), lignes_sortie=len(nouvelles))
+                self.metriques.exporter()
+            if not nouvelles.empty:
+                self.alerter(analyseur.resumer_alertes(nouvelles), nouvelles)
+
+    def alerter(self, lignes, alertes):
+        """
+        Affiche les alertes dans la console puis les transmet à la fonction de notification
+        éventuelle ; elles sont enregistrées comme envoyées une fois la notification réussie.
+        """
+        for ligne in lignes:
+            print(f"{Fore.RED}🚨 [vue globale] {ligne}{Style.RESET_ALL}")
+        self.compteurs['alertes'] += len(lignes)
+        if self.notifier:
+            self.notifier(lignes, lambda envoyees: self.etat_alertes.enregistrer_envoi(alertes, envoyees))
+        else:
+            self.etat_alertes.enregistrer_envoi(alertes)
+
+    def fermer(self):
+        """
+        Arrête l'écoute des agents.
+        """
+        if self.serveur is not None:
+            self.serveur.shutdown()
+            self.serveur.server_close()
+            self.serveur = None
+        self.etat_alertes.fermer()
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import time
+from array import array
+import numpy as np
+from modules.log_colonnes import BlocEvenements
+
+VERSION_CACHE = "1"  # À incrémenter si le schéma des évènements extraits change
+OCTETS_EMPREINTE = 64 * 1024  # Début du fichier inclus dans l'empreinte
+
+
+class CacheEvenements:
+    """
+    Cache sur disque des évènements extraits de chaque fichier de logs, au format Arrow IPC
+    (Feather v2), afin de ne pas réanalyser à chaque exécution les fichiers issus de la rotation
+    (secure-20260901...), dont le contenu ne change plus.
+
+    Chaque fichier a une entrée (un fichier .arrow nommé d'après son chemin) contenant les quatre
+    colonnes d'un BlocEvenements en colonnes dictionnaire (codes + table des valeurs distinctes),
+    non compressées : l'entrée est lue par projection mémoire (memory map), sans analyse des
+    lignes ; seuls les codes sont recopiés dans les tableaux du BlocEvenements.
+    Elle n'est utilisée que si l'empreinte du fichier (chemin, taille, date de modification,
+    empreinte SHA-256 de son début, format des logs) est inchangée. Les entrées des fichiers
+    supprimés depuis (rotation) sont effacées par purger.
+
+    Seuls les fichiers qui ne sont plus en cours d'écriture sont mis en cache : fichiers
+    compressés, ou non modifiés depuis age_min secondes. Le fichier actif est toujours analysé.
+    Le module 'pyarrow' est nécessaire.
+    """
+    def __init__(self, repertoire='cache_logs', age_min=300):
+        try:
+            import pyarrow
+            import pyarrow.ipc
+        except ImportError:
+            raise ImportError("Le module 'pyarrow' est nécessaire pour le cache des logs analysés (pip install pyarrow).")
+        self.pa = pyarrow
+        self.repertoire = repertoire
+        self.age_min = age_min
+        self.compteurs = {'chargements': 0, 'enregistrements': 0}
+        os.makedirs(repertoire, exist_ok=True)
+
+    def chemin_entree(self, fichier_log):
+        """
+        Renvoie le chemin de l'entrée du cache d'un fichier de logs.
+        """
+        return os.path.join(self.repertoire, hashlib.sha256(os.path.abspath(fichier_log).encode()).hexdigest()[:32] + ".arrow")
+
+    @staticmethod
+    def empreinte(fichier_log, stat, format_logs):
+        """
+        Calcule l'empreinte d'un fichier : chemin, taille, date de modification, format des logs
+        et SHA-256 de ses premiers octets (un fichier remplacé par la rotation change d'empreinte
+        même si sa taille et sa date coïncident).
+        """
+        with open(fichier_log, 'rb') as f:
+            debut = f.read(OCTETS_EMPREINTE)
+        cle = f"{VERSION_CACHE}|{os.path.abspath(fichier_log)}|{stat.st_size}|{stat.st_mtime_ns}|{format_logs}|"
+        return hashlib.sha256(cle.encode() + debut).hexdigest()
+
+    def eligible(self, stat, compression=None):
+        """
+        Indique si un fichier peut être mis en cache : compressé, ou non modifié depuis age_min secondes.
+        """
+        return compression is not None or time.time() - stat.st_mtime >= self.age_min
+
+    def charger(self, fichier_log, stat, format_logs):
+        """
+        Renvoie le BlocEvenements en cache du fichier, ou None si l'entrée est absente ou périmée.
+        """
+        chemin = self.chemin_entree(fichier_log)
+        if not os.path.exists(chemin):
+            return None
+        try:
+            with self.pa.memory_map(chemin) as source:
+                lecteur = self.pa.ipc.open_file(source)
+                metadonnees = lecteur.schema.metadata or {}
+                if metadonnees.get(b'empreinte', b'').decode() != self.empreinte(fichier_log, stat, format_logs):
+                    return None
+                lot = lecteur.get_batch(0)
+                bloc = BlocEvenements()
+                for attribut, type_code in (('horodatages', 'i'), ('evenements', 'B'), ('utilisateurs', 'i'), ('adresses_ip', 'i')):
+                    colonne = lot.column(attribut)
+                    codes = colonne.indices.to_numpy(zero_copy_only=False)
+                    setattr(bloc, attribut, array(type_code, codes.astype(np.dtype(type_code)).tobytes()))
+                    valeurs = colonne.dictionary.to_pylist()
+                    if attribut == 'adresses_ip':
+                        valeurs = [int.from_bytes(valeur, 'big') for valeur in valeurs]
+                    setattr(bloc, 'table_' + attribut, {valeur: code for code, valeur in enumerate(valeurs)})
+        except (OSError, KeyError, IndexError, self.pa.ArrowException):
+            return None  # Entrée illisible : le fichier est réanalysé et l'entrée réécrite
+        self.compteurs['chargements'] += 1
+        return bloc
+
+    def enregistrer(self, fichier_log, stat, format_logs, bloc):
+        """
+        Écrit les évènements extraits d'un fichier dans son entrée du cache (écriture atomique
+        via un fichier temporaire).
+        """
+        pa = self.pa
+        colonnes = {}
+        for attribut, type_code in (('horodatages', np.int32), ('evenements', np.uint8), ('utilisateurs', np.int32), ('adresses_ip', np.int32)):
+            valeurs = list(getattr(bloc, 'table_' + attribut))
+            if attribut == 'adresses_ip':
+                valeurs = pa.array([ip.to_bytes(16, 'big') for ip in valeurs], type=pa.binary(16))
+            else:
+                valeurs = pa.array(valeurs, type=pa.string())
+            codes = pa.array(np.frombuffer(getattr(bloc, attribut), dtype=type_code).astype(np.int32))
+            colonnes[attribut] = pa.DictionaryArray.from_arrays(codes, valeurs)
+        lot = pa.RecordBatch.from_pydict(colonnes)
+        lot = lot.replace_schema_metadata({'empreinte': self.empreinte(fichier_log, stat, format_logs),
+                                           'source': os.path.abspath(fichier_log)})
+
+        chemin = self.chemin_entree(fichier_log)
+        temporaire = chemin + ".tmp"
+        with pa.OSFile(temporaire, 'wb') as sortie, pa.ipc.new_file(sortie, lot.schema) as ecrivain:
+            ecrivain.write_batch(lot)
+        os.replace(temporaire, chemin)
+        self.compteurs['enregistrements'] += 1
+
+    def purger(self):
+        """
+        Supprime les entrées dont le fichier de logs n'existe plus (ou d'une version sans
+        chemin source), ainsi que les fichiers temporaires d'écritures interrompues.
+        Renvoie le nombre d'entrées supprimées.
+        """
+        supprimees = 0
+        for nom in os.listdir(self.repertoire):
+            chemin = os.path.join(self.repertoire, nom)
+            if nom.endswith(".arrow"):
+                try:
+                    with self.pa.memory_map(chemin) as source:
+                        metadonnees = self.pa.ipc.open_file(source).schema.metadata or {}
+                    source_log = metadonnees.get(b'source', b'').decode()
+                    if source_log and os.path.exists(source_log):
+                        continue
+                except (OSError, self.pa.ArrowException):
+                    pass  # Entrée illisible : supprimée
+            elif not nom.endswith(".arrow.tmp") or time.time() - os.path.getmtime(chemin) < 3600:
+                continue  # Fichier étranger au cache, ou écriture peut-être en cours
+            try:
+                os.remove(chemin)
+                supprimees += 1
+            except OSError:
+                pass
+        return supprimees
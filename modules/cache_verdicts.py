@@ -0,0 +1,128 @@
+import hashlib
+import re
+import sqlite3
+import time
+from modules.log_parser import REGEX_PREFIXE_SYSLOG
+
+# Parties d'une ligne sans influence sur le verdict, retirées avant le calcul de la clé
+MASQUES = [
+    (REGEX_PREFIXE_SYSLOG, ""),
+    (re.compile(r"du \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} au \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"), "du <DATE> au <DATE>"),
+    (re.compile(r"\[\d+\]"), "[<PID>]"),
+    (re.compile(r"\bport \d+"), "port <PORT>"),
+    # Lignes de résumé de ReducteurLogs : compteur et liste des IP d'un regroupement, qui
+    # grossissent d'une exécution à l'autre sur un fichier actif sans changer le verdict
+    (re.compile(r"^\[\d+ x\]"), "[<N> x]"),
+    # L'exemple (ligne brute horodatée) d'un résumé n'entre pas dans la clé : seul le modèle compte
+    (re.compile(r" ; exemple : .*$"), ""),
+    (re.compile(r"depuis \d+ IP distinctes \([^)]*\)"), "depuis <N> IP distinctes (<IP>)"),
+]
+
+
+def normaliser_ligne(ligne):
+    """
+    Renvoie la forme normalisée d'une ligne de log (ou de résumé) : sans horodatage, nom d'hôte,
+    pid ni port source, qui changent à chaque ligne sans changer le verdict, ni compteur, liste
+    d'IP et exemple d'une ligne de résumé, afin qu'un même modèle réutilise son verdict. Les adresses IP
+    d'une ligne de log ou d'un résumé par IP et les utilisateurs sont conservés.
+    """
+    ligne = ligne.strip()
+    for regex, remplacement in MASQUES:
+        ligne = regex.sub(remplacement, ligne)
+    return ligne
+
+
+class CacheVerdicts:
+    """
+    Cache persistant (SQLite) des verdicts de LogAI par ligne, adressé par contenu.
+
+    La clé est l'empreinte SHA-256 de la ligne normalisée, du modèle et de la version du prompt :
+    une ligne déjà analysée, ou identique à un pid, un port ou un horodatage près, obtient son
+    verdict sans appel à l'API, et changer de modèle ou de prompt invalide le cache.
+    Les verdicts expirent après ttl_heures ; au-delà de capacite_max entrées, les moins
+    récemment utilisées sont évincées (LRU).
+    """
+    def __init__(self, chemin_db='cache_verdicts.db', ttl_heures=168, capacite_max=100_000):
+        self.chemin_db = chemin_db
+        self.ttl = ttl_heures * 3600
+        self.capacite_max = capacite_max
+        cn = self.connecter()
+        try:
+            cn.execute('''
+                CREATE TABLE IF NOT EXISTS verdict (
+                    cle TEXT PRIMARY KEY,
+                    intrusion_detectee INTEGER NOT NULL,
+                    raison TEXT,
+                    remediation TEXT,
+                    cree INTEGER NOT NULL,
+                    utilise INTEGER NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            cn.execute("CREATE INDEX IF NOT EXISTS idx_verdict_utilise ON verdict (utilise)")
+        finally:
+            cn.close()
+
+    def connecter(self):
+        """
+        Ouvre une connexion en mode WAL.
+        """
+        cn = sqlite3.connect(self.chemin_db)
+        cn.execute("PRAGMA journal_mode=WAL")
+        cn.execute("PRAGMA synchronous=NORMAL")
+        return cn
+
+    @staticmethod
+    def cle(ligne, modele, version_prompt):
+        """
+        Renvoie la clé de cache d'une ligne pour un modèle et une version de prompt.
+        """
+        return hashlib.sha256(f"{modele}\0{version_prompt}\0{normaliser_ligne(ligne)}".encode()).hexdigest()
+
+    def obtenir(self, cles):
+        """
+        Renvoie le dictionnaire {cle: verdict} des clés présentes et non expirées, et marque
+        ces entrées comme utilisées. Un verdict est un dictionnaire
+        {'intrusion_detectee': ..., 'raison': ..., 'remediation': ...}.
+        """
+        maintenant = int(time.time())
+        cles = list(set(cles))
+        verdicts = {}
+        cn = self.connecter()
+        try:
+            with cn:
+                for debut in range(0, len(cles), 500):  # Limite du nombre de paramètres SQLite
+                    paquet = cles[debut:debut + 500]
+                    marques = ",".join("?" * len(paquet))
+                    lignes = cn.execute(
+                        f"SELECT cle, intrusion_detectee, raison, remediation FROM verdict WHERE cle IN ({marques}) AND cree > ?",
+                        paquet + [maintenant - self.ttl]
+                    ).fetchall()
+                    for cle, intrusion_detectee, raison, remediation in lignes:
+                        verdicts[cle] = {'intrusion_detectee': bool(intrusion_detectee), 'raison': raison,
+                                         'remediation': remediation}
+                cn.executemany("UPDATE verdict SET utilise = ? WHERE cle = ?", ((maintenant, cle) for cle in verdicts))
+        finally:
+            cn.close()
+        return verdicts
+
+    def enregistrer(self, verdicts):
+        """
+        Enregistre le dictionnaire {cle: verdict}, puis supprime les entrées expirées et évince
+        les moins récemment utilisées au-delà de capacite_max.
+        """
+        maintenant = int(time.time())
+        cn = self.connecter()
+        try:
+            with cn:
+                cn.executemany(
+                    "INSERT OR REPLACE INTO verdict VALUES (?, ?, ?, ?, ?, ?)",
+                    ((cle, int(str(verdict.get('intrusion_detectee')).lower() == 'true'), verdict.get('raison'),
+                      verdict.get('remediation'), maintenant, maintenant) for cle, verdict in verdicts.items())
+                )
+                cn.execute("DELETE FROM verdict WHERE cree <= ?", (maintenant - self.ttl,))
+                (nombre,) = cn.execute("SELECT COUNT(*) FROM verdict").fetchone()
+                if nombre > self.capacite_max:
+                    cn.execute("DELETE FROM verdict WHERE cle IN (SELECT cle FROM verdict ORDER BY utilise LIMIT ?)",
+                               (nombre - self.capacite_max,))
+        finally:
+            cn.close()
@@ -0,0 +1,89 @@
+import sqlite3
+import threading
+import time
+import pandas as pd
+from modules.persistance import epoch
+
+
+class EtatAlertes:
+    """
+    Mémorise les alertes déjà envoyées, sous la forme (adresse IP, fenêtre [debut, fin)), afin
+    qu'une exécution planifiée qui relit les mêmes logs ne renvoie pas les mêmes alertes.
+
+    Une alerte est considérée comme déjà envoyée si la même IP a fait l'objet d'une alerte dont
+    la fenêtre chevauche la sienne : une fenêtre glissante dont le pic se décale d'une exécution
+    à l'autre ne déclenche donc pas de nouvelle alerte. L'état est conservé dans une base SQLite
+    (chemin_db), ou en mémoire pour la durée du processus si chemin_db vaut None.
+
+    Une alerte n'est enregistrée comme envoyée qu'après confirmation de son envoi
+    (enregistrer_envoi, appelée depuis le thread du DispatcheurNotifications) : une alerte dont
+    l'envoi a échoué est de nouveau proposée à l'exécution suivante. Entre-temps, elle est
+    considérée en cours d'envoi et n'est pas proposée une seconde fois.
+    """
+    def __init__(self, chemin_db=None, retention_jours=30):
+        self.chemin_db = chemin_db
+        self.retention = retention_jours * 86400
+        self.verrou = threading.Lock()
+        self.en_cours = {}  # Adresse IP -> fenêtres (debut, fin) des alertes en cours d'envoi
+        self.cn = sqlite3.connect(chemin_db or ":memory:", check_same_thread=False)
+        self.cn.execute('''
+            CREATE TABLE IF NOT EXISTS alerte_envoyee (
+                adresse_ip TEXT NOT NULL,
+                debut INTEGER NOT NULL,
+                fin INTEGER NOT NULL,
+                nombre INTEGER NOT NULL,
+                envoyee INTEGER NOT NULL,
+                PRIMARY KEY (adresse_ip, debut) -- Recherche des fenêtres d'une IP par leur début
+            ) WITHOUT ROWID
+        ''')
+
+    def filtrer_nouvelles(self, alertes):
+        """
+        Renvoie les alertes (DataFrame AdresseIP, Debut, Fin, NombreAcces) qui n'ont été ni
+        envoyées ni signalées, et les marque en cours d'envoi jusqu'à l'appel de
+        enregistrer_envoi. Les alertes plus anciennes que la rétention sont oubliées.
+        """
+        maintenant = int(time.time())
+        nouvelles = []
+        with self.verrou, self.cn:
+            self.cn.execute("DELETE FROM alerte_envoyee WHERE envoyee < ?", (maintenant - self.retention,))
+            for alerte in alertes.itertuples(index=False):
+                ip, debut, fin = str(alerte.AdresseIP), epoch(alerte.Debut), epoch(alerte.Fin)
+                deja_envoyee = any(d < fin and f > debut for d, f in self.en_cours.get(ip, ())) or self.cn.execute(
+                    "SELECT 1 FROM alerte_envoyee WHERE adresse_ip = ? AND debut < ? AND fin > ? LIMIT 1",
+                    (ip, fin, debut)
+                ).fetchone() is not None
+                nouvelles.append(not deja_envoyee)
+                if not deja_envoyee:
+                    self.en_cours.setdefault(ip, []).append((debut, fin))
+        return alertes[pd.Series(nouvelles, index=alertes.index, dtype=bool)]
+
+    def enregistrer_envoi(self, alertes, envoyees=True):
+        """
+        Termine l'envoi d'alertes renvoyées par filtrer_nouvelles : elles sont enregistrées
+        comme envoyées si envoyees est vrai, et seront sinon proposées de nouveau.
+        """
+        maintenant = int(time.time())
+        with self.verrou:
+            if self.cn is None:
+                return  # Base fermée pendant l'envoi (arrêt) : les alertes seront proposées de nouveau
+            with self.cn:
+                for alerte in alertes.itertuples(index=False):
+                    ip, debut, fin = str(alerte.AdresseIP), epoch(alerte.Debut), epoch(alerte.Fin)
+                    fenetres = self.en_cours.get(ip, [])
+                    if (debut, fin) in fenetres:
+                        fenetres.remove((debut, fin))
+                        if not fenetres:
+                            del self.en_cours[ip]
+                    if envoyees:
+                        self.cn.execute("INSERT OR REPLACE INTO alerte_envoyee VALUES (?, ?, ?, ?, ?)",
+                                        (ip, debut, fin, int(alerte.NombreAcces), maintenant))
+
+    def fermer(self):
+        """
+        Ferme la connexion à la base. Un envoi terminé ensuite n'est plus enregistré.
+        """
+        with self.verrou:
+            if self.cn is not None:
+                self.cn.close()
+                self.cn = None
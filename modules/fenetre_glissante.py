@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+def detecter_fenetre_glissante(adresses_ip, date_heures, fenetre, seuil_alerte, poids=None):
+    """
+    Détecte, pour chaque adresse IP, la fenêtre glissante de durée 'fenetre' contenant le plus
+    d'accès, et renvoie un DataFrame des IP dont ce pic dépasse seuil_alerte, avec les colonnes
+    AdresseIP, Debut, Fin et NombreAcces (trié par NombreAcces décroissant).
+
+    Contrairement au découpage en intervalles fixes, une rafale à cheval sur deux intervalles est
+    comptée en entier. Le calcul est vectorisé en O(n log n) : tri par (IP, horodatage), puis
+    pour chaque accès, recherche dichotomique de la fin de sa fenêtre [t, t + fenetre).
+    Si poids est fourni, chaque entrée compte pour poids accès (compteurs déjà agrégés).
+    """
+    colonnes = ['AdresseIP', 'Debut', 'Fin', 'NombreAcces']
+    if isinstance(adresses_ip.dtype, pd.CategoricalDtype):
+        codes, categories = adresses_ip.cat.codes.to_numpy(), adresses_ip.cat.categories
+    else:
+        codes, categories = pd.factorize(adresses_ip)
+    horodatages = np.asarray(date_heures, dtype='datetime64[ns]').view(np.int64)
+    fenetre = pd.Timedelta(fenetre).value
+
+    # Seules les IP ayant plus de seuil_alerte accès au total peuvent dépasser le seuil
+    valides = (codes >= 0) & (horodatages != np.iinfo(np.int64).min)
+    if poids is not None:
+        poids = np.asarray(poids, dtype=np.int64)
+    totaux = np.bincount(codes[valides], weights=None if poids is None else poids[valides], minlength=len(categories))
+    candidats = valides & (totaux[np.where(codes >= 0, codes, 0)] > seuil_alerte)
+    if not candidats.any():
+        return pd.DataFrame(columns=colonnes)
+    codes, horodatages = codes[candidats], horodatages[candidats]
+    if poids is not None:
+        poids = poids[candidats]
+
+    # Clé globalement croissante : chaque IP occupe sa propre plage de temps, séparée des autres
+    # d'au moins une fenêtre, ce qui permet un unique tri. Passage à la seconde si la nanoseconde
+    # déborde de l'int64.
+    origine = horodatages.min()
+    relatifs = horodatages - origine
+    unite = 1
+    if (int(relatifs.max()) + fenetre + 1) * (int(codes.max()) + 1) >= 2 ** 62:
+        unite = 1_000_000_000
+    fenetre_unite = -(-fenetre // unite)
+    pas = int(relatifs.max()) // unite + fenetre_unite + 1
+    cles = codes.astype(np.int64) * pas + relatifs // unite
+    if poids is None:
+        cles = np.sort(cles)
+    else:
+        ordre = np.argsort(cles, kind='stable')
+        cles, poids = cles[ordre], poids[ordre]
+    codes, horodatages = cles // pas, (cles % pas) * unite + origine
+    debuts_groupes = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    rangs = np.cumsum(np.r_[False, codes[1:] != codes[:-1]])
+
+    # Nombre d'accès dans la fenêtre commençant à chaque accès
+    fins = np.searchsorted(cles, cles + fenetre_unite, side='left')
+    if poids is None:
+        nombres = fins - np.arange(len(cles))
+    else:
+        cumul = np.r_[0, np.cumsum(poids)]
+        nombres = cumul[fins] - cumul[:-1]
+
+    # Pic de chaque IP : premier accès de nombre maximal dans son groupe
+    maximums = np.maximum.reduceat(nombres, debuts_groupes)
+    pics = np.flatnonzero(nombres == maximums[rangs])
+    pics = pics[np.r_[True, rangs[pics][1:] != rangs[pics][:-1]]]
+    pics = pics[nombres[pics] > seuil_alerte]
+
+    resultat = pd.DataFrame({
+        'AdresseIP': categories[codes[pics]],
+        'Debut': horodatages[pics].view('datetime64[ns]'),
+        'Fin': horodatages[fins[pics] - 1].view('datetime64[ns]'),
+        'NombreAcces': nombres[pics],
+    })
+    return resultat.sort_values('NombreAcces', ascending=False, kind='stable').reset_index(drop=True)
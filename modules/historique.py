@@ -0,0 +1,120 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+from modules.persistance import epoch
+from modules.adresses_ip import ips_en_valeurs_sqlite, valeur_sqlite_en_ip
+
+SECONDES_HEURE = 3600
+
+
+class HistoriqueIP:
+    """
+    Historique compact des accès par IP, conservé d'une exécution à l'autre dans une base SQLite.
+
+    Seuls des compteurs horaires sont stockés : une ligne (heure, adresse_ip, nombre) par IP et
+    par heure d'activité, l'heure étant en secondes depuis l'epoch (arrondie à l'heure), l'IPv4
+    en entier et l'IPv6 en BLOB de 16 octets. Chaque exécution ajoute les compteurs de ses nouveaux évènements (upsert), si bien
+    qu'une détection sur 24 heures ou une semaine ne coûte que l'agrégation de quelques milliers
+    de lignes, sans relire les anciens fichiers de logs.
+
+    Les compteurs étant cumulés, un même évènement ne doit être compté qu'une fois : l'historique
+    s'utilise avec la lecture incrémentale (checkpoint).
+    """
+    def __init__(self, chemin_db='historique_ips.db'):
+        """
+        Initialise l'historique avec le chemin de la base SQLite et crée la table si nécessaire.
+        """
+        self.chemin_db = chemin_db
+        cn = self.connecter()
+        try:
+            cn.execute('''
+                CREATE TABLE IF NOT EXISTS compteur_horaire (
+                    heure INTEGER NOT NULL,
+                    adresse_ip INTEGER NOT NULL,
+                    nombre INTEGER NOT NULL,
+                    PRIMARY KEY (heure, adresse_ip) -- Les requêtes portent sur une plage d'heures
+                ) WITHOUT ROWID
+            ''')
+        finally:
+            cn.close()
+
+    def connecter(self):
+        """
+        Ouvre une connexion en mode WAL.
+        """
+        cn = sqlite3.connect(self.chemin_db)
+        cn.execute("PRAGMA journal_mode=WAL")
+        cn.execute("PRAGMA synchronous=NORMAL")
+        return cn
+
+    def mettre_a_jour(self, df_logs):
+        """
+        Ajoute à l'historique les accès d'un DataFrame (DateHeure, AdresseIP), agrégés par IP et
+        par heure, en une seule transaction. Renvoie le nombre de compteurs horaires mis à jour.
+        """
+        df = df_logs[df_logs['DateHeure'].notna()]
+        if df.empty:
+            return 0
+
+        # Agrégation vectorisée par (heure, IP) avant l'écriture
+        secondes = pd.to_datetime(df['DateHeure']).to_numpy(dtype='datetime64[s]').astype(np.int64)
+        compteurs = (
+            pd.DataFrame({'heure': secondes - secondes % SECONDES_HEURE,
+                          'adresse_ip': ips_en_valeurs_sqlite(df['AdresseIP'])})
+                .groupby(['heure', 'adresse_ip'], sort=False)  # IPv4 (entiers) et IPv6 (octets) mêlées
+                .size()
+        )
+
+        cn = self.connecter()
+        try:
+            with cn:
+                cn.executemany('''
+                    INSERT INTO compteur_horaire (heure, adresse_ip, nombre) VALUES (?, ?, ?)
+                    ON CONFLICT (heure, adresse_ip) DO UPDATE SET nombre = nombre + excluded.nombre
+                ''', zip(compteurs.index.get_level_values('heure').tolist(),
+                         compteurs.index.get_level_values('adresse_ip').tolist(),
+                         compteurs.tolist()))
+        finally:
+            cn.close()
+        return len(compteurs)
+
+    def ips_recidivistes(self, heures=24, seuil=50, reference=None):
+        """
+        Renvoie un DataFrame (AdresseIP, NombreAcces, PremiereHeure, DerniereHeure) des IP ayant
+        plus de seuil accès sur les heures précédant reference (par défaut maintenant), trié par
+        NombreAcces décroissant.
+        """
+        reference = pd.Timestamp.now() if reference is None else pd.Timestamp(reference)
+        fin = epoch(reference)
+        debut = fin - heures * SECONDES_HEURE
+        cn = self.connecter()
+        try:
+            lignes = cn.execute('''
+                SELECT adresse_ip, SUM(nombre) AS total, MIN(heure), MAX(heure) FROM compteur_horaire
+                WHERE heure > :debut - 3600 AND heure <= :fin -- Heures chevauchant la période
+                GROUP BY adresse_ip HAVING total > :seuil ORDER BY total DESC
+            ''', {'debut': debut, 'fin': fin, 'seuil': seuil}).fetchall()
+        finally:
+            cn.close()
+
+        return pd.DataFrame({
+            'AdresseIP': [valeur_sqlite_en_ip(ip) for ip, _, _, _ in lignes],
+            'NombreAcces': [total for _, total, _, _ in lignes],
+            'PremiereHeure': pd.to_datetime([premiere for _, _, premiere, _ in lignes], unit='s'),
+            'DerniereHeure': pd.to_datetime([derniere for _, _, _, derniere in lignes], unit='s'),
+        })
+
+    def purger(self, retention_jours, reference=None):
+        """
+        Supprime les compteurs antérieurs de plus de retention_jours jours à reference (par
+        défaut maintenant) et renvoie leur nombre.
+        """
+        reference = pd.Timestamp.now() if reference is None else pd.Timestamp(reference)
+        limite = epoch(reference - pd.Timedelta(days=retention_jours))
+        cn = self.connecter()
+        try:
+            with cn:
+                supprimes = cn.execute("DELETE FROM compteur_horaire WHERE heure < ?", (limite,)).rowcount
+        finally:
+            cn.close()
+        return supprimes
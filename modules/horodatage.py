@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+FORMAT_AVEC_ANNEE = '%b %d %Y %H:%M:%S'  # ex. "Sep 29 2025 03:29:38"
+FORMAT_SANS_ANNEE = '%b %d %H:%M:%S %Y'  # ex. "Sep 29 03:29:38" complété par l'année déduite
+REGEX_AVEC_ANNEE = r'^[A-Za-z]{3}\s+\d{1,2}\s+\d{4}\s'
+FORMAT_CLF = '%d/%b/%Y:%H:%M:%S'  # ex. "29/Sep/2025:03:29:38 +0200" (logs d'accès nginx/Apache)
+REGEX_CLF = r'^\d{2}/[A-Za-z]{3}/\d{4}:\d{2}:\d{2}:\d{2}'
+REGEX_ISO = r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}'  # ex. "2025-09-29T03:29:38.123+02:00" (RFC 5424, journald, fail2ban)
+REGEX_FUSEAU = r'\s*(?:Z|[+-]\d{2}:?\d{2})$'
+TOLERANCE_FUTUR = pd.Timedelta(days=1)  # Décalage d'horloge toléré avant de changer d'année
+NAT = np.iinfo(np.int64).min  # Représentation entière de NaT
+
+
+class ConvertisseurHorodatage:
+    """
+    Convertit en une seule passe vectorisée des colonnes d'horodatages syslog, avec
+    ou sans année, ISO 8601 ou au format des logs d'accès (CLF), en datetime64[ns].
+    Le décalage horaire éventuel est ignoré : l'heure est conservée telle qu'écrite, comme
+    celle des logs syslog, qui n'en ont pas.
+
+    Seules les chaînes distinctes sont analysées (une colonne de logs répète beaucoup la même
+    seconde), et les conversions sont conservées en cache d'un appel à l'autre.
+    Pour les horodatages sans année, l'année est déduite de la date de référence : une date
+    qui tomberait dans le futur appartient à l'année précédente (logs de décembre lus en janvier).
+    Une telle conversion n'est valable que jusqu'à ce que la référence atteigne la même date
+    de son année : elle expire alors du cache (processus --suivre ou --planifier de longue durée).
+    """
+    def __init__(self, taille_cache=1_000_000):
+        self.taille_cache = taille_cache
+        self.cache = {}  # Chaîne -> nanosecondes depuis l'epoch
+        self.expirations = {}  # Chaîne placée dans l'année précédente -> fin de validité (nanosecondes)
+        self.prochaine_expiration = None
+        self.annee_cache = None  # Année de référence des conversions en cache
+
+    def convertir(self, valeurs, reference=None):
+        """
+        Convertit une série, une liste ou un tableau de chaînes en tableau datetime64[ns].
+        Les valeurs invalides donnent NaT.
+        """
+        reference = pd.Timestamp.now() if reference is None else pd.Timestamp(reference)
+        if self.annee_cache != reference.year:
+            self.__vider_cache()
+            self.annee_cache = reference.year
+        elif self.prochaine_expiration is not None and reference.value >= self.prochaine_expiration:
+            for chaine in [chaine for chaine, fin in self.expirations.items() if fin <= reference.value]:
+                del self.cache[chaine], self.expirations[chaine]
+            self.prochaine_expiration = min(self.expirations.values(), default=None)
+
+        # Une colonne catégorielle fournit directement ses valeurs distinctes
+        if isinstance(getattr(valeurs, 'dtype', None), pd.CategoricalDtype):
+            codes = valeurs.cat.codes.to_numpy()
+            uniques = valeurs.cat.categories.to_numpy(dtype=object)
+        else:
+            codes, uniques = pd.factorize(np.asarray(valeurs, dtype=object))
+
+        # Recherche en cache, puis analyse groupée des chaînes jamais vues
+        nanosecondes = np.array([self.cache.get(valeur, NAT) for valeur in uniques], dtype=np.int64)
+        manquantes = np.flatnonzero(nanosecondes == NAT)
+        if len(manquantes):
+            nouvelles, fins = self.__analyser(pd.Series(uniques[manquantes], dtype=object), reference)
+            nanosecondes[manquantes] = nouvelles
+            if len(self.cache) + len(manquantes) > self.taille_cache:
+                self.__vider_cache()
+            valides = nouvelles != NAT
+            self.cache.update(zip(uniques[manquantes][valides].tolist(), nouvelles[valides].tolist()))
+            expirantes = valides & (fins != NAT)
+            if expirantes.any():
+                self.expirations.update(zip(uniques[manquantes][expirantes].tolist(), fins[expirantes].tolist()))
+                fin_min = int(fins[expirantes].min())
+                self.prochaine_expiration = fin_min if self.prochaine_expiration is None else min(self.prochaine_expiration, fin_min)
+
+        # Propagation aux lignes ; le code -1 (valeur manquante) donne NaT
+        resultat = np.append(nanosecondes, NAT)[codes]
+        return resultat.view('datetime64[ns]')
+
+    def __vider_cache(self):
+        self.cache.clear()
+        self.expirations.clear()
+        self.prochaine_expiration = None
+
+    def __analyser(self, chaines, reference):
+        """
+        Analyse des chaînes distinctes et renvoie leurs nanosecondes (NAT si invalide) et la fin
+        de validité de celles placées dans l'année précédente (NAT pour les autres).
+        """
+        dates = pd.Series(pd.NaT, index=chaines.index, dtype='datetime64[ns]')
+        fins = pd.Series(pd.NaT, index=chaines.index, dtype='datetime64[ns]')
+
+        avec_annee = chaines.str.match(REGEX_AVEC_ANNEE).fillna(False).astype(bool)
+        if avec_annee.any():
+            dates[avec_annee] = pd.to_datetime(chaines[avec_annee], format=FORMAT_AVEC_ANNEE, errors='coerce')
+
+        iso = chaines.str.match(REGEX_ISO).fillna(False).astype(bool)
+        if iso.any():
+            sans_fuseau = chaines[iso].str.replace(REGEX_FUSEAU, '', regex=True).str.replace(',', '.', regex=False)
+            dates[iso] = pd.to_datetime(sans_fuseau, format='ISO8601', errors='coerce')
+
+        clf = chaines.str.match(REGEX_CLF).fillna(False).astype(bool)
+        if clf.any():
+            dates[clf] = pd.to_datetime(chaines[clf].str[:20], format=FORMAT_CLF, errors='coerce')
+
+        sans_annee = ~(avec_annee | iso | clf)
+        if sans_annee.any():
+            dates[sans_annee], fins[sans_annee] = self.__avec_annee_deduite(chaines[sans_annee], reference)
+
+        return dates.to_numpy(dtype='datetime64[ns]').view(np.int64), fins.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+    def __avec_annee_deduite(self, chaines, reference):
+        """
+        Complète des horodatages sans année avec l'année de référence, ou l'année précédente
+        si la date obtenue est dans le futur (ou n'existe pas, ex. 29 février).
+        Renvoie les dates et, pour celles placées dans l'année précédente, l'instant où la
+        référence cessera de les considérer dans le futur (NaT pour les autres).
+        """
+        dates = pd.to_datetime(chaines + f" {reference.year}", format=FORMAT_SANS_ANNEE, errors='coerce')
+        futures = dates > reference + TOLERANCE_FUTUR
+        fins = (dates - TOLERANCE_FUTUR).where(futures)
+        a_corriger = dates.isna() | futures
+        if a_corriger.any():
+            dates[a_corriger] = pd.to_datetime(chaines[a_corriger] + f" {reference.year - 1}",
+                                               format=FORMAT_SANS_ANNEE, errors='coerce')
+        return dates, fins
+
+
+# Instance partagée, afin que le cache profite à toutes les conversions du processus
+_convertisseur = ConvertisseurHorodatage()
+
+
+def convertir_horodatages(valeurs, reference=None):
+    """
+    Convertit une colonne d'horodatages syslog en tableau datetime64[ns] (voir ConvertisseurHorodatage).
+    """
+    return _convertisseur.convertir(valeurs, reference)
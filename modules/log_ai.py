@@ -1,94 +1,269 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+import asyncio
 import configparser
+import hashlib
 import json
- 
+import random
+from modules.cache_verdicts import CacheVerdicts
+
+CARACTERES_PAR_TOKEN = 4  # Estimation usuelle pour du texte latin
+TOKENS_PAR_VERDICT = 80  # Estimation de la réponse pour une ligne (numéro, booléen, raison et remédiation courtes)
+ERREURS_TEMPORAIRES = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+PROMPT = """
+        Voici des logs d'authentification. Analyse-les et formate la réponse en JSON,sans accent pour tout les mots et je souhaite que les reponses soit technique.
+        Les tentatives d'instrusions seront plusieurs tentatives avec la même adresse IP, n'utilise pas le mot securité dans tes reponses.
+        Chaque ligne de log est precedee de son numero ("<numero>| <log>"). Pour chaque ligne, sans recopier le log et sans accents
+        afin que ma reponse en JSON soit bien interpretee, indique si c'est une tentative d'intrusion sous la forme :
+        [{{
+            "ligne": <numero>,
+            "intrusion_detectee": <True/False>,
+            "raison": "<explication courte>",
+            "remediation": "<explication courte>"
+        }}]
+
+        Une ligne de la forme "[N x] ..." resume N logs similaires (compteur, periode et exemple) : traite-la comme une seule ligne de log.
+
+        Logs :
+        {logs}
+        """
+VERSION_PROMPT = hashlib.sha256(PROMPT.encode()).hexdigest()[:16]  # Invalide le cache des verdicts si le prompt change
+
 class LogAI:
-    def __init__(self, logs):
+    def __init__(self, logs, budget_tokens=None, concurrence=None, tentatives=5, cache=None, tokens_reponse=None):
         """
-        Initialise la classe avec une liste de lignes de log et lit la clé API OpenAI.
+        Initialise la classe avec une liste de lignes de log et lit la configuration OpenAI.
 
         Paramètres :
         logs (list) : Une liste contenant plusieurs lignes de logs à analyser.
+        budget_tokens (int) : Nombre maximal de tokens de logs par requête (section [openai] de config.ini, 3000 par défaut).
+        concurrence (int) : Nombre maximal de requêtes simultanées (section [openai] de config.ini, 4 par défaut).
+        tentatives (int) : Nombre maximal d'essais d'une requête en cas d'erreur temporaire.
+        cache (CacheVerdicts) : Cache persistant des verdicts par ligne (facultatif).
+        tokens_reponse (int) : Nombre maximal de tokens de chaque réponse (section [openai] de config.ini, 4096 par défaut).
         """
-        self.logs = logs
- 
-        # Initialisation du client avec la clé API
-        self.client = OpenAI(
-            api_key=self.__lire_cle_api()
+        self.logs = [ligne.rstrip("\r\n") for ligne in logs]
+        config = self.__lire_config()
+        self.modele = config.get('modele', 'gpt-3.5-turbo')
+        self.budget_tokens = budget_tokens or config.getint('budget_tokens', 3000)
+        self.concurrence = concurrence or config.getint('concurrence', 4)
+        self.tokens_reponse = tokens_reponse or config.getint('tokens_reponse', 4096)
+        self.tentatives = tentatives
+        self.cache = cache
+
+        # Initialisation du client asynchrone avec la clé API ; base_url permet de viser
+        # un serveur compatible (ex. benchmarks/serveur_openai_local.py pour les essais hors ligne).
+        # Les nouvelles tentatives sont gérées ici, avec backoff exponentiel.
+        self.client = AsyncOpenAI(
+            api_key=self.__lire_cle_api(config),
+            base_url=config.get('base_url'),
+            max_retries=0
         )
- 
+
         self.reponse_gpt_json = None
- 
-    def __lire_cle_api(self):
+
+    def __lire_config(self):
+        """
+        Lit la section [openai] du fichier de configuration 'config.ini'.
+        """
+        config = configparser.ConfigParser()
+        config.read('config.ini')
+        if not config.has_section('openai'):
+            config.add_section('openai')
+        return config['openai']
+
+    def __lire_cle_api(self, config):
         """
         Lit la clé API OpenAI à partir du fichier de configuration 'config.ini'.
- 
+
         Retourne :
         str : La clé API OpenAI.
         """
-        config = configparser.ConfigParser()
-        config.read('config.ini') 
- 
         try:
-            api_key = config['openai']['api_key']
+            api_key = config['api_key']
             return api_key
         except KeyError:
             raise KeyError("La clé API OpenAI n'a pas été trouvée dans 'config.ini'. Vérifiez le fichier.")
- 
+
+    def decouper_en_lots(self, logs=None):
+        """
+        Découpe les logs (par défaut self.logs) en lots dont la taille estimée (4 caractères par token) ne dépasse pas
+        budget_tokens, et dont la réponse attendue (TOKENS_PAR_VERDICT par ligne) tient dans tokens_reponse.
+        Une ligne plus longue que le budget forme un lot à elle seule.
+
+        Retourne :
+        list : La liste des lots, chacun étant une liste de lignes.
+        """
+        lignes_max = max(1, self.tokens_reponse // TOKENS_PAR_VERDICT)
+        lots, lot, tokens_lot = [], [], 0
+        for ligne in self.logs if logs is None else logs:
+            tokens = len(ligne) // CARACTERES_PAR_TOKEN + 1
+            if lot and (tokens_lot + tokens > self.budget_tokens or len(lot) >= lignes_max):
+                lots.append(lot)
+                lot, tokens_lot = [], 0
+            lot.append(ligne)
+            tokens_lot += tokens
+        if lot:
+            lots.append(lot)
+        return lots
+
     def analyser_logs_avec_gpt(self):
         """
         Utilise l'API d'OpenAI pour analyser les logs d'authentification et détecter des comportements suspects,
-        en demandant une réponse structurée en JSON.
- 
+        en demandant une réponse structurée en JSON. Les lots sont envoyés en parallèle (au plus
+        concurrence requêtes simultanées), puis leurs réponses sont fusionnées en un seul rapport.
+        Avec un cache, seules les lignes inconnues (une fois chacune) sont envoyées ; les autres
+        reçoivent leur verdict en cache, marqué 'cache': true dans le rapport.
+
         Retourne :
         dict : Un dictionnaire contenant le resultat des logs sous forme JSON.
         """
-        # Convertir la liste de logs en une chaîne de caractères
-        logs_str = "\n".join(self.logs)
- 
-        # Demander à GPT de formater la réponse en JSON
-        prompt = f"""
-        Voici des logs d'authentification. Analyse-les et formate la réponse en JSON,sans accent pour tout les mots et je souhaite que les reponses soit technique.
-        Les tentatives d'instrusions seront plusieurs tentatives avec la même adresse IP, n'utilise pas le mot securité dans tes reponses.
-        Pour chaque ligne de log enleve les accents afin que ma reponse en JSON soit bien interpreté, indique si c'est une tentative d'intrusion sous la forme :
-        [{{
-            "log": "<contenu_du_log>",
-            "intrusion_detectee": <True/False>,
-            "raison": "<explication>"
-            "remediation : "<explication>"
-        }}]
- 
-        Logs :
-        {logs_str}
-        """
- 
-        # Appel à l'API OpenAI pour interroger GPT
-        reponse = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=4096,
-            temperature=0.3
+        if not self.logs:
+            raise ValueError("Aucun log à analyser.")
+
+        verdicts_cache = {}
+        logs_a_envoyer = self.logs
+        if self.cache:
+            cles = [CacheVerdicts.cle(ligne, self.modele, VERSION_PROMPT) for ligne in self.logs]
+            verdicts_cache = self.cache.obtenir(cles)
+            nouvelles = {}  # Une seule requête par ligne inconnue, même répétée
+            for cle, ligne in zip(cles, self.logs):
+                if cle not in verdicts_cache:
+                    nouvelles.setdefault(cle, ligne)
+            logs_a_envoyer = list(nouvelles.values())
+
+        lots = self.decouper_en_lots(logs_a_envoyer)
+        resultats = asyncio.run(self.__analyser_lots(lots)) if lots else []
+
+        rapport = {'nombre_logs': len(self.logs), 'nombre_lots': len(lots), 'depuis_cache': len(verdicts_cache),
+                   'intrusions_detectees': 0, 'resultats': [], 'erreurs': []}
+        nouveaux_verdicts = {}
+        for numero, (lot, resultat) in enumerate(zip(lots, resultats)):
+            if isinstance(resultat, Exception):
+                rapport['erreurs'].append({'lot': numero, 'erreur': str(resultat)})
+            else:
+                rapport['resultats'].extend(resultat)
+                nouveaux_verdicts.update(self.__associer_verdicts(lot, resultat))
+
+        if self.cache:
+            self.cache.enregistrer(nouveaux_verdicts)
+            lignes_cache = {}
+            for cle, ligne in zip(cles, self.logs):
+                if cle in verdicts_cache:
+                    lignes_cache.setdefault(cle, ligne)
+            rapport['resultats'].extend({'log': ligne, **verdicts_cache[cle], 'cache': True}
+                                        for cle, ligne in lignes_cache.items())
+        rapport['intrusions_detectees'] = sum(
+            1 for entree in rapport['resultats']
+            if isinstance(entree, dict) and str(entree.get('intrusion_detectee')).lower() == 'true'
         )
- 
+
+        if not rapport['resultats']:
+            raise ValueError("Aucun lot n'a pu être analysé par GPT :\n" + json.dumps(rapport['erreurs'], indent=4))
+        self.reponse_gpt_json = rapport
+        return rapport
+
+    def __associer_verdicts(self, lot, resultat):
+        """
+        Renvoie le dictionnaire {cle de cache: verdict} des verdicts d'un lot associés à une de
+        ses lignes (champ "log", renseigné d'après le numéro de ligne).
+        """
+        if not self.cache:
+            return {}
+        lignes = set(lot)
+        return {CacheVerdicts.cle(entree['log'], self.modele, VERSION_PROMPT): entree for entree in resultat
+                if isinstance(entree, dict) and entree.get('log') in lignes}
+
+    async def __analyser_lots(self, lots):
+        """
+        Envoie tous les lots en parallèle, limités par un sémaphore, et renvoie pour chaque lot
+        la liste de ses résultats, ou l'exception qui l'a fait échouer.
+        """
+        semaphore = asyncio.Semaphore(self.concurrence)
+        try:
+            return await asyncio.gather(*(self.__analyser_lot(semaphore, lot) for lot in lots), return_exceptions=True)
+        finally:
+            await self.client.close()
+
+    async def __analyser_lot(self, semaphore, lot):
+        """
+        Analyse un lot de logs. Les erreurs temporaires (limite de débit, erreur serveur, réseau)
+        sont réessayées avec un backoff exponentiel. Une réponse tronquée (tokens_reponse atteint)
+        est redemandée en deux moitiés du lot.
+        """
+        for tentative in range(self.tentatives):
+            try:
+                async with semaphore:
+                    # Appel à l'API OpenAI pour interroger GPT
+                    reponse = await self.client.chat.completions.create(
+                        model=self.modele,
+                        messages=[
+                            {"role": "user", "content": PROMPT.format(logs="\n".join(f"{numero}| {ligne}" for numero, ligne in enumerate(lot, 1)))}
+                        ],
+                        max_tokens=self.tokens_reponse,
+                        temperature=0.3
+                    )
+                break
+            except ERREURS_TEMPORAIRES as e:
+                if tentative == self.tentatives - 1:
+                    raise
+                await asyncio.sleep(self.__delai_attente(e, tentative))
+
+        # Réponse tronquée : le lot est découpé en deux
+        if reponse.choices[0].finish_reason == 'length' and len(lot) > 1:
+            milieu = len(lot) // 2
+            moities = await asyncio.gather(self.__analyser_lot(semaphore, lot[:milieu]), self.__analyser_lot(semaphore, lot[milieu:]))
+            return moities[0] + moities[1]
+
         # Retourne la réponse générée par GPT
         reponse_gpt = reponse.choices[0].message.content
- 
+
         # Tenter de convertir la réponse en JSON
         try:
-            self.reponse_gpt_json = json.loads(reponse_gpt)
+            resultat = json.loads(reponse_gpt)
         except json.JSONDecodeError:
             raise ValueError("La réponse de GPT n'est pas un JSON valide. Voici la réponse brute :\n" + reponse_gpt)
- 
+        return self.__completer_verdicts(lot, resultat if isinstance(resultat, list) else [resultat])
+
+    @staticmethod
+    def __completer_verdicts(lot, verdicts):
+        """
+        Renseigne le champ "log" de chaque verdict d'après son numéro de ligne dans le lot (dans
+        l'ordre, à défaut de numéro valide, s'il y a un verdict par ligne).
+        """
+        par_ordre = len(verdicts) == len(lot)
+        for position, verdict in enumerate(verdicts):
+            if not isinstance(verdict, dict):
+                continue
+            numero = verdict.pop('ligne', None)
+            if isinstance(numero, int) and 1 <= numero <= len(lot):
+                verdict['log'] = lot[numero - 1]
+            elif par_ordre:
+                verdict['log'] = lot[position]
+        return verdicts
+
+    @staticmethod
+    def __delai_attente(erreur, tentative):
+        """
+        Renvoie le délai avant une nouvelle tentative : celui indiqué par l'en-tête Retry-After
+        s'il existe, sinon un backoff exponentiel avec gigue (1 s, 2 s, 4 s... plafonné à 30 s).
+        """
+        reponse = getattr(erreur, 'response', None)
+        if reponse is not None:
+            try:
+                return float(reponse.headers['retry-after'])
+            except (KeyError, ValueError):
+                pass
+        return min(30, 2 ** tentative) * (0.5 + random.random() / 2)
+
     def dump_reponse(self):
         """
         Écrit la réponse JSON générée par GPT en texte.
- 
+
         Paramètres :
         chemin_fichier (str) : Le chemin du fichier où écrire la réponse JSON.
         """
         if self.reponse_gpt_json:
             return json.dumps(self.reponse_gpt_json, indent=4)
         else:
-            raise ValueError("Aucune réponse JSON n'a été générée.")
\ No newline at end of file
+            raise ValueError("Aucune réponse JSON n'a été générée.")
@@ -1,93 +1,325 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
-import sqlite3
 from colorama import Fore, Style, init, Back
+from modules.horodatage import convertir_horodatages
+from modules.fenetre_glissante import detecter_fenetre_glissante
+from modules.persistance import PersistanceSQLite
+from modules.adresses_ip import agreger_par_reseau
  
 def parse_date(date_str):
     """
     Tente de parser la date au format avec année (ex. "Sep 29 2025 03:29:38"),
-    sinon parse sans l'année.
+    sinon parse sans l'année (l'année est alors déduite, voir ConvertisseurHorodatage).
     """
-    try:
-        return pd.to_datetime(date_str, format='%b %d %Y %H:%M:%S')
-    except ValueError:
-        dt = pd.to_datetime(date_str, format='%b %d %H:%M:%S')
-        return dt.replace(year=pd.Timestamp.now().year)
+    date = pd.Timestamp(convertir_horodatages([date_str])[0])
+    if pd.isna(date):
+        raise ValueError(f"Format de date non reconnu : {date_str}")
+    return date
  
 class LogAnalyzer:
-    def __init__(self, df_logs):
+    def __init__(self, df_logs, liste_autorisee=None, liste_interdite=None):
         """
-        Initialise l'objet LogAnalyzer avec un DataFrame contenant les logs extraits.
+        Initialise l'objet LogAnalyzer avec un DataFrame contenant les logs extraits, et
+        éventuellement les listes d'autorisation et d'interdiction (IndexCIDR) : les adresses
+        autorisées ne sont jamais comptées dans la détection par fréquence, les adresses interdites
+        sont toujours critiques (l'interdiction l'emporte si une adresse figure dans les deux).
+        Une colonne NombreAcces facultative donne le nombre d'accès représentés par chaque ligne
+        (compteurs déjà agrégés, ex. Agregateur) ; sans elle, chaque ligne compte pour un accès.
         """
         self.df_logs = df_logs
+        self.liste_autorisee = liste_autorisee
+        self.liste_interdite = liste_interdite
+        self.pics_fenetre_glissante = None  # Pic d'accès par IP du dernier mode 'glissante'
+        self.reseaux_ip = None  # Réseau de chaque entrée, si la dernière analyse agrégeait par préfixe
+        # Alertes levées par les analyses : une ligne par (IP, fenêtre [Debut, Fin)) dépassant le seuil
+        self.alertes = pd.DataFrame({'AdresseIP': pd.Series(dtype=object), 'Debut': pd.Series(dtype='datetime64[ns]'),
+                                     'Fin': pd.Series(dtype='datetime64[ns]'), 'NombreAcces': pd.Series(dtype='int64')})
  
-    def analyser_frequence_ips(self, intervalle_temps='1min', seuil_alerte=10):
+    def analyser_frequence_ips(self, intervalle_temps='1min', seuil_alerte=10, mode='fixe', prefixe_v4=32, prefixe_v6=128):
         """
         Analyse la fréquence d'accès des adresses IP sur un intervalle de temps donné.
-        Si une IP dépasse le seuil d'accès, toutes ses entrées sont marqués en ajoutant " CRITICAL"
-        dans la colonne Evenement. La fonction affiche ensuite les accès suspects et renvoie
-        les évènements critiques détectés sous forme de dictionnaire.
+        En mode 'fixe', les accès sont comptés par intervalles calendaires (pd.Grouper) ; en mode
+        'glissante', sur une fenêtre glissante de même durée, dont le pic est rapporté pour chaque IP.
+        Avec des préfixes plus courts que l'adresse (ex. prefixe_v4=24, prefixe_v6=64), les accès
+        sont comptés par réseau, afin de détecter une attaque répartie sur plusieurs adresses.
+        Si une IP (ou son réseau) dépasse le seuil d'accès, toutes ses entrées sont marquées dans la
+        colonne booléenne Critique, de même que celles des adresses de la liste d'interdiction.
+        La fonction affiche ensuite les accès suspects et renvoie les évènements critiques détectés
+        sous forme de dictionnaire (Evenement suffixé par " CRITICAL").
         """
         if self.df_logs.empty:
             print("Le DataFrame est vide. Veuillez charger les logs avant l'analyse.")
             return None
  
-        # Convertir la colonne 'DateHeure' en datetime en utilisant parse_date
+        # Convertir la colonne 'DateHeure' en datetime en une seule passe vectorisée
+        # (LogReader fournit déjà une colonne datetime64, la conversion est alors inutile)
         try:
-            self.df_logs['DateHeure'] = self.df_logs['DateHeure'].apply(parse_date)
+            if not pd.api.types.is_datetime64_any_dtype(self.df_logs['DateHeure']):
+                self.df_logs['DateHeure'] = convertir_horodatages(self.df_logs['DateHeure'])
         except Exception as e:
             print(f" Erreur lors de la conversion des dates : {e}")
             return None
- 
+
+        # Clé de comptage : l'adresse, ou son réseau si un préfixe plus court est demandé
+        cles = agreger_par_reseau(self.df_logs['AdresseIP'], prefixe_v4, prefixe_v6)
+        self.reseaux_ip = None if cles is self.df_logs['AdresseIP'] else cles
+        df = self.df_logs.assign(AdresseIP=cles)
+        comptees = None  # Entrées hors de la liste d'autorisation
+        if self.liste_autorisee:
+            comptees = ~self.liste_autorisee.masque(self.df_logs['AdresseIP'])
+            df = df[comptees]
+
+        if mode == 'glissante':
+            ips_suspectes = self.__analyser_fenetre_glissante(df, intervalle_temps, seuil_alerte)
+        else:
+            ips_suspectes = self.__analyser_intervalles_fixes(df, intervalle_temps, seuil_alerte)
+
+        # Statut critique stocké dans une colonne booléenne (cumulée d'une analyse à l'autre),
+        # toutes les entrées des IP suspectes étant marquées en une seule passe
+        if 'Critique' not in self.df_logs.columns:
+            self.df_logs['Critique'] = False
+        if len(ips_suspectes):
+            suspectes = cles.isin(ips_suspectes)
+            self.df_logs['Critique'] |= suspectes if comptees is None else suspectes & comptees
+        if self.liste_interdite:
+            self.__analyser_liste_interdite()
+
+        # Sélection des événements critiques par la colonne booléenne
+        evenements_critiques = self.libeller_evenements(self.df_logs[self.df_logs['Critique']])
+        if not evenements_critiques.empty:
+            print(f"\n{Fore.RED}🚨 Évènements CRITIQUES détectés :{Style.RESET_ALL}")
+            print(evenements_critiques)
+            return evenements_critiques.to_dict(orient='records')
+        else:
+            print("\nAucun évènement critique détecté.")
+            return None
+
+    def __analyser_intervalles_fixes(self, df, intervalle_temps, seuil_alerte):
+        """
+        Compte les accès par IP dans des intervalles fixes et renvoie les IP dépassant le seuil.
+        """
         # Grouper par adresse IP et par intervalle de temps
         acces_par_ip = (
-            self.df_logs
+            df
                 .set_index('DateHeure')
-                .groupby([pd.Grouper(freq=intervalle_temps), 'AdresseIP'])
-                .size()
+                .groupby([pd.Grouper(freq=intervalle_temps), 'AdresseIP'], observed=True)
+                .pipe(self.compter_acces)
         )
  
         # Filtrer les groupes qui dépassent le seuil d'alerte
         acces_suspects = acces_par_ip[acces_par_ip > seuil_alerte]
- 
+
         if not acces_suspects.empty:
             print(f"\n{Fore.RED}🚨 Accès suspects détectés (plus de {seuil_alerte} accès par IP dans {intervalle_temps}) :{Style.RESET_ALL}")
             for (interval, ip), count in acces_suspects.items():
                 print(f"- Intervalle: {interval}, IP: {ip}, Nombre d'accès: {count}")
-                # Marquer les événements pour cette IP en ajoutant " CRITICAL" (si non déjà présent)
-                idx = self.df_logs[self.df_logs['AdresseIP'] == ip].index
-                self.df_logs.loc[idx, 'Evenement'] = self.df_logs.loc[idx, 'Evenement'].apply(
-                    lambda x: x if "CRITICAL" in x.upper() else x + " CRITICAL"
-                )
         else:
             print(f"Aucun accès suspect détecté dans l'intervalle de {intervalle_temps}.")
- 
-        # Recherche des événements critiques dans la colonne 'Evenement'
-        evenements_critiques = self.df_logs[self.df_logs['Evenement'].str.contains("CRITICAL", case=False, na=False)]
-        if not evenements_critiques.empty:
-            print(f"\n{Fore.RED}🚨 Évènements CRITIQUES détectés :{Style.RESET_ALL}")
-            print(evenements_critiques)
-            return evenements_critiques.to_dict(orient='records')
+
+        debuts = acces_suspects.index.get_level_values('DateHeure')
+        self.__ajouter_alertes(acces_suspects.index.get_level_values('AdresseIP'), debuts,
+                               debuts + pd.tseries.frequencies.to_offset(intervalle_temps), acces_suspects.to_numpy())
+        return acces_suspects.index.get_level_values('AdresseIP').unique()
+
+    def __analyser_fenetre_glissante(self, df, intervalle_temps, seuil_alerte):
+        """
+        Compte les accès par IP sur une fenêtre glissante et renvoie les IP dont le pic dépasse le seuil.
+        Les pics sont conservés dans l'attribut pics_fenetre_glissante.
+        """
+        self.pics_fenetre_glissante = detecter_fenetre_glissante(
+            df['AdresseIP'], df['DateHeure'], intervalle_temps, seuil_alerte, df.get('NombreAcces')
+        )
+
+        if not self.pics_fenetre_glissante.empty:
+            print(f"\n{Fore.RED}🚨 Accès suspects détectés (plus de {seuil_alerte} accès par IP sur une fenêtre glissante de {intervalle_temps}) :{Style.RESET_ALL}")
+            for pic in self.pics_fenetre_glissante.itertuples():
+                print(f"- IP: {pic.AdresseIP}, Pic: {pic.Debut} -> {pic.Fin}, Nombre d'accès: {pic.NombreAcces}")
         else:
-            print("\nAucun évènement critique détecté.")
+            print(f"Aucun accès suspect détecté sur une fenêtre glissante de {intervalle_temps}.")
+
+        pics = self.pics_fenetre_glissante
+        self.__ajouter_alertes(pics['AdresseIP'], pics['Debut'], pics['Debut'] + pd.Timedelta(intervalle_temps),
+                               pics['NombreAcces'])
+        return self.pics_fenetre_glissante['AdresseIP'].unique()
+
+    def __analyser_liste_interdite(self):
+        """
+        Marque comme critiques les entrées des adresses de la liste d'interdiction, quel que soit
+        leur nombre d'accès, avec une alerte par adresse couvrant toute sa période d'activité.
+        """
+        interdites = self.liste_interdite.masque(self.df_logs['AdresseIP'])
+        if not interdites.any():
+            return
+        self.df_logs['Critique'] |= interdites
+        groupes = self.df_logs[interdites].groupby('AdresseIP', observed=True)
+        par_ip = groupes.agg(Debut=('DateHeure', 'min'), Fin=('DateHeure', 'max')).assign(NombreAcces=self.compter_acces(groupes))
+        print(f"\n{Fore.RED}🚨 Accès d'adresses de la liste d'interdiction :{Style.RESET_ALL}")
+        for ip, resume in par_ip.iterrows():
+            print(f"- IP: {ip}, Période: {resume['Debut']} -> {resume['Fin']}, Nombre d'accès: {resume['NombreAcces']}")
+        self.__ajouter_alertes(par_ip.index, par_ip['Debut'], par_ip['Fin'] + pd.Timedelta(seconds=1), par_ip['NombreAcces'])
+
+    def __ajouter_alertes(self, adresses_ip, debuts, fins, nombres):
+        """
+        Ajoute des alertes (IP, fenêtre [Debut, Fin), nombre d'accès) à l'attribut alertes.
+        """
+        if len(adresses_ip):
+            nouvelles = pd.DataFrame({'AdresseIP': pd.Index(adresses_ip).astype(str), 'Debut': pd.Index(debuts),
+                                      'Fin': pd.Index(fins), 'NombreAcces': pd.Index(nombres).astype('int64')})
+            self.alertes = pd.concat([self.alertes, nouvelles], ignore_index=True)
+
+    def analyser_historique(self, historique, heures=24, seuil_alerte=50, retention_jours=30):
+        """
+        Ajoute les accès du DataFrame à l'historique (HistoriqueIP) puis y recherche les IP ayant
+        plus de seuil_alerte accès sur les dernières heures, exécutions précédentes comprises.
+        La période se termine au dernier évènement lu. Les entrées des IP trouvées sont marquées
+        dans la colonne Critique, et le DataFrame des IP récidivistes est renvoyé.
+        Les compteurs plus anciens que retention_jours (au moins la période analysée) sont purgés.
+        """
+        if self.df_logs.empty:
+            print("Le DataFrame est vide. Veuillez charger les logs avant l'analyse.")
             return None
- 
-    def afficher_evenements_par_date(self):
+
+        if not pd.api.types.is_datetime64_any_dtype(self.df_logs['DateHeure']):
+            self.df_logs['DateHeure'] = convertir_horodatages(self.df_logs['DateHeure'])
+
+        reference = self.df_logs['DateHeure'].max()
+        historique.mettre_a_jour(self.df_logs)
+        historique.purger(max(retention_jours, (heures + 1) / 24), reference=reference)
+        recidivistes = historique.ips_recidivistes(heures, seuil_alerte, reference=reference)
+
+        if 'Critique' not in self.df_logs.columns:
+            self.df_logs['Critique'] = False
+        if not recidivistes.empty:
+            print(f"\n{Fore.RED}🚨 IP récidivistes (plus de {seuil_alerte} accès sur {heures} heures, historique compris) :{Style.RESET_ALL}")
+            for ip in recidivistes.itertuples():
+                print(f"- IP: {ip.AdresseIP}, Nombre d'accès: {ip.NombreAcces}, Période: {ip.PremiereHeure} -> {ip.DerniereHeure}")
+            self.df_logs['Critique'] |= self.df_logs['AdresseIP'].isin(recidivistes['AdresseIP'])
+            self.__ajouter_alertes(recidivistes['AdresseIP'], recidivistes['PremiereHeure'],
+                                   recidivistes['DerniereHeure'] + pd.Timedelta(hours=1), recidivistes['NombreAcces'])
+        else:
+            print(f"Aucune IP récidiviste sur les {heures} dernières heures.")
+        return recidivistes
+
+    def agreger_evenements(self):
+        """
+        Agrège les évènements par (AdresseIP, Utilisateur, Evenement) et renvoie un DataFrame
+        avec leur NombreAcces, leur premier (Debut) et leur dernier (Fin) horodatage, trié par
+        NombreAcces décroissant.
+        """
+        if not pd.api.types.is_datetime64_any_dtype(self.df_logs['DateHeure']):
+            self.df_logs['DateHeure'] = convertir_horodatages(self.df_logs['DateHeure'])
+
+        agregats = (
+            self.df_logs
+                .groupby(['AdresseIP', 'Utilisateur', 'Evenement'], observed=True)
+                .agg(NombreAcces=('DateHeure', 'size'), Debut=('DateHeure', 'min'), Fin=('DateHeure', 'max'))
+                .reset_index()
+        )
+        return agregats.sort_values('NombreAcces', ascending=False, kind='stable').reset_index(drop=True)
+
+    def resumer_alertes(self, alertes=None, ips_max=20, utilisateurs_max=3):
         """
-        Affiche un graphique de l'évolution des événements critiques par date.
+        Résume des alertes (par défaut l'attribut alertes) en une ligne de texte par IP : nombre
+        de fenêtres et d'accès, période, évènements et utilisateurs visés (accès des fenêtres
+        d'alerte, dont le détail totalise le nombre d'accès). Au-delà de ips_max IP,
+        les suivantes sont regroupées en une dernière ligne. Renvoie la liste des lignes.
+        """
+        alertes = self.alertes if alertes is None else alertes
+        if alertes.empty:
+            return []
+
+        par_ip = (
+            alertes
+                .groupby('AdresseIP', sort=False)
+                .agg(Fenetres=('Debut', 'size'), NombreAcces=('NombreAcces', 'sum'), Debut=('Debut', 'min'), Fin=('Fin', 'max'))
+                .sort_values('NombreAcces', ascending=False, kind='stable')
+        )
+        detail = par_ip.head(ips_max)
+        evenements = self.df_logs[self.df_logs['AdresseIP'].isin(detail.index)]
+        evenements = evenements.assign(AdresseIP=evenements['AdresseIP'].astype(str))
+        if self.reseaux_ip is not None:  # Alertes par réseau de la dernière analyse de fréquence
+            reseaux = self.reseaux_ip.astype(str)
+            par_reseau = reseaux.isin(detail.index) & (reseaux != self.df_logs['AdresseIP'].astype(str))
+            evenements = pd.concat([evenements, self.df_logs[par_reseau].assign(AdresseIP=reseaux[par_reseau])])
+        # Seuls les accès des fenêtres d'alerte sont détaillés, afin que le détail totalise le nombre
+        # d'accès annoncé : chaque ligne compte autant de fois que de fenêtres de son IP la contiennent
+        horodatages = evenements['DateHeure'].to_numpy(dtype='datetime64[ns]')
+        adresses = evenements['AdresseIP'].to_numpy()
+        multiplicites = np.zeros(len(evenements), dtype=np.int64)
+        for ip, fenetres in alertes[alertes['AdresseIP'].isin(detail.index)].groupby('AdresseIP'):
+            lignes = np.flatnonzero(adresses == ip)
+            debuts = np.sort(fenetres['Debut'].to_numpy(dtype='datetime64[ns]'))
+            fins = np.sort(fenetres['Fin'].to_numpy(dtype='datetime64[ns]'))
+            multiplicites[lignes] = (np.searchsorted(debuts, horodatages[lignes], side='right')
+                                     - np.searchsorted(fins, horodatages[lignes], side='right'))
+        if 'NombreAcces' in evenements.columns:
+            multiplicites *= evenements['NombreAcces'].to_numpy(dtype=np.int64)
+        evenements = evenements.assign(NombreAcces=multiplicites)[multiplicites > 0]
+        compteurs_evenements = self.compter_acces(evenements.groupby(['AdresseIP', 'Evenement'], observed=True))
+        compteurs_utilisateurs = self.compter_acces(evenements.groupby(['AdresseIP', 'Utilisateur'], observed=True))
+
+        lignes = []
+        for ip, resume in detail.iterrows():
+            ligne = (f"IP {ip} : {resume['NombreAcces']} accès sur {resume['Fenetres']} fenêtre(s) "
+                     f"entre {resume['Debut']} et {resume['Fin']}")
+            if ip in compteurs_evenements.index.get_level_values('AdresseIP'):
+                ligne += " ; " + ", ".join(f"{evenement} x{nombre}" for evenement, nombre in compteurs_evenements[ip].items())
+                utilisateurs = compteurs_utilisateurs[ip].sort_values(ascending=False)
+                ligne += " ; utilisateurs : " + ", ".join(map(str, utilisateurs.index[:utilisateurs_max]))
+                if len(utilisateurs) > utilisateurs_max:
+                    ligne += f" (+{len(utilisateurs) - utilisateurs_max})"
+            lignes.append(ligne)
+
+        if len(par_ip) > ips_max:
+            autres = par_ip.iloc[ips_max:]
+            lignes.append(f"... et {len(autres)} autres IP ({autres['NombreAcces'].sum()} accès).")
+        return lignes
+
+    @staticmethod
+    def compter_acces(groupes):
+        """
+        Renvoie le nombre d'accès de chaque groupe : somme de la colonne NombreAcces si elle
+        existe, nombre de lignes sinon.
+        """
+        if 'NombreAcces' in groupes.obj.columns:
+            return groupes['NombreAcces'].sum()
+        return groupes.size()
+
+    @staticmethod
+    def libeller_evenements(df_logs):
+        """
+        Renvoie une copie du DataFrame sans la colonne 'Critique', où " CRITICAL" est ajouté
+        au libellé de l'Evenement des lignes critiques (format des enregistrements renvoyés).
+        """
+        df = df_logs.drop(columns='Critique', errors='ignore')
+        if 'Critique' in df_logs.columns and df_logs['Critique'].any():
+            evenements = df['Evenement'].astype(str)
+            df['Evenement'] = evenements.where(~df_logs['Critique'], evenements + " CRITICAL")
+        return df
+
+    def afficher_evenements_par_date(self, fichier=None):
+        """
+        Affiche un graphique de l'évolution des événements critiques par date. Si un fichier est
+        indiqué, le graphique y est enregistré (PNG) avec le moteur Agg, sans affichage : utile sur
+        un serveur sans écran, où plt.show() bloquerait l'exécution.
+        matplotlib n'est importé qu'ici, afin de ne pas ralentir le démarrage des autres analyses.
         """
         if not self.df_logs.empty:
             try:
-                # On suppose ici que les dates sont au format avec année.
-                self.df_logs['DateHeure'] = pd.to_datetime(self.df_logs['DateHeure'], format='%b %d %Y %H:%M:%S')
+                if not pd.api.types.is_datetime64_any_dtype(self.df_logs['DateHeure']):
+                    self.df_logs['DateHeure'] = convertir_horodatages(self.df_logs['DateHeure'])
             except Exception as e:
                 print(f" ⚠️ Erreur lors de la conversion des dates : {e}")
                 return
  
             # Compter le nombre d'événements critiques par jour
             evenements_par_date = self.df_logs.groupby(self.df_logs['DateHeure'].dt.date).size()
- 
+
+            import matplotlib
+            if fichier:
+                matplotlib.use("Agg")  # Rendu en mémoire, sans fenêtre
+            import matplotlib.pyplot as plt
+
             plt.figure(figsize=(10, 6))
             plt.plot(evenements_par_date.index, evenements_par_date.values, marker='o', linestyle='-', color='blue')
             plt.title("Évolution des événements critiques par date")
@@ -96,73 +328,38 @@ class LogAnalyzer:
             plt.grid(True)
             plt.xticks(rotation=45)
             plt.tight_layout()
-            plt.show()
+            if fichier:
+                plt.savefig(fichier)
+                plt.close()
+                print(f"[+] Graphique des évènements critiques enregistré dans {fichier}")
+            else:
+                plt.show()
         else:
             print("Aucun log à afficher.")
  
 
 
-    def persister_evenements_critique(self):
+    def persister_evenements_critique(self, chemin_db='logs_analyses.db', retention_jours=None):
         """
-        Stock les événements critiques du DataFrame dans une base de données SQLite.
-        Évite les doublons en vérifiant l'existence avant l'insertion.
+        Stock les événements critiques (colonne Critique) du DataFrame dans la base SQLite
+        partitionnée par mois, en une seule transaction. Les doublons sont écartés par la clé
+        primaire des partitions. Si retention_jours est indiqué, les évènements plus anciens
+        sont ensuite purgés. Renvoie le dictionnaire {'inseres': ..., 'ignores': ...}.
         """
-        if self.df_logs.empty:
-            print("Le DataFrame est vide. Aucune donnée à stocker.")
-            return
+        if self.df_logs.empty or 'Critique' not in self.df_logs.columns:
+            print("Aucun événement critique à stocker.")
+            return {'inseres': 0, 'ignores': 0}
 
         try:
-            cn = sqlite3.connect('logs_analyses.db')
-            cur = cn.cursor()
-
-            # Création de la table si elle n'existe pas
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS evenement_suspect (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date_heure DATETIME,
-                    evenement TEXT,
-                    utilisateur TEXT,
-                    adresse_ip TEXT,
-                    UNIQUE(date_heure, evenement, utilisateur, adresse_ip) -- Empêche les doublons
-                )
-            ''')
-            cn.commit()
-            print("[+] Table 'evenement_suspect' créée ou déjà existante.")
-
-            count_inserts = 0
-            for index, ligne in self.df_logs.iterrows():
-                try:
-                    # Verification que la date est bien formatée
-                    if not isinstance(ligne['DateHeure'], datetime):
-                        date_obj = parse_date(ligne['DateHeure'])
-                    else:
-                        date_obj = ligne['DateHeure']
-                    date_formatted = date_obj.strftime('%Y-%m-%d %H:%M:%S')
-
-                    # Vérification si l'événement existe déjà
-                    cur.execute('''
-                        SELECT COUNT(*) FROM evenement_suspect 
-                        WHERE date_heure = ? AND evenement = ? AND utilisateur = ? AND adresse_ip = ?
-                    ''', (date_formatted, ligne['Evenement'], ligne['Utilisateur'], ligne['AdresseIP']))
-                    existe = cur.fetchone()[0]
-
-                    if existe == 0:
-                        # Insére seulement si l'événement n'existe pas
-                        cur.execute('''
-                            INSERT INTO evenement_suspect (date_heure, evenement, utilisateur, adresse_ip)
-                            VALUES (?, ?, ?, ?)
-                        ''', (date_formatted, ligne['Evenement'], ligne['Utilisateur'], ligne['AdresseIP']))
-                        count_inserts += 1
-                        print(f"[+] Insertion réussie pour la ligne {index}: {date_formatted}, {ligne['Evenement']}, {ligne['Utilisateur']}, {ligne['AdresseIP']}")
-                    else:
-                        print(f"[+] Ligne {index} déjà existante, non insérée.")
-
-                except Exception as e:
-                    print(f"Erreur lors de l'insertion de la ligne {index}: {e}")
-
-            cn.commit()
-            cn.close()
-            print(f"Les événements critiques ont été persistés avec succès ({count_inserts} nouvelles lignes insérées).")
+            stockage = PersistanceSQLite(chemin_db)
+            compteurs = stockage.inserer_evenements(self.df_logs[self.df_logs['Critique']])
+            print(f"Les événements critiques ont été persistés avec succès dans {chemin_db} "
+                  f"({compteurs['inseres']} nouvelles lignes insérées, {compteurs['ignores']} déjà existantes).")
+            if retention_jours is not None:
+                supprimees = stockage.purger(retention_jours)
+                print(f"[+] Rétention de {retention_jours} jours appliquée ({supprimees} partition(s) mensuelle(s) supprimée(s)).")
+            return compteurs
 
         except Exception as e:
             print(f" ⚠️ Erreur lors de la persistance des événements critiques : {e}")
+            return {'inseres': 0, 'ignores': 0}
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import json
+from colorama import Fore, Style, init, Back
+from modules.log_compression import ERREURS_LECTURE, detecter_compression, ouvrir_log
+
+OCTETS_EMPREINTE = 1024  # Début du contenu (décompressé) qui identifie un fichier
+
+
+def empreinte_contenu(fichier_log, taille=OCTETS_EMPREINTE):
+    """
+    Renvoie le SHA-256 des taille premiers octets du contenu d'un fichier (décompressé s'il
+    est compressé) et le nombre d'octets lus, ou (None, 0) si le fichier est illisible.
+    """
+    try:
+        with ouvrir_log(fichier_log, detecter_compression(fichier_log)) as f:
+            debut = f.read(taille)
+    except ERREURS_LECTURE:
+        return None, 0
+    return hashlib.sha256(debut).hexdigest(), len(debut)
+
+
+class LogCheckpoint:
+    """
+    Mémorise entre deux exécutions la position de lecture de chaque fichier de logs
+    (inode, offset en octets et fin de ligne incomplète), afin que LogReader ne traite
+    que les lignes ajoutées depuis la dernière exécution.
+
+    L'empreinte du début du contenu de chaque fichier est aussi conservée : un fichier
+    compressé par la rotation après sa lecture (nouvel inode, ex. secure-20260901.gz) est
+    ainsi reconnu, et sa lecture reprend là où celle du fichier d'origine s'était arrêtée.
+    """
+    def __init__(self, chemin="checkpoint_logs.json"):
+        """
+        Initialise le checkpoint en chargeant le fichier JSON s'il existe déjà
+        (chemin None : checkpoint conservé en mémoire uniquement).
+        """
+        self.chemin = chemin
+        self.positions = {}  # Chemin absolu -> {'inode', 'offset', 'reste', 'empreinte', 'octets_empreinte'}
+        self.charger()
+
+    def charger(self):
+        """
+        Charge les positions sauvegardées lors de l'exécution précédente.
+        """
+        if not self.chemin or not os.path.exists(self.chemin):
+            return
+        try:
+            with open(self.chemin, 'r') as f:
+                self.positions = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"\n{Fore.RED} ⚠️Erreur:{Style.RESET_ALL} Checkpoint '{self.chemin}' illisible, relecture complète : {e}")
+            self.positions = {}
+
+    def sauvegarder(self):
+        """
+        Écrit les positions dans le fichier JSON (écriture atomique via un fichier temporaire).
+        Sans chemin, le checkpoint reste en mémoire.
+        """
+        if not self.chemin:
+            return
+        temporaire = self.chemin + ".tmp"
+        with open(temporaire, 'w') as f:
+            json.dump(self.positions, f, indent=2)
+        os.replace(temporaire, self.chemin)
+
+    def position_depart(self, fichier_log, stat, compression=None):
+        """
+        Renvoie l'offset (dans le contenu décompressé) et la fin de ligne incomplète à partir
+        desquels reprendre la lecture, ou (None, b"") pour un fichier compressé déjà lu.
+
+        Une rotation (changement d'inode) ou une troncature (taille inférieure à l'offset
+        sauvegardé) provoque une relecture depuis le début du fichier. Si le fichier a été
+        renommé par la rotation, sa position est retrouvée grâce à son inode ; s'il a été
+        compressé (ou copié), grâce à l'empreinte du début de son contenu.
+        """
+        cle = os.path.abspath(fichier_log)
+        position = self.positions.get(cle)
+
+        if position is None or position['inode'] != stat.st_ino:
+            position = self.__chercher_par_inode(cle, stat.st_ino)
+            if position is None:
+                position = self.__chercher_par_empreinte(fichier_log)
+                if position is None:
+                    if cle in self.positions:
+                        print(f"[+] Rotation détectée pour {fichier_log}, lecture depuis le début.")
+                    return 0, b""
+                print(f"[+] Contenu de {fichier_log} déjà lu en partie sous un autre nom, reprise à l'octet {position['offset']}.")
+            elif compression:
+                return None, b""  # Fichier compressé renommé, déjà lu
+        elif compression:
+            return None, b""  # Un fichier compressé ne change plus : il a été lu en entier
+
+        if compression is None and stat.st_size < position['offset']:
+            print(f"[+] Troncature détectée pour {fichier_log}, lecture depuis le début.")
+            return 0, b""
+
+        return position['offset'], position['reste'].encode('latin-1')
+
+    def mettre_a_jour(self, fichier_log, stat, offset, reste=b""):
+        """
+        Enregistre la position atteinte à la fin de la lecture d'un fichier (offset dans son
+        contenu décompressé), avec l'empreinte du début de son contenu.
+        """
+        cle = os.path.abspath(fichier_log)
+        precedente = self.positions.get(cle)
+        if (precedente is not None and precedente['inode'] == stat.st_ino
+                and precedente.get('octets_empreinte') == OCTETS_EMPREINTE):
+            empreinte, octets = precedente['empreinte'], OCTETS_EMPREINTE  # Début du fichier inchangé
+        else:
+            empreinte, octets = empreinte_contenu(fichier_log)
+        self.positions[cle] = {
+            'inode': stat.st_ino,
+            'offset': offset,
+            'reste': reste.decode('latin-1'),  # Conversion sans perte des octets
+            'empreinte': empreinte,
+            'octets_empreinte': octets,
+        }
+
+    def __chercher_par_inode(self, cle, inode):
+        """
+        Recherche la position d'un fichier renommé (ex. secure -> secure-20260901) par son inode.
+        """
+        for autre_cle, position in self.positions.items():
+            if inode and autre_cle != cle and position['inode'] == inode:
+                return position
+        return None
+
+    def __chercher_par_empreinte(self, fichier_log):
+        """
+        Recherche la position d'un fichier dont le contenu commence comme celui d'un fichier
+        déjà lu (ex. secure-20260901 compressé en secure-20260901.gz). Parmi plusieurs
+        correspondances, la position la plus avancée est retenue.
+        """
+        trouvee = None
+        empreintes = {}  # Nombre d'octets -> empreinte du fichier sur ce nombre d'octets
+        for position in self.positions.values():
+            octets = position.get('octets_empreinte', 0)
+            if not octets or not position.get('empreinte'):
+                continue
+            if octets not in empreintes:
+                empreintes[octets] = empreinte_contenu(fichier_log, octets)
+            if empreintes[octets] == (position['empreinte'], octets):
+                if trouvee is None or position['offset'] > trouvee['offset']:
+                    trouvee = position
+        return trouvee
@@ -0,0 +1,105 @@
+from array import array
+import numpy as np
+import pandas as pd
+from modules.horodatage import convertir_horodatages
+from modules.adresses_ip import ip_en_entier, entier_en_ip
+
+
+class BlocEvenements:
+    """
+    Tampons typés et orientés colonnes des évènements extraits des logs.
+
+    Chaque ligne extraite coûte quelques octets au lieu d'un dictionnaire Python :
+    - DateHeure   : code int32 vers la table des horodatages (chaînes internées) ;
+    - Evenement   : code uint8 vers la table des types d'évènements ;
+    - Utilisateur : code int32 vers la table des noms d'utilisateurs (internés) ;
+    - AdresseIP   : code int32 vers la table des adresses IPv4/IPv6 (entiers de 128 bits).
+    """
+    def __init__(self):
+        self.horodatages = array('i')
+        self.evenements = array('B')
+        self.utilisateurs = array('i')
+        self.adresses_ip = array('i')
+        # Tables d'internement valeur -> code (l'ordre d'insertion donne la table des codes)
+        self.table_horodatages = {}
+        self.table_evenements = {}
+        self.table_utilisateurs = {}
+        self.table_adresses_ip = {}  # Entier de 128 bits (voir modules.adresses_ip) -> code
+        self.cache_ip = {}  # Adresse IP texte -> code, non transféré entre processus
+
+    def __getstate__(self):
+        etat = self.__dict__.copy()
+        etat['cache_ip'] = {}
+        return etat
+
+    def __len__(self):
+        return len(self.evenements)
+
+    def ajouter(self, date_heure, evenement, utilisateur, adresse_ip):
+        """
+        Ajoute un évènement extrait. Une adresse IP invalide (ex. 999.1.1.1) est ignorée.
+        """
+        code_ip = self.cache_ip.get(adresse_ip)
+        if code_ip is None:
+            ip = ip_en_entier(adresse_ip)
+            if ip is None:
+                return
+            table = self.table_adresses_ip
+            code_ip = self.cache_ip[adresse_ip] = table.setdefault(ip, len(table))
+
+        table = self.table_horodatages
+        self.horodatages.append(table.setdefault(date_heure, len(table)))
+        table = self.table_evenements
+        self.evenements.append(table.setdefault(evenement, len(table)))
+        table = self.table_utilisateurs
+        self.utilisateurs.append(table.setdefault(utilisateur, len(table)))
+        self.adresses_ip.append(code_ip)
+
+    def fusionner(self, autre):
+        """
+        Ajoute à la suite les évènements d'un autre bloc (ex. résultat d'un processus du pool),
+        en recodant ses colonnes dans les tables de ce bloc.
+        """
+        for attribut, type_code in (('horodatages', np.int32), ('evenements', np.uint8), ('utilisateurs', np.int32),
+                                    ('adresses_ip', np.int32)):
+            table = getattr(self, 'table_' + attribut)
+            correspondance = np.array([table.setdefault(valeur, len(table)) for valeur in getattr(autre, 'table_' + attribut)],
+                                      dtype=type_code)
+            codes_autre = np.frombuffer(getattr(autre, attribut), dtype=type_code)
+            if len(codes_autre):
+                getattr(self, attribut).frombytes(correspondance[codes_autre].tobytes())
+
+    def horodatages_ns(self):
+        """
+        Renvoie les horodatages des évènements en nanosecondes depuis l'epoch (tableau int64).
+        Seuls les horodatages distincts sont convertis, puis propagés par les codes.
+        """
+        horodatages = convertir_horodatages(list(self.table_horodatages)).view(np.int64)
+        return horodatages[np.frombuffer(self.horodatages, dtype=np.int32)]
+
+    def vers_dataframe(self):
+        """
+        Construit le DataFrame des logs à partir des tampons : DateHeure en datetime64 (int64),
+        Evenement, Utilisateur et AdresseIP en colonnes catégorielles.
+        """
+        # Les adresses IP distinctes deviennent les catégories, triées numériquement
+        ips = list(self.table_adresses_ip)
+        ordre = sorted(range(len(ips)), key=ips.__getitem__)
+        rangs = np.empty(len(ips), dtype=np.int32)
+        rangs[ordre] = np.arange(len(ips), dtype=np.int32)
+        codes_ip = rangs[np.frombuffer(self.adresses_ip, dtype=np.int32)]
+        categories_ip = [entier_en_ip(ips[i]) for i in ordre]
+
+        return pd.DataFrame({
+            'DateHeure': pd.Series(self.horodatages_ns().view('datetime64[ns]')),
+            'Evenement': pd.Categorical.from_codes(np.frombuffer(self.evenements, dtype=np.uint8), list(self.table_evenements)),
+            'Utilisateur': pd.Categorical.from_codes(np.frombuffer(self.utilisateurs, dtype=np.int32), list(self.table_utilisateurs)),
+            'AdresseIP': pd.Categorical.from_codes(codes_ip, categories_ip),
+        })
+
+    def adresses_ip_entiers(self):
+        """
+        Renvoie la liste des adresses IP des évènements, en entiers de 128 bits.
+        """
+        ips = list(self.table_adresses_ip)
+        return [ips[code] for code in self.adresses_ip]
@@ -0,0 +1,62 @@
+import bz2
+import gzip
+import io
+import lzma
+
+try:
+    from zstandard import ZstdError
+except ImportError:
+    ZstdError = OSError  # Sans zstandard, l'ouverture d'un fichier zstd lève ImportError
+
+TAILLE_TAMPON = 1024 * 1024  # Lecture et décompression par blocs de 1 Mo
+
+# Signatures (magic bytes) des formats de compression produits par logrotate
+SIGNATURES = [
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+]
+
+# Erreurs de lecture d'un fichier de logs (module de décompression absent, fichier illisible,
+# archive tronquée ou corrompue) : le fichier est ignoré avec un avertissement
+ERREURS_LECTURE = (ImportError, OSError, EOFError, ZstdError)
+
+
+def detecter_compression(fichier_log):
+    """
+    Détecte la compression d'un fichier à partir de ses premiers octets, indépendamment
+    de son extension. Renvoie 'gzip', 'bz2', 'xz', 'zstd' ou None pour un fichier texte.
+    """
+    with open(fichier_log, 'rb') as f:
+        entete = f.read(6)
+    for signature, compression in SIGNATURES:
+        if entete.startswith(signature):
+            return compression
+    return None
+
+
+def ouvrir_log(fichier_log, compression=None):
+    """
+    Ouvre un fichier de logs en lecture binaire. Les fichiers compressés sont décompressés
+    à la volée, par blocs, sans fichier temporaire ni chargement complet en mémoire.
+    """
+    if compression is None:
+        return open(fichier_log, 'rb', buffering=TAILLE_TAMPON)
+
+    if compression == "gzip":
+        flux = gzip.open(fichier_log, 'rb')
+    elif compression == "bz2":
+        flux = bz2.open(fichier_log, 'rb')
+    elif compression == "xz":
+        flux = lzma.open(fichier_log, 'rb')
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(f"Le module 'zstandard' est nécessaire pour lire {fichier_log} (pip install zstandard).")
+        flux = zstandard.ZstdDecompressor().stream_reader(open(fichier_log, 'rb'), read_size=TAILLE_TAMPON)
+    else:
+        raise ValueError(f"Compression '{compression}' non prise en charge.")
+
+    return io.BufferedReader(flux, buffer_size=TAILLE_TAMPON)
@@ -0,0 +1,204 @@
+import json
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from modules.log_compression import ERREURS_LECTURE, detecter_compression, ouvrir_log
+from modules.adresses_ip import MOTIF_IP
+
+# Échecs d'authentification sshd dans le texte d'un message (syslog, RFC 5424 ou journald),
+# depuis une adresse IPv4 ou IPv6
+REGEX_MESSAGE_SSHD = re.compile(r"(?:^|\s)(Invalid user|Failed password|authentication failure).*?\s+(\w+)\s+from\s+(" + MOTIF_IP + r")(?:\s+port\s+\d+.*)?$")
+MOTS_CLES_SSHD = (b"Failed password", b"Invalid user", b"authentication failure")
+
+# Horodatage syslog classique, avec ou sans année ("Sep 29 03:29:38", "Sep 29 2025 03:29:38")
+MOTIF_HORODATAGE_SYSLOG = r"[A-Za-z]{3}\s+\d{1,2}\s+(?:\d{4}\s+)?\d{2}:\d{2}:\d{2}"
+# Préfixe syslog d'une ligne (horodatage et nom d'hôte), retiré des modèles de lignes
+REGEX_PREFIXE_SYSLOG = re.compile(r"^" + MOTIF_HORODATAGE_SYSLOG + r"\s+\S+\s+")
+
+# Registre des formats de logs : nom -> classe de parseur, dans l'ordre de détection
+PARSEURS = {}
+
+
+def enregistrer_parseur(classe):
+    """
+    Décorateur ajoutant une classe de parseur au registre PARSEURS, sous son attribut NOM.
+    """
+    PARSEURS[classe.NOM] = classe
+    return classe
+
+
+def detecter_parseur(fichier_log, nb_lignes=20):
+    """
+    Détermine le format d'un fichier de logs (éventuellement compressé) d'après ses premières
+    lignes non vides, et renvoie une instance du parseur correspondant. Le format sshd
+    (syslog classique) est utilisé par défaut.
+    """
+    lignes = []
+    try:
+        with ouvrir_log(fichier_log, detecter_compression(fichier_log)) as f:
+            for ligne in f:
+                if ligne.strip():
+                    lignes.append(ligne)
+                if len(lignes) >= nb_lignes:
+                    break
+    except ERREURS_LECTURE:
+        pass  # L'erreur de lecture sera signalée lors de l'extraction
+    for classe in PARSEURS.values():
+        if lignes and classe.detecter(lignes):
+            return classe()
+    return ParseurSshd()
+
+
+class Parseur(ABC):
+    """
+    Base des parseurs du registre. Chaque format fournit :
+    - NOM : nom du format (option --format) ;
+    - detecter(lignes) : vrai si les premières lignes (bytes) d'un fichier sont dans ce format ;
+    - analyser_ligne(ligne_brute) : tuple (date_heure, evenement, utilisateur, adresse_ip) ou None,
+      date_heure étant une chaîne comprise par ConvertisseurHorodatage.
+    - extraire(ligne) (abstraite) : même résultat pour une ligne décodée ; analyser_ligne
+      l'appelle après le pré-filtre et le décodage.
+
+    Tous les parseurs produisent ainsi le même schéma d'évènements, quelle que soit la source.
+    Les MOTS_CLES éventuels servent de pré-filtre sur les octets bruts, avant tout décodage.
+    """
+    NOM = None
+    REGEX_DETECTION = None  # Regex (bytes) que la majorité des premières lignes doit vérifier
+    MOTS_CLES = ()
+
+    @classmethod
+    def detecter(cls, lignes):
+        correspondances = sum(1 for ligne in lignes if cls.REGEX_DETECTION.match(ligne))
+        return correspondances * 2 > len(lignes)
+
+    def analyser_ligne(self, ligne_brute):
+        if self.MOTS_CLES and not any(mot in ligne_brute for mot in self.MOTS_CLES):
+            return None
+        return self.extraire(ligne_brute.decode('utf-8', errors='replace').rstrip("\r\n"))
+
+    @abstractmethod
+    def extraire(self, ligne):
+        """
+        Analyse une ligne décodée et renvoie le tuple d'évènement, ou None.
+        """
+
+
+@enregistrer_parseur
+class ParseurJournald(Parseur):
+    """
+    Export JSON de journald (journalctl -o json) : un objet par ligne. L'horodatage
+    __REALTIME_TIMESTAMP (microsecondes depuis l'epoch) est converti en heure locale, comme
+    celle des logs syslog ; le MESSAGE est analysé comme une ligne sshd.
+    """
+    NOM = "journald"
+    REGEX_DETECTION = re.compile(rb'^\s*\{.*"__REALTIME_TIMESTAMP"')
+    MOTS_CLES = MOTS_CLES_SSHD
+
+    def extraire(self, ligne):
+        try:
+            entree = json.loads(ligne)
+            message = entree['MESSAGE']
+            if isinstance(message, list):  # Message binaire exporté en liste d'octets
+                message = bytes(message).decode('utf-8', errors='replace')
+            match = REGEX_MESSAGE_SSHD.search(message)
+            if not match:
+                return None
+            date_heure = datetime.fromtimestamp(int(entree['__REALTIME_TIMESTAMP']) / 1_000_000).isoformat(sep=' ')
+        except (ValueError, KeyError, TypeError):
+            return None
+        return (date_heure, *match.groups())
+
+
+@enregistrer_parseur
+class ParseurRfc5424(Parseur):
+    """
+    Syslog RFC 5424 : "<PRI>1 HORODATAGE HOTE APPLICATION PID MSGID DONNEES-STRUCTUREES MESSAGE".
+    L'horodatage ISO 8601 est conservé tel qu'écrit (heure de l'émetteur, décalage ignoré).
+    """
+    NOM = "rfc5424"
+    REGEX_DETECTION = re.compile(rb"^<\d{1,3}>1 \d{4}-\d{2}-\d{2}T")
+    REGEX = re.compile(r"^<\d{1,3}>1 (\S+) \S+ \S+ \S+ \S+ (?:-|(?:\[(?:[^\]\\]|\\.)*\])+) ?(.*)$")
+    MOTS_CLES = MOTS_CLES_SSHD
+
+    def extraire(self, ligne):
+        match = self.REGEX.match(ligne)
+        if not match:
+            return None
+        message = REGEX_MESSAGE_SSHD.search(match.group(2))
+        if not message:
+            return None
+        return (match.group(1), *message.groups())
+
+
+@enregistrer_parseur
+class ParseurFail2ban(Parseur):
+    """
+    Journal de fail2ban ("2025-09-29 03:29:38,123 fail2ban.filter [123]: INFO [sshd] Found 1.2.3.4").
+    Les détections (Found) et bannissements (Ban) donnent les évènements "fail2ban Found" et
+    "fail2ban Ban" ; la colonne Utilisateur reçoit le nom de la jail.
+    """
+    NOM = "fail2ban"
+    REGEX_DETECTION = re.compile(rb"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d+ fail2ban\.")
+    REGEX = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d+) fail2ban\.\S+\s+\[\d+\]:\s+\w+\s+\[([^\]]+)\]\s+(Found|Ban)\s+(" + MOTIF_IP + r")\b")
+    MOTS_CLES = (b"Found", b"Ban")
+
+    def extraire(self, ligne):
+        match = self.REGEX.match(ligne)
+        if not match:
+            return None
+        date_heure, jail, action, adresse_ip = match.groups()
+        return date_heure, f"fail2ban {action}", jail, adresse_ip
+
+
+@enregistrer_parseur
+class ParseurAcces(Parseur):
+    """
+    Logs d'accès nginx/Apache (formats common et combined). Les réponses 401, 403 et 407
+    (authentification refusée) donnent l'évènement "HTTP <code>", avec l'utilisateur HTTP
+    s'il est connu ("-" sinon). L'horodatage est conservé tel qu'écrit (décalage ignoré).
+    """
+    NOM = "acces"
+    REGEX_DETECTION = re.compile(rb'^\S+ \S+ \S+ \[\d{2}/[A-Za-z]{3}/\d{4}:\d{2}:\d{2}:\d{2} [+-]\d{4}\] "')
+    REGEX = re.compile(r'^(' + MOTIF_IP + r') \S+ (\S+) \[([^\]]+)\] "(?:[^"\\]|\\.)*" (40[137]) ')
+    MOTS_CLES = (b'" 401 ', b'" 403 ', b'" 407 ')
+
+    def extraire(self, ligne):
+        match = self.REGEX.match(ligne)
+        if not match:
+            return None
+        adresse_ip, utilisateur, date_heure, statut = match.groups()
+        return date_heure, f"HTTP {statut}", utilisateur, adresse_ip
+
+
+@enregistrer_parseur
+class ParseurSshd(Parseur):
+    """
+    Extrait les échecs d'authentification sshd (Failed password, Invalid user,
+    authentication failure) des lignes d'un fichier 'secure'.
+
+    Le pattern est compilé une seule fois, et un pré-filtre par mots-clés écarte les
+    lignes non pertinentes (la grande majorité d'un fichier 'secure') directement sur
+    les octets bruts, avant tout décodage et toute évaluation de la regex.
+    """
+    NOM = "sshd"
+    REGEX_DETECTION = re.compile((r"^" + MOTIF_HORODATAGE_SYSLOG + r"\s").encode())
+    REGEX = re.compile(r"^(" + MOTIF_HORODATAGE_SYSLOG + r").*?\s+(Invalid user|Failed password|authentication failure).*?\s+(\w+)\s+from\s+(" + MOTIF_IP + r")(?:\s+port\s+\d+.*)?$")
+
+    def analyser_ligne(self, ligne_brute):
+        """
+        Analyse une ligne brute (bytes) et renvoie le tuple
+        (date_heure, evenement, utilisateur, adresse_ip), ou None si la ligne ne correspond pas.
+        """
+        # Une ligne ne peut correspondre à la regex que si elle contient l'un de ces mots-clés
+        if (b"Failed password" not in ligne_brute
+                and b"Invalid user" not in ligne_brute
+                and b"authentication failure" not in ligne_brute):
+            return None
+
+        return self.extraire(ligne_brute.decode('utf-8', errors='replace').rstrip("\r\n"))
+
+    def extraire(self, ligne):
+        match = self.REGEX.match(ligne)
+        if match:
+            return match.groups()
+        return None
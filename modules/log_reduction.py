@@ -0,0 +1,121 @@
+import re
+from modules.log_parser import PARSEURS, REGEX_PREFIXE_SYSLOG, detecter_parseur
+from modules.log_colonnes import BlocEvenements
+from modules.log_compression import detecter_compression, ouvrir_log
+from modules.log_analyzer import LogAnalyzer
+from modules.adresses_ip import MOTIF_IP, ip_en_entier
+
+# Parties variables d'une ligne, remplacées par un marqueur dans son modèle
+MASQUES = [
+    (re.compile(r"(?<![\w:.])(?:" + MOTIF_IP + r")(?![\w:])"), "<IP>"),  # IPv4 ou IPv6
+    (re.compile(r"\b(?:0x[0-9a-fA-F]+|[0-9a-fA-F]{8,})\b"), "<HEX>"),
+    (re.compile(r"\d+"), "<N>"),
+]
+
+
+def modele_ligne(ligne):
+    """
+    Renvoie le modèle d'une ligne de log : sans préfixe syslog, adresses IP, identifiants
+    hexadécimaux et nombres (pid, port...) remplacés par des marqueurs.
+    """
+    modele = REGEX_PREFIXE_SYSLOG.sub("", ligne)
+    for regex, marqueur in MASQUES:
+        modele = regex.sub(marqueur, modele)
+    return modele
+
+
+class ReducteurLogs:
+    """
+    Réduit des logs bruts à un résumé compact avant leur envoi à LogAI.
+
+    Les échecs d'authentification sont extraits par les parseurs de LogReader puis agrégés
+    par LogAnalyzer en une ligne par (IP, utilisateur, évènement), avec nombre d'accès, période et
+    une ligne d'exemple. Les combinaisons de moins de seuil_detail accès sont regroupées par
+    (évènement, utilisateur), avec le nombre d'IP distinctes. Les autres lignes sont regroupées
+    par modèle (voir modele_ligne), avec leur nombre et un exemple ; au-delà de modeles_max
+    modèles distincts, les lignes de nouveaux modèles sont seulement comptées.
+
+    Sur un fichier 'secure' volumineux, des millions de lignes se réduisent ainsi à quelques
+    centaines de lignes de résumé.
+    """
+    def __init__(self, parseur=None, seuil_detail=3, ips_par_resume=5, modeles_max=10_000):
+        self.parseur = parseur  # Parseur imposé, sinon celui du format détecté pour chaque fichier
+        self.seuil_detail = seuil_detail
+        self.ips_par_resume = ips_par_resume
+        self.modeles_max = modeles_max
+        self.bloc = BlocEvenements()
+        self.exemples = {}  # (evenement, utilisateur, IP en entier de 128 bits) -> première ligne rencontrée
+        self.ips = {}  # Adresse IP texte -> entier de 128 bits (None si invalide)
+        self.modeles = {}  # Modèle -> [nombre de lignes, première ligne rencontrée]
+        self.lignes_hors_modeles = 0  # Lignes de nouveaux modèles au-delà de modeles_max
+        self.nombre_lignes = 0
+
+    def ajouter_fichier(self, fichier_log):
+        """
+        Lit un fichier de logs (éventuellement compressé) ligne par ligne et l'ajoute au résumé.
+        """
+        parseur = self.parseur or detecter_parseur(fichier_log)
+        with ouvrir_log(fichier_log, detecter_compression(fichier_log)) as f:
+            for ligne_brute in f:
+                self.ajouter_ligne(ligne_brute, parseur)
+
+    def ajouter_ligne(self, ligne_brute, parseur=None):
+        """
+        Ajoute une ligne brute (bytes) au résumé, analysée par le parseur indiqué (par défaut
+        celui du réducteur, sinon le format sshd).
+        """
+        parseur = parseur or self.parseur or PARSEURS['sshd']()
+        champs = parseur.analyser_ligne(ligne_brute)
+        ligne = ligne_brute.decode('utf-8', errors='replace').rstrip("\r\n")
+        if not ligne:
+            return
+        self.nombre_lignes += 1
+        if champs:
+            # Les exemples sont indexés par l'adresse en entier : le DataFrame agrégé l'écrit
+            # sous sa forme canonique (ex. '010.0.0.1' -> '10.0.0.1', '2001:DB8::1' -> '2001:db8::1')
+            adresse_ip = champs[3]
+            if adresse_ip not in self.ips:
+                self.ips[adresse_ip] = ip_en_entier(adresse_ip)
+            if self.ips[adresse_ip] is not None:  # Une adresse invalide est ignorée par le bloc
+                self.bloc.ajouter(*champs)
+                self.exemples.setdefault((champs[1], champs[2], self.ips[adresse_ip]), ligne)
+                return
+        modele = modele_ligne(ligne)
+        entree = self.modeles.get(modele)
+        if entree is not None:
+            entree[0] += 1
+        elif len(self.modeles) < self.modeles_max:
+            self.modeles[modele] = [1, ligne]
+        else:
+            self.lignes_hors_modeles += 1
+
+    def resumer(self):
+        """
+        Renvoie le résumé sous forme de liste de lignes. Une ligne "[N x] ..." résume N logs.
+        """
+        resume = []
+        if len(self.bloc):
+            agregats = LogAnalyzer(self.bloc.vers_dataframe()).agreger_evenements()
+
+            # Combinaisons fréquentes : une ligne chacune
+            for agregat in agregats[agregats['NombreAcces'] >= self.seuil_detail].itertuples():
+                exemple = self.exemples[(agregat.Evenement, agregat.Utilisateur, ip_en_entier(str(agregat.AdresseIP)))]
+                resume.append(f"[{agregat.NombreAcces} x] {agregat.Evenement} utilisateur={agregat.Utilisateur} "
+                              f"ip={agregat.AdresseIP} du {agregat.Debut} au {agregat.Fin} ; exemple : {exemple}")
+
+            # Combinaisons rares : regroupées par (évènement, utilisateur)
+            rares = agregats[agregats['NombreAcces'] < self.seuil_detail]
+            for (evenement, utilisateur), groupe in rares.groupby(['Evenement', 'Utilisateur'], observed=True, sort=False):
+                ips = ", ".join(groupe['AdresseIP'].astype(str).head(self.ips_par_resume))
+                if len(groupe) > self.ips_par_resume:
+                    ips += ", ..."
+                exemple = self.exemples[(evenement, utilisateur, ip_en_entier(str(groupe['AdresseIP'].iloc[0])))]
+                resume.append(f"[{groupe['NombreAcces'].sum()} x] {evenement} utilisateur={utilisateur} "
+                              f"depuis {len(groupe)} IP distinctes ({ips}) du {groupe['Debut'].min()} "
+                              f"au {groupe['Fin'].max()} ; exemple : {exemple}")
+
+        for modele, (nombre, exemple) in sorted(self.modeles.items(), key=lambda entree: -entree[1][0]):
+            resume.append(f"[{nombre} x] {modele} ; exemple : {exemple}" if nombre > 1 else exemple)
+        if self.lignes_hors_modeles:
+            resume.append(f"[{self.lignes_hors_modeles} x] autres lignes (au-delà de {self.modeles_max} modèles distincts)")
+        return resume
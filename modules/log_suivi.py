@@ -0,0 +1,154 @@
+import os
+import time
+from collections import OrderedDict, deque
+import pandas as pd
+from colorama import Fore, Style, init, Back
+from modules.log_reader import LogReader, extraire_segment
+from modules.log_checkpoint import LogCheckpoint
+from modules.log_compression import detecter_compression
+from modules.adresses_ip import entier_en_ip
+from modules.horodatage import NAT
+
+
+class DetecteurEnLigne:
+    """
+    Détecteur en continu des IP dépassant seuil_alerte accès sur une fenêtre glissante.
+
+    La mémoire reste bornée quel que soit le nombre d'IP distinctes :
+    - chaque IP ne conserve que ses seuil_alerte + 1 derniers horodatages ;
+    - une IP sans accès depuis plus d'une fenêtre (TTL) est oubliée ;
+    - au-delà de capacite_max IP suivies, les moins récemment vues sont évincées (LRU).
+    """
+    def __init__(self, fenetre='1min', seuil_alerte=10, capacite_max=1_000_000):
+        self.fenetre = pd.Timedelta(fenetre).value  # En nanosecondes
+        self.seuil_alerte = seuil_alerte
+        self.capacite_max = capacite_max
+        self.compteurs = OrderedDict()  # IP -> [horodatages récents, fin de la dernière alerte]
+
+    def ajouter(self, ip, horodatage):
+        """
+        Enregistre un accès (horodatage en nanosecondes) et renvoie le nombre d'accès de l'IP
+        dans la fenêtre s'il dépasse le seuil pour la première fois sur cette fenêtre, sinon None.
+        """
+        entree = self.compteurs.get(ip)
+        if entree is None:
+            entree = self.compteurs[ip] = [deque(maxlen=self.seuil_alerte + 1), 0]
+            if len(self.compteurs) > self.capacite_max:
+                self.compteurs.popitem(last=False)  # Éviction LRU
+        else:
+            self.compteurs.move_to_end(ip)
+
+        horodatages = entree[0]
+        horodatages.append(horodatage)
+        while horodatages[0] <= horodatage - self.fenetre:
+            horodatages.popleft()
+
+        # Une seule alerte par IP et par fenêtre
+        if len(horodatages) > self.seuil_alerte and horodatage >= entree[1]:
+            entree[1] = horodatage + self.fenetre
+            return len(horodatages)
+        return None
+
+    def evincer_expires(self, maintenant):
+        """
+        Oublie les IP dont le dernier accès est antérieur à une fenêtre (TTL), en partant des
+        moins récemment vues.
+        """
+        while self.compteurs:
+            ip, (horodatages, fin_alerte) = next(iter(self.compteurs.items()))
+            if horodatages[-1] > maintenant - self.fenetre or fin_alerte > maintenant:
+                break
+            del self.compteurs[ip]
+
+
+class SuiviLogs:
+    """
+    Mode démon : suit en continu les fichiers de logs (comme 'tail -f') et transmet chaque
+    évènement extrait au DetecteurEnLigne. Une alerte est levée dès la lecture de la ligne
+    qui fait dépasser le seuil, soit au plus intervalle_sondage secondes après son écriture.
+    Si un MetriquesPipeline est fourni, chaque passage y est mesuré (étape suivi) et les
+    métriques sont exportées à chaque sauvegarde du checkpoint.
+    Un autre détecteur (mêmes méthodes ajouter et evincer_expires) peut être fourni, par
+    exemple un AgentCollecte qui transmet les accès à l'agrégateur central.
+    """
+    def __init__(self, repertoire, pattern="secure*", fenetre='1min', seuil_alerte=10,
+                 checkpoint=None, intervalle_sondage=0.2, notifier=None, format_logs="auto", metriques=None,
+                 detecteur=None):
+        self.lecteur = LogReader(repertoire, format_logs=format_logs)
+        self.pattern = pattern
+        self.fenetre = fenetre
+        self.detecteur = detecteur or DetecteurEnLigne(fenetre, seuil_alerte)
+        self.checkpoint = checkpoint or LogCheckpoint(None)
+        self.intervalle_sondage = intervalle_sondage
+        self.notifier = notifier  # Fonction (ip, nombre, date_heure) appelée à chaque alerte
+        self.fichiers_connus = set()
+        self.metriques = metriques
+        self.compteurs = {'octets_lus': 0, 'evenements': 0, 'alertes': 0}
+
+    def suivre(self):
+        """
+        Boucle infinie de suivi des fichiers ; le checkpoint est sauvegardé régulièrement.
+        """
+        print(f"\n{Fore.GREEN}[+] 👀 Suivi en continu des fichiers '{self.pattern}' de {self.lecteur.repertoire}...{Style.RESET_ALL}")
+        premier_passage = True
+        derniere_sauvegarde = time.monotonic()
+        try:
+            while True:
+                if self.metriques is None:
+                    self.lire_nouvelles_lignes(premier_passage)
+                else:
+                    avant = dict(self.compteurs)
+                    with self.metriques.etape("suivi") as mesure:
+                        self.lire_nouvelles_lignes(premier_passage)
+                        mesure.update(octets=self.compteurs['octets_lus'] - avant['octets_lus'],
+                                      lignes_sortie=self.compteurs['evenements'] - avant['evenements'])
+                premier_passage = False
+                self.detecteur.evincer_expires(pd.Timestamp.now().value)
+                if time.monotonic() - derniere_sauvegarde > 10:
+                    self.checkpoint.sauvegarder()
+                    if self.metriques is not None:
+                        self.metriques.exporter()
+                    derniere_sauvegarde = time.monotonic()
+                time.sleep(self.intervalle_sondage)
+        finally:
+            self.checkpoint.sauvegarder()
+
+    def lire_nouvelles_lignes(self, premier_passage=False):
+        """
+        Lit les lignes ajoutées depuis le dernier passage et les transmet au détecteur.
+        Au premier passage, un fichier sans checkpoint est suivi à partir de sa fin.
+        """
+        for fichier_log in self.lecteur.trouver_fichiers_logs(self.pattern):
+            try:
+                if detecter_compression(fichier_log):
+                    continue  # Les fichiers compressés par la rotation ne grossissent plus
+                stat = os.stat(fichier_log)
+                if fichier_log not in self.fichiers_connus:
+                    self.fichiers_connus.add(fichier_log)
+                    if premier_passage and os.path.abspath(fichier_log) not in self.checkpoint.positions:
+                        self.checkpoint.mettre_a_jour(fichier_log, stat, stat.st_size)
+                offset, reste = self.checkpoint.position_depart(fichier_log, stat)
+                if offset == stat.st_size:
+                    continue
+                bloc, position, reste = extraire_segment(fichier_log, offset, None, reste, True, self.lecteur.parseur_fichier(fichier_log))
+                self.checkpoint.mettre_a_jour(fichier_log, stat, position, reste)
+            except FileNotFoundError:
+                continue  # Fichier supprimé par la rotation entre deux passages
+            self.compteurs['octets_lus'] += position - offset
+            self.compteurs['evenements'] += len(bloc)
+
+            for horodatage, ip in zip(bloc.horodatages_ns().tolist(), bloc.adresses_ip_entiers()):
+                if horodatage == NAT:
+                    continue
+                nombre = self.detecteur.ajouter(ip, horodatage)
+                if nombre:
+                    self.alerter(entier_en_ip(ip), nombre, pd.Timestamp(horodatage))
+
+    def alerter(self, ip, nombre, date_heure):
+        """
+        Affiche l'alerte dans la console puis la transmet à la fonction de notification éventuelle.
+        """
+        print(f"{Fore.RED}🚨 [{date_heure}] IP {ip} : {nombre} accès en moins de {self.fenetre}{Style.RESET_ALL}")
+        self.compteurs['alertes'] += 1
+        if self.notifier:
+            self.notifier(ip, nombre, date_heure)
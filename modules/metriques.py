@@ -0,0 +1,214 @@
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from colorama import Fore, Style, init, Back
+
+PREFIXE = "logguard"  # Préfixe des noms de métriques Prometheus
+CHAMPS = ('lignes_entree', 'lignes_sortie', 'octets', 'cache_succes', 'cache_echecs')
+
+
+class MetriquesPipeline:
+    """
+    Instrumentation des étapes de la chaîne d'analyse (lecture, DataFrame, détection,
+    persistance, notifications...) : durée, lignes en entrée et en sortie, octets lus et succès
+    ou échecs de cache de chaque étape.
+
+    Les mesures de la dernière exécution sont affichées avec --profile ; elles sont aussi cumulées
+    d'une exécution à l'autre (mode planifié ou démon) et exportées au format texte de Prometheus,
+    dans un fichier (collecteur textfile de node_exporter) et/ou sur un point d'accès HTTP local
+    (/metrics), afin d'alerter sur les régressions de latence.
+
+    En option, une exécution complète peut être profilée avec cProfile (statistiques écrites dans
+    fichier_profil) et le pic de mémoire de chaque étape mesuré avec tracemalloc ; ces deux modes
+    ralentissent l'analyse et ne sont destinés qu'au diagnostic.
+    """
+    def __init__(self, fichier_prometheus=None, fichier_profil=None, memoire=False):
+        self.fichier_prometheus = fichier_prometheus
+        self.fichier_profil = fichier_profil
+        self.memoire = memoire
+        self.verrou = threading.Lock()  # Les notifications sont mesurées depuis leur thread
+        self.etapes = {}  # Étape -> mesures de sa dernière exécution
+        self.cumuls = {}  # Étape -> mesures cumulées depuis le démarrage
+        self.executions = 0
+        self.derniere_execution = None  # Fin de la dernière exécution (secondes depuis l'epoch)
+        self.duree_execution = None
+        self.serveur = None
+
+    @contextlib.contextmanager
+    def execution(self):
+        """
+        Délimite une exécution complète de la chaîne : les mesures des étapes de l'exécution
+        précédente sont effacées, le profilage éventuel couvre toute l'exécution, et les
+        métriques sont exportées à la fin.
+        """
+        with self.verrou:
+            self.etapes = {}
+        profileur = cProfile.Profile() if self.fichier_profil else None
+        if self.memoire:
+            tracemalloc.start()
+        debut = time.perf_counter()
+        if profileur:
+            profileur.enable()
+        try:
+            yield self
+        finally:
+            if profileur:
+                profileur.disable()
+            if self.memoire:
+                tracemalloc.stop()
+            with self.verrou:
+                self.executions += 1
+                self.duree_execution = time.perf_counter() - debut
+                self.derniere_execution = time.time()
+            if profileur:
+                self.__ecrire_profil(profileur)
+            self.exporter()
+
+    @contextlib.contextmanager
+    def etape(self, nom, lignes_entree=None):
+        """
+        Mesure une étape. Le dictionnaire renvoyé reçoit les compteurs connus à la fin de
+        l'étape : lignes_sortie, octets, cache_succes, cache_echecs.
+        """
+        mesure = {'lignes_entree': lignes_entree}
+        if self.memoire and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            memoire_debut = tracemalloc.get_traced_memory()[0]
+        debut = time.perf_counter()
+        try:
+            yield mesure
+        finally:
+            mesure['secondes'] = time.perf_counter() - debut
+            if self.memoire and tracemalloc.is_tracing():
+                mesure['pic_memoire'] = tracemalloc.get_traced_memory()[1] - memoire_debut
+            with self.verrou:
+                self.etapes[nom] = mesure
+                cumul = self.cumuls.setdefault(nom, dict.fromkeys(('executions', 'secondes') + CHAMPS, 0))
+                cumul['executions'] += 1
+                cumul['secondes'] += mesure['secondes']
+                for champ in CHAMPS:
+                    cumul[champ] += mesure.get(champ) or 0
+
+    def afficher(self):
+        """
+        Affiche le tableau des étapes de la dernière exécution.
+        """
+        with self.verrou:
+            etapes = dict(self.etapes)
+        print(f"\n{Fore.CYAN}[+] Profil de l'exécution :{Style.RESET_ALL}")
+        print(f"{'étape':<22}{'durée (s)':>10}{'entrée':>10}{'sortie':>10}{'octets':>14}{'cache':>12}" + (f"{'mémoire':>12}" if self.memoire else ""))
+        for nom, mesure in etapes.items():
+            ligne = f"{nom:<22}{mesure['secondes']:>10.3f}"
+            for champ, largeur in (('lignes_entree', 10), ('lignes_sortie', 10), ('octets', 14)):
+                ligne += f"{'-' if mesure.get(champ) is None else mesure[champ]:>{largeur}}"
+            cache = f"{mesure.get('cache_succes') or 0}/{(mesure.get('cache_succes') or 0) + (mesure.get('cache_echecs') or 0)}"
+            ligne += f"{cache if 'cache_succes' in mesure else '-':>12}"
+            if self.memoire:
+                ligne += f"{mesure['pic_memoire'] / 1024 / 1024:>10.1f}Mo" if 'pic_memoire' in mesure else f"{'-':>12}"
+            print(ligne)
+        if self.duree_execution is not None:
+            print(f"{'total':<22}{self.duree_execution:>10.3f}")
+
+    def texte_prometheus(self):
+        """
+        Renvoie les métriques au format texte d'exposition de Prometheus.
+        """
+        with self.verrou:
+            etapes, cumuls = dict(self.etapes), {nom: dict(cumul) for nom, cumul in self.cumuls.items()}
+            executions, derniere, duree = self.executions, self.derniere_execution, self.duree_execution
+
+        lignes = []
+
+        def metrique(nom, type_metrique, description, valeurs):
+            lignes.append(f"# HELP {PREFIXE}_{nom} {description}")
+            lignes.append(f"# TYPE {PREFIXE}_{nom} {type_metrique}")
+            for etiquettes, valeur in valeurs:
+                etiquettes = "{" + ",".join(f'{cle}="{val}"' for cle, val in etiquettes.items()) + "}" if etiquettes else ""
+                lignes.append(f"{PREFIXE}_{nom}{etiquettes} {valeur}")
+
+        metrique("executions_total", "counter", "Nombre d'exécutions de l'analyse.", [({}, executions)])
+        if derniere is not None:
+            metrique("derniere_execution_timestamp_secondes", "gauge", "Fin de la dernière exécution (epoch).", [({}, f"{derniere:.3f}")])
+            metrique("execution_duree_secondes", "gauge", "Durée de la dernière exécution.", [({}, f"{duree:.6f}")])
+        metrique("etape_duree_secondes", "gauge", "Durée de chaque étape lors de sa dernière exécution.",
+                 [({'etape': nom}, f"{mesure['secondes']:.6f}") for nom, mesure in etapes.items()])
+        metrique("etape_duree_secondes_total", "counter", "Durée cumulée de chaque étape.",
+                 [({'etape': nom}, f"{cumul['secondes']:.6f}") for nom, cumul in cumuls.items()])
+        metrique("etape_executions_total", "counter", "Nombre d'exécutions de chaque étape.",
+                 [({'etape': nom}, cumul['executions']) for nom, cumul in cumuls.items()])
+        for champ, description in (('lignes_entree', "Lignes reçues par chaque étape."),
+                                   ('lignes_sortie', "Lignes produites par chaque étape."),
+                                   ('octets', "Octets de logs lus par chaque étape."),
+                                   ('cache_succes', "Succès de cache de chaque étape."),
+                                   ('cache_echecs', "Échecs de cache de chaque étape.")):
+            metrique(f"etape_{champ}_total", "counter", description,
+                     [({'etape': nom}, cumul[champ]) for nom, cumul in cumuls.items() if cumul[champ]])
+        if self.memoire:
+            metrique("etape_pic_memoire_octets", "gauge", "Pic de mémoire Python de chaque étape (tracemalloc).",
+                     [({'etape': nom}, mesure['pic_memoire']) for nom, mesure in etapes.items() if 'pic_memoire' in mesure])
+        return "\n".join(lignes) + "\n"
+
+    def exporter(self):
+        """
+        Écrit les métriques dans le fichier Prometheus, s'il est configuré (écriture atomique,
+        afin que le collecteur ne lise jamais un fichier partiel).
+        """
+        if not self.fichier_prometheus:
+            return
+        temporaire = self.fichier_prometheus + ".tmp"
+        try:
+            with open(temporaire, 'w') as f:
+                f.write(self.texte_prometheus())
+            os.replace(temporaire, self.fichier_prometheus)
+        except OSError as e:
+            print(f"⚠️ Erreur lors de l'écriture des métriques dans {self.fichier_prometheus} : {e}")
+
+    def servir(self, port, adresse="127.0.0.1"):
+        """
+        Expose les métriques sur http://adresse:port/metrics, depuis un thread d'arrière-plan.
+        """
+        metriques = self
+
+        class GestionnaireMetriques(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                corps = metriques.texte_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corps)))
+                self.end_headers()
+                self.wfile.write(corps)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.serveur = ThreadingHTTPServer((adresse, port), GestionnaireMetriques)
+        threading.Thread(target=self.serveur.serve_forever, name="metriques-http", daemon=True).start()
+        print(f"{Fore.GREEN}[+] Métriques Prometheus exposées sur http://{adresse}:{self.serveur.server_address[1]}/metrics{Style.RESET_ALL}")
+
+    def fermer(self):
+        """
+        Arrête le point d'accès HTTP éventuel.
+        """
+        if self.serveur is not None:
+            self.serveur.shutdown()
+            self.serveur.server_close()
+            self.serveur = None
+
+    def __ecrire_profil(self, profileur):
+        """
+        Écrit les statistiques cProfile de l'exécution et affiche les fonctions les plus coûteuses.
+        """
+        profileur.dump_stats(self.fichier_profil)
+        sortie = io.StringIO()
+        pstats.Stats(profileur, stream=sortie).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(15)
+        print(f"\n{Fore.CYAN}[+] Profil cProfile écrit dans {self.fichier_profil} (fonctions les plus coûteuses) :{Style.RESET_ALL}")
+        print(sortie.getvalue())
@@ -3,13 +3,17 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import configparser
 import os
+import threading
+import time
 from colorama import Fore, Style, init, Back
  
 class Notification:
-    def __init__(self, config_path="config.ini"):
+    def __init__(self, config_path="config.ini", tentatives=3):
         """
         Lance la classe Notification en lisant la configuration SMTP
         et l'adresse du destinataire depuis un fichier de configuration.
+        La connexion SMTP (TLS et authentification comprises) est ouverte au premier envoi puis
+        réutilisée par les envois suivants, jusqu'à l'appel de fermer().
         """
         if not os.path.exists(config_path):
             print(f"Fichier de configuration '{config_path}' introuvable.")
@@ -23,15 +27,64 @@ class Notification:
             self.smtp_user     = self.config['smtp']['user']
             self.smtp_password = self.config['smtp']['password']
             self.recipient     = self.config['email']['recipient']
+            self.starttls      = self.config.getboolean('smtp', 'starttls', fallback=True)
+            self.timeout       = self.config.getfloat('smtp', 'timeout', fallback=30)
         except KeyError as e:
             print(f"Clé manquante dans la configuration : {e}")
         except Exception as e:
             print(f"Erreur lors de la lecture du fichier de configuration : {e}")
- 
+
+        self.tentatives = tentatives
+        self.serveur = None  # Connexion SMTP réutilisée d'un envoi à l'autre
+        self.verrou = threading.Lock()
+
+    def __connexion(self):
+        """
+        Renvoie la connexion SMTP ouverte si elle répond encore (NOOP), sinon en ouvre une nouvelle.
+        """
+        if self.serveur is not None:
+            try:
+                if self.serveur.noop()[0] == 250:
+                    return self.serveur
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.fermer()
+
+        print(f"[+] Connexion au serveur SMTP : {self.smtp_server}:{self.smtp_port}")
+        serveur = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        try:
+            serveur.ehlo()
+            if self.starttls:
+                print("[+] Passage en mode TLS...")
+                serveur.starttls()
+                # Certains serveurs exigent un second EHLO après le STARTTLS
+                serveur.ehlo()
+
+            print(f"[+] Authentification en tant que {self.smtp_user}")
+            serveur.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            serveur.close()
+            raise
+        self.serveur = serveur
+        return serveur
+
+    def fermer(self):
+        """
+        Ferme la connexion SMTP réutilisée, si elle est ouverte.
+        """
+        if self.serveur is not None:
+            try:
+                self.serveur.quit()
+            except (smtplib.SMTPException, OSError):
+                self.serveur.close()
+            self.serveur = None
+
     def envoyer_email(self, sujet, contenu):
         """
         Envoie un email avec le sujet et le contenu spécifiés, en utilisant
         les paramètres SMTP et l'adresse destinataire lus dans le fichier de configuration.
+        En cas d'échec, l'envoi est retenté sur une nouvelle connexion avec un backoff
+        exponentiel (1 s, 2 s...). Renvoie True si l'email a été envoyé.
         """
         msg = MIMEMultipart()
         msg['From'] = self.smtp_user
@@ -41,25 +94,21 @@ class Notification:
         # Ajouter le corps du mail
         msg.attach(MIMEText(contenu, 'plain'))
  
-        try:
-            print(f"[+] Connexion au serveur SMTP : {self.smtp_server}:{self.smtp_port}")
-            with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30) as serveur:
-                serveur.ehlo()
-                print("[+] Passage en mode TLS...")
-                serveur.starttls()
-                # Certains serveurs exigent un second EHLO après le STARTTLS
-                serveur.ehlo()
- 
-                print(f"[+] Authentification en tant que {self.smtp_user}")
-                serveur.login(self.smtp_user, self.smtp_password)
- 
-                print("[+] Envoi du message...")
-                serveur.sendmail(self.smtp_user, self.recipient, msg.as_string())
- 
-            print(f"[+]Email envoyé avec succès à {self.recipient}")
- 
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email : {e}")
+        with self.verrou:
+            for tentative in range(self.tentatives):
+                try:
+                    serveur = self.__connexion()
+                    print("[+] Envoi du message...")
+                    serveur.sendmail(self.smtp_user, self.recipient, msg.as_string())
+                    print(f"[+]Email envoyé avec succès à {self.recipient}")
+                    return True
+
+                except Exception as e:
+                    print(f"Erreur lors de l'envoi de l'email : {e}")
+                    self.fermer()
+                    if tentative < self.tentatives - 1:
+                        time.sleep(2 ** tentative)
+        return False
  
     def envoyer_notification_evenements_critiques(self, logs_critiques):
         """
@@ -73,4 +122,4 @@ class Notification:
  
         contenu += "\nVotre système de surveillance."
  
-        self.envoyer_email(sujet, contenu)
+        return self.envoyer_email(sujet, contenu)
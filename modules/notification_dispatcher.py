@@ -0,0 +1,118 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from colorama import Fore, Style, init, Back
+
+
+class DispatcheurNotifications:
+    """
+    Envoie les alertes par email et/ou Slack depuis un thread d'arrière-plan, sans bloquer la
+    détection.
+
+    Les alertes signalées sont mises en file. La première alerte d'une rafale est envoyée
+    aussitôt ; les suivantes sont retenues jusqu'à fenetre secondes après l'envoi précédent,
+    puis fusionnées (les doublons sont comptés une fois, avec leur nombre d'occurrences) en un
+    seul message par canal, l'email et Slack en parallèle. Les connexions SMTP et HTTP des canaux sont réutilisées d'un lot à l'autre,
+    et chaque canal retente ses envois en cas d'échec. Une fonction de rappel peut accompagner
+    les alertes signalées : elle reçoit, après l'envoi de leur lot, True si tous les canaux
+    l'ont envoyé, False sinon. Si un MetriquesPipeline est fourni, la
+    durée de l'envoi de chaque lot y est mesurée (étape envoi_notifications).
+    """
+    def __init__(self, notification=None, slack=None, fenetre=5.0, lignes_max=100, metriques=None):
+        self.notification = notification  # Instance de Notification (email) ou None
+        self.slack = slack  # Instance de SlackNotification ou None
+        self.metriques = metriques
+        self.fenetre = fenetre
+        self.lignes_max = lignes_max
+        self.file = queue.Queue()
+        self.executeur = ThreadPoolExecutor(max_workers=2, thread_name_prefix="notification")
+        self.thread = threading.Thread(target=self.__boucle, name="dispatcheur-notifications", daemon=True)
+        self.thread.start()
+
+    def signaler(self, *alertes, rappel=None):
+        """
+        Met en file une ou plusieurs alertes (lignes de texte) et rend la main immédiatement.
+        rappel(envoye) est appelée depuis le thread d'envoi une fois leur lot traité.
+        """
+        if alertes:
+            self.file.put(([str(alerte) for alerte in alertes], rappel))
+
+    def fermer(self, delai=60):
+        """
+        Envoie les alertes encore en file (au plus delai secondes), puis ferme les connexions
+        des canaux. Renvoie False si le thread d'envoi n'a pas terminé dans le délai.
+        """
+        self.file.put(None)
+        self.thread.join(delai)
+        termine = not self.thread.is_alive()
+        self.executeur.shutdown(wait=True)
+        for canal in (self.notification, self.slack):
+            if canal is not None:
+                canal.fermer()
+        return termine
+
+    def __boucle(self):
+        """
+        Boucle du thread : regroupe les alertes par fenêtre de temps et envoie chaque lot.
+        """
+        termine = False
+        dernier_envoi = float('-inf')
+        while not termine:
+            entree = self.file.get()
+            if entree is None:
+                break
+            lot, rappels = list(entree[0]), [entree[1]]
+            # Regroupement jusqu'à fenetre secondes après l'envoi précédent (aucune attente
+            # pour la première alerte d'une rafale, seules celles déjà en file la rejoignent)
+            limite = max(time.monotonic(), dernier_envoi + self.fenetre)
+            while True:
+                try:
+                    entree = self.file.get(timeout=max(0.0, limite - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entree is None:
+                    termine = True
+                    break
+                lot.extend(entree[0])
+                rappels.append(entree[1])
+            envoye = False
+            dernier_envoi = time.monotonic()
+            try:
+                if self.metriques is None:
+                    envois = self.envoyer_lot(lot)
+                else:
+                    with self.metriques.etape("envoi_notifications", len(lot)) as mesure:
+                        envois = self.envoyer_lot(lot)
+                        mesure['lignes_sortie'] = sum(1 for envoi in envois if envoi)
+                envoye = all(envois)
+            except Exception as e:
+                print(f"{Fore.RED}Erreur lors de l'envoi des notifications : {e}{Style.RESET_ALL}")
+            for rappel in rappels:
+                if rappel is not None:
+                    try:
+                        rappel(envoye)
+                    except Exception as e:
+                        print(f"{Fore.RED}Erreur après l'envoi des notifications : {e}{Style.RESET_ALL}")
+
+    def envoyer_lot(self, lot):
+        """
+        Fusionne un lot d'alertes en un message et l'envoie sur chaque canal, en parallèle.
+        """
+        occurrences = Counter(lot)
+        lignes = [f"- {alerte}" + (f" (x{nombre})" if nombre > 1 else "")
+                  for alerte, nombre in list(occurrences.items())[:self.lignes_max]]
+        if len(occurrences) > self.lignes_max:
+            lignes.append(f"... et {len(occurrences) - self.lignes_max} autres alertes.")
+
+        envois = []
+        if self.notification is not None:
+            sujet = f"Alerte : {len(lot)} évènement(s) critique(s) détecté(s) dans les logs"
+            contenu = ("Bonjour,\n\nLes événements suivants ont été détectés comme critiques dans les logs :\n\n"
+                       + "\n".join(lignes) + "\n\nVotre système de surveillance.")
+            envois.append(self.executeur.submit(self.notification.envoyer_email, sujet, contenu))
+        if self.slack is not None:
+            message = "Alerte : Évènements critiques détectés dans les logs.\n" + "\n".join(lignes)
+            envois.append(self.executeur.submit(self.slack.envoyer_notification, message))
+        return [envoi.result() for envoi in envois]
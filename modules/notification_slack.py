@@ -1,5 +1,7 @@
 import requests
 import json
+import configparser
+import time
 from colorama import Fore, Style, init, Back
 
 class SlackNotification:
@@ -7,29 +9,63 @@ class SlackNotification:
     Permet d'envoyer des notifications sur un channel Slack
     via un webhook.
     """
-    def __init__(self, webhook_url=):
+    def __init__(self, webhook_url=None, config_path="config.ini", timeout=10, tentatives=3):
         """
-        Initialise la classe SlackNotification avec l'URL du webhook Slack.
+        Initialise la classe SlackNotification avec l'URL du webhook Slack, lue par défaut
+        dans la section [slack] (clé webhook_url) du fichier de configuration.
+        Une session HTTP est conservée afin de réutiliser la connexion d'un envoi à l'autre.
         """
+        if webhook_url is None:
+            config = configparser.ConfigParser()
+            config.read(config_path)
+            webhook_url = config.get('slack', 'webhook_url', fallback=None)
+            if webhook_url is None:
+                print(f"URL du webhook Slack manquante dans la section [slack] de '{config_path}'.")
         self.webhook_url = webhook_url
- 
+        self.timeout = timeout
+        self.tentatives = tentatives
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
     def envoyer_notification(self, message):
         """
-        Envoie une notification Slack.
+        Envoie une notification Slack. Les erreurs réseau, les limites de débit (429) et les
+        erreurs serveur (5xx) sont retentées avec un backoff exponentiel, ou après le délai
+        indiqué par l'en-tête Retry-After. Renvoie True si la notification a été envoyée.
         """
         payload = {"text": message}
-        headers = {"Content-Type": "application/json"}
- 
-        try:
-            response = requests.post(
-                self.webhook_url,
-                headers=headers,
-                data=json.dumps(payload)
-            )
-            if response.status_code != 200:
-                raise ValueError(
-                    f"Erreur {response.status_code} lors de l'envoi : {response.text}"
+
+        for tentative in range(self.tentatives):
+            attente = 2 ** tentative
+            try:
+                response = self.session.post(
+                    self.webhook_url,
+                    data=json.dumps(payload),
+                    timeout=self.timeout
                 )
-            print("Notification Slack envoyée avec succès.")
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de la notification Slack : {e}")
+                if response.status_code == 200:
+                    print("Notification Slack envoyée avec succès.")
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    raise ValueError(
+                        f"Erreur {response.status_code} lors de l'envoi : {response.text}"
+                    )
+                try:
+                    attente = float(response.headers.get("Retry-After", attente))
+                except ValueError:
+                    pass  # Retry-After au format date HTTP : backoff exponentiel
+                print(f"Erreur {response.status_code} lors de l'envoi de la notification Slack, nouvelle tentative...")
+            except requests.RequestException as e:
+                print(f"Erreur lors de l'envoi de la notification Slack : {e}")
+            except Exception as e:
+                print(f"Erreur lors de l'envoi de la notification Slack : {e}")
+                return False
+            if tentative < self.tentatives - 1:
+                time.sleep(attente)
+        return False
+
+    def fermer(self):
+        """
+        Ferme la session HTTP.
+        """
+        self.session.close()
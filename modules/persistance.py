@@ -0,0 +1,177 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+from modules.adresses_ip import ips_en_valeurs_sqlite, ip_en_valeur_sqlite, valeur_sqlite_en_ip
+
+PREFIXE_PARTITION = "evenement_suspect_"  # Une table par mois : evenement_suspect_AAAAMM
+
+
+class PersistanceSQLite:
+    """
+    Stockage des évènements critiques dans la base SQLite, partitionné par mois.
+
+    Chaque mois a sa propre table evenement_suspect_AAAAMM, où l'horodatage est stocké en
+    secondes depuis l'epoch (heure locale des logs), l'adresse IPv4 en entier et l'adresse IPv6
+    en BLOB de 16 octets. La clé primaire (adresse_ip, date_heure, evenement, utilisateur) de ces
+    tables WITHOUT ROWID empêche les doublons et sert d'index pour les recherches par IP ; un
+    second index (date_heure, adresse_ip) couvre les requêtes par plage de temps. La rétention supprime des partitions entières.
+
+    Toutes les lignes sont insérées dans une seule transaction, avec une requête préparée par
+    partition (executemany) et INSERT OR IGNORE. La base est en mode WAL.
+    """
+    def __init__(self, chemin_db='logs_analyses.db'):
+        """
+        Initialise le stockage avec le chemin de la base SQLite.
+        """
+        self.chemin_db = chemin_db
+
+    def connecter(self):
+        """
+        Ouvre une connexion en mode WAL.
+        """
+        cn = sqlite3.connect(self.chemin_db)
+        cn.execute("PRAGMA journal_mode=WAL")
+        cn.execute("PRAGMA synchronous=NORMAL")  # Suffisant en WAL : pas de fsync à chaque transaction
+        return cn
+
+    @staticmethod
+    def creer_partition(cn, mois):
+        """
+        Crée la table du mois (AAAAMM) et son index si nécessaire, et renvoie son nom.
+        """
+        table = f"{PREFIXE_PARTITION}{mois}"
+        cn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                date_heure INTEGER NOT NULL,
+                evenement TEXT NOT NULL,
+                utilisateur TEXT NOT NULL,
+                adresse_ip INTEGER NOT NULL,
+                PRIMARY KEY (adresse_ip, date_heure, evenement, utilisateur) -- Empêche les doublons
+            ) WITHOUT ROWID
+        ''')
+        cn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_date ON {table} (date_heure, adresse_ip)")
+        return table
+
+    @staticmethod
+    def lister_partitions(cn):
+        """
+        Renvoie les mois (AAAAMM) des partitions existantes, triés.
+        """
+        lignes = cn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+                            (PREFIXE_PARTITION + "[0-9][0-9][0-9][0-9][0-9][0-9]",)).fetchall()
+        return sorted(nom[len(PREFIXE_PARTITION):] for (nom,) in lignes)
+
+    def inserer_evenements(self, df_logs):
+        """
+        Insère les lignes d'un DataFrame (DateHeure, Evenement, Utilisateur, AdresseIP) et renvoie
+        le dictionnaire {'inseres': ..., 'ignores': ...}.
+        """
+        df = df_logs[df_logs['DateHeure'].notna()]
+        date_heures = pd.to_datetime(df['DateHeure'])
+        colonnes = pd.DataFrame({
+            'mois': date_heures.dt.year * 100 + date_heures.dt.month,
+            'date_heure': date_heures.to_numpy(dtype='datetime64[s]').astype(np.int64),
+            'evenement': df['Evenement'].astype(str).to_numpy(),
+            'utilisateur': df['Utilisateur'].astype(str).to_numpy(),
+            'adresse_ip': ips_en_valeurs_sqlite(df['AdresseIP']),
+        })
+
+        cn = self.connecter()
+        try:
+            avant = cn.total_changes
+            with cn:  # Une seule transaction, validée à la fin (annulée en cas d'erreur)
+                for mois, lignes in colonnes.groupby('mois', sort=True):
+                    table = self.creer_partition(cn, str(mois))
+                    cn.executemany(
+                        f"INSERT OR IGNORE INTO {table} (date_heure, evenement, utilisateur, adresse_ip) VALUES (?, ?, ?, ?)",
+                        zip(lignes['date_heure'].tolist(), lignes['evenement'].tolist(),
+                            lignes['utilisateur'].tolist(), lignes['adresse_ip'].tolist())
+                    )
+            inseres = cn.total_changes - avant
+        finally:
+            cn.close()
+
+        return {'inseres': inseres, 'ignores': len(df_logs) - inseres}
+
+    def purger(self, retention_jours):
+        """
+        Supprime les évènements antérieurs à retention_jours jours : les partitions entièrement
+        expirées sont supprimées d'un bloc, la partition à cheval est purgée par son index.
+        Renvoie le nombre de partitions supprimées.
+        """
+        limite = pd.Timestamp.now() - pd.Timedelta(days=retention_jours)
+        mois_limite = limite.strftime('%Y%m')
+        supprimees = 0
+
+        cn = self.connecter()
+        try:
+            with cn:
+                for mois in self.lister_partitions(cn):
+                    table = f"{PREFIXE_PARTITION}{mois}"
+                    if mois < mois_limite:
+                        cn.execute(f"DROP TABLE {table}")
+                        supprimees += 1
+                    elif mois == mois_limite:
+                        cn.execute(f"DELETE FROM {table} WHERE date_heure < ?", (epoch(limite),))
+            cn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            cn.close()
+        return supprimees
+
+    def top_ips(self, heures=24, limite=10):
+        """
+        Renvoie les limite IP ayant le plus d'évènements critiques sur les dernières heures,
+        sous forme de liste de tuples (adresse_ip, nombre). Seules les partitions couvrant la
+        période sont interrogées, par leur index (date_heure, adresse_ip).
+        """
+        debut = pd.Timestamp.now() - pd.Timedelta(hours=heures)
+        cn = self.connecter()
+        try:
+            partitions = [f"{PREFIXE_PARTITION}{mois}" for mois in self.lister_partitions(cn)
+                          if mois >= debut.strftime('%Y%m')]
+            if not partitions:
+                return []
+            union = " UNION ALL ".join(f"SELECT adresse_ip FROM {table} WHERE date_heure >= :debut" for table in partitions)
+            lignes = cn.execute(f'''
+                SELECT adresse_ip, COUNT(*) AS nombre FROM ({union})
+                GROUP BY adresse_ip ORDER BY nombre DESC LIMIT :limite
+            ''', {'debut': epoch(debut), 'limite': limite}).fetchall()
+        finally:
+            cn.close()
+        return [(valeur_sqlite_en_ip(ip), nombre) for ip, nombre in lignes]
+
+    def evenements_ip(self, adresse_ip, heures=24):
+        """
+        Renvoie les évènements critiques d'une IP sur les dernières heures, sous forme de DataFrame,
+        en interrogeant la clé primaire (adresse_ip, date_heure) de chaque partition concernée.
+        """
+        debut = pd.Timestamp.now() - pd.Timedelta(hours=heures)
+        cn = self.connecter()
+        try:
+            partitions = [f"{PREFIXE_PARTITION}{mois}" for mois in self.lister_partitions(cn)
+                          if mois >= debut.strftime('%Y%m')]
+            if not partitions:
+                return pd.DataFrame(columns=['DateHeure', 'Evenement', 'Utilisateur', 'AdresseIP'])
+            union = " UNION ALL ".join(
+                f"SELECT date_heure, evenement, utilisateur FROM {table} WHERE adresse_ip = :ip AND date_heure >= :debut"
+                for table in partitions
+            )
+            df = pd.read_sql_query(f"{union} ORDER BY date_heure", cn,
+                                   params={'ip': ip_en_valeur_sqlite(adresse_ip), 'debut': epoch(debut)})
+        finally:
+            cn.close()
+
+        return pd.DataFrame({
+            'DateHeure': pd.to_datetime(df['date_heure'], unit='s'),
+            'Evenement': df['evenement'],
+            'Utilisateur': df['utilisateur'],
+            'AdresseIP': adresse_ip,
+        })
+
+
+def epoch(date):
+    """
+    Convertit un Timestamp (heure locale des logs) en secondes depuis l'epoch.
+    """
+    return int(pd.Timestamp(date).value // 1_000_000_000)
+
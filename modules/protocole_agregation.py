@@ -0,0 +1,120 @@
+import struct
+
+# Format binaire des échanges entre les agents de collecte et l'agrégateur central (TCP).
+# Chaque trame : en-tête (version, type, longueur de la charge utile) puis la charge utile.
+VERSION = 1
+TYPE_BONJOUR = 1  # Agent -> agrégateur : identifiant de session (8 octets) puis nom de l'agent (UTF-8)
+TYPE_COMPTES = 2  # Agent -> agrégateur : lot de compteurs (IP, seau de temps, nombre)
+TYPE_ACQUITTEMENT = 3  # Agrégateur -> agent : numéro de séquence du dernier lot intégré
+
+ENTETE = struct.Struct("!BBI")
+BONJOUR = struct.Struct("!Q")
+COMPTES = struct.Struct("!QI")  # Numéro de séquence, nombre d'entrées
+ENTREE = struct.Struct("!QQII")  # IP sur 128 bits (deux moitiés), début du seau (secondes epoch), nombre d'accès
+ACQUITTEMENT = struct.Struct("!Q")
+ENTREES_MAX = 4096  # Entrées par trame (environ 96 Ko)
+TAILLE_MAX = COMPTES.size + ENTREES_MAX * ENTREE.size
+
+
+class ErreurProtocole(Exception):
+    """
+    Trame invalide reçue d'un pair : la connexion est fermée.
+    """
+
+
+def encoder_trame(type_trame, charge=b""):
+    """
+    Renvoie la trame (en-tête et charge utile) prête à être envoyée.
+    """
+    return ENTETE.pack(VERSION, type_trame, len(charge)) + charge
+
+
+def lire_exactement(flux, taille):
+    """
+    Lit exactement taille octets d'un flux (fichier de socket), ou renvoie None si la connexion
+    est fermée avant.
+    """
+    donnees = flux.read(taille)
+    if donnees is None or len(donnees) < taille:
+        return None
+    return donnees
+
+
+def lire_trame(flux):
+    """
+    Lit une trame et renvoie (type, charge utile), ou None si la connexion est fermée.
+    """
+    entete = lire_exactement(flux, ENTETE.size)
+    if entete is None:
+        return None
+    version, type_trame, longueur = ENTETE.unpack(entete)
+    if version != VERSION or longueur > TAILLE_MAX:
+        raise ErreurProtocole(f"Trame invalide (version {version}, {longueur} octets)")
+    charge = lire_exactement(flux, longueur) if longueur else b""
+    if charge is None:
+        return None
+    return type_trame, charge
+
+
+def extraire_trames(tampon):
+    """
+    Retire d'un tampon (bytearray des octets reçus) les trames complètes qu'il contient et
+    renvoie leur liste de (type, charge utile) ; une trame incomplète reste dans le tampon.
+    """
+    trames = []
+    while len(tampon) >= ENTETE.size:
+        version, type_trame, longueur = ENTETE.unpack_from(tampon)
+        if version != VERSION or longueur > TAILLE_MAX:
+            raise ErreurProtocole(f"Trame invalide (version {version}, {longueur} octets)")
+        if len(tampon) < ENTETE.size + longueur:
+            break
+        trames.append((type_trame, bytes(tampon[ENTETE.size:ENTETE.size + longueur])))
+        del tampon[:ENTETE.size + longueur]
+    return trames
+
+
+def encoder_bonjour(session, nom):
+    return encoder_trame(TYPE_BONJOUR, BONJOUR.pack(session) + nom.encode())
+
+
+def decoder_bonjour(charge):
+    """
+    Renvoie (session, nom) d'une trame de présentation.
+    """
+    if len(charge) < BONJOUR.size:
+        raise ErreurProtocole("Trame de présentation trop courte")
+    return BONJOUR.unpack_from(charge)[0], charge[BONJOUR.size:].decode(errors='replace')
+
+
+def encoder_comptes(sequence, entrees):
+    """
+    Encode un lot d'entrées (ip sur 128 bits, seau en secondes epoch, nombre) en trame.
+    """
+    charge = bytearray(COMPTES.pack(sequence, len(entrees)))
+    for ip, seau, nombre in entrees:
+        charge += ENTREE.pack(ip >> 64, ip & 0xFFFFFFFFFFFFFFFF, seau, nombre)
+    return encoder_trame(TYPE_COMPTES, bytes(charge))
+
+
+def decoder_comptes(charge):
+    """
+    Renvoie (sequence, liste des entrées (ip, seau, nombre)) d'une trame de compteurs.
+    """
+    if len(charge) < COMPTES.size:
+        raise ErreurProtocole("Lot de compteurs trop court")
+    sequence, nombre_entrees = COMPTES.unpack_from(charge)
+    if len(charge) != COMPTES.size + nombre_entrees * ENTREE.size:
+        raise ErreurProtocole("Taille du lot de compteurs incohérente")
+    entrees = [((haut << 64) | bas, seau, nombre)
+               for haut, bas, seau, nombre in ENTREE.iter_unpack(charge[COMPTES.size:])]
+    return sequence, entrees
+
+
+def encoder_acquittement(sequence):
+    return encoder_trame(TYPE_ACQUITTEMENT, ACQUITTEMENT.pack(sequence))
+
+
+def decoder_acquittement(charge):
+    if len(charge) != ACQUITTEMENT.size:
+        raise ErreurProtocole("Acquittement de taille invalide")
+    return ACQUITTEMENT.unpack(charge)[0]